@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.api.dependencies import get_db, get_service_factory
+from typing import List, Optional
+from app.api.dependencies import get_db, get_service_factory, get_write_pipeline
+from app.api.writes import submit_write
+from app.core.counts import COUNT_DESCRIPTION, set_total_count_headers
+from app.core.content_negotiation import NegotiatedResponse, negotiate_response_format
 from app.core.security import verify_api_key
-from app.schemas.schemas import Activity, ActivityCreate, ActivityWithChildren
+from app.schemas.schemas import (
+    Activity, ActivityCreate, ActivityTreeImport, ActivityTreeImportResult, ActivityWithChildren, WriteJobStatus
+)
 from app.services.service_factory import ConcreteServiceFactory
+from app.services.write_pipeline import GroupCommitPipeline
 
-router = APIRouter(prefix="/activities", tags=["activities"])
+router = APIRouter(
+    prefix="/activities",
+    tags=["activities"],
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
 
 
 @router.get("/", response_model=List[Activity])
 async def get_activities(
+    response: Response,
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(100, ge=1, le=1000, description="Максимальное количество записей"),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
@@ -20,6 +33,8 @@ async def get_activities(
     """Получить список всех видов деятельности"""
     service = factory.create_activity_service(db)
     activities = await service.get_all(skip=skip, limit=limit)
+    if count:
+        set_total_count_headers(response, await service.count_all(mode=count))
     return activities
 
 
@@ -82,16 +97,43 @@ async def search_activities_by_name(
     return activities
 
 
-@router.post("/", response_model=Activity)
+@router.post("/tree", response_model=ActivityTreeImportResult)
+async def import_activity_tree(
+    tree: ActivityTreeImport,
+    db: AsyncSession = Depends(get_db),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Создать вложенное дерево видов деятельности одной транзакцией.
+    Возвращает созданные узлы с id в том же порядке и форме, что и запрос.
+    """
+    service = factory.create_activity_service(db)
+    try:
+        return await service.import_tree(tree)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/", response_model=Activity, responses={202: {"model": WriteJobStatus}})
 async def create_activity(
     activity: ActivityCreate,
+    request: Request,
+    commit_mode: str = Query(
+        "immediate",
+        pattern="^(immediate|batch|deferred)$",
+        description="immediate - отдельная транзакция, batch - групповой коммит с ожиданием, deferred - 202 и ссылка на статус"
+    ),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
+    pipeline: GroupCommitPipeline = Depends(get_write_pipeline),
     api_key: str = Depends(verify_api_key)
 ):
     """Создать новый вид деятельности"""
+    service = factory.create_activity_service(db)
     try:
-        service = factory.create_activity_service(db)
-        return await service.create(activity)
+        if commit_mode == "immediate":
+            return await service.create(activity)
+        return await submit_write(pipeline, "activity", activity, commit_mode, request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
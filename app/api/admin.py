@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import List
+from app.api.dependencies import get_admission_controller, get_profile_store, get_database_manager
+from app.core.database_factory import DatabaseManager
+from app.core.admission import AdmissionController
+from app.core.geo_tiles import GeoTileCache, get_geo_tile_cache
+from app.core.content_negotiation import NegotiatedResponse, negotiate_response_format
+from app.core.profiling import ProfileStore
+from app.core.security import verify_admin_key, verify_api_key
+from app.core.single_flight import SingleFlight, get_single_flight
+from app.schemas.schemas import (
+    AdmissionStats, EngineStats, GeoTileCacheStats, SingleFlightStats, ProfileSummary, ProfileDetail, SlowQueryEntry
+)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
+
+
+@router.get("/admission", response_model=AdmissionStats)
+async def get_admission_stats(
+    controller: AdmissionController = Depends(get_admission_controller),
+    api_key: str = Depends(verify_api_key)
+):
+    """Счетчики контроля допуска: принятые, ожидавшие и отклоненные запросы"""
+    return controller.get_stats()
+
+
+@router.get("/single-flight", response_model=SingleFlightStats)
+async def get_single_flight_stats(
+    single_flight: SingleFlight = Depends(get_single_flight),
+    api_key: str = Depends(verify_api_key)
+):
+    """Счетчики объединения одинаковых одновременных чтений"""
+    return single_flight.get_stats()
+
+
+@router.get("/geo-tiles", response_model=GeoTileCacheStats)
+async def get_geo_tile_stats(
+    tile_cache: GeoTileCache = Depends(get_geo_tile_cache),
+    api_key: str = Depends(verify_api_key)
+):
+    """Счетчики кэша тайлов географического поиска"""
+    return tile_cache.get_stats()
+
+
+@router.get("/engines", response_model=List[EngineStats])
+async def get_engine_stats(
+    db_manager: DatabaseManager = Depends(get_database_manager),
+    api_key: str = Depends(verify_api_key)
+):
+    """Движки БД: активные и выводимые из работы, открытые сессии и занятость пула"""
+    return db_manager.lifecycle.get_stats()
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def get_profiles(
+    limit: int = Query(100, ge=1, le=1000, description="Максимальное количество профилей"),
+    store: ProfileStore = Depends(get_profile_store),
+    api_key: str = Depends(verify_api_key),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """Список сохраненных профилей запросов, новые первыми"""
+    return store.list(limit=limit)
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail)
+async def get_profile(
+    profile_id: str,
+    store: ProfileStore = Depends(get_profile_store),
+    api_key: str = Depends(verify_api_key),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """Сводка профиля со статистикой SQL запросов"""
+    summary = store.get_summary(profile_id)
+
+    if not summary:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return summary
+
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(
+    profile_id: str,
+    store: ProfileStore = Depends(get_profile_store),
+    api_key: str = Depends(verify_api_key),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """Стеки профиля в свернутом формате для flamegraph.pl или speedscope"""
+    folded = store.get_folded(profile_id)
+
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return folded
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryEntry])
+async def get_slow_queries(
+    db_manager: DatabaseManager = Depends(get_database_manager),
+    api_key: str = Depends(verify_api_key),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """Последние медленные запросы к БД с маршрутом и планом выполнения"""
+    if db_manager.slow_query_log is None:
+        return []
+    return db_manager.slow_query_log.entries()
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from app.api.dependencies import get_db, get_service_factory
+from app.core.content_negotiation import NegotiatedResponse, negotiate_response_format
+from app.core.security import verify_api_key
+from app.schemas.schemas import AutocompleteItem
+from app.services.service_factory import ConcreteServiceFactory
+
+router = APIRouter(
+    prefix="/autocomplete",
+    tags=["autocomplete"],
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
+
+
+@router.get("/", response_model=List[AutocompleteItem])
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=200, description="Начало названия"),
+    limit: int = Query(10, ge=1, le=50, description="Максимальное количество подсказок"),
+    types: Optional[List[Literal["organization", "activity"]]] = Query(None, description="Типы подсказок"),
+    db: AsyncSession = Depends(get_db),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    api_key: str = Depends(verify_api_key)
+):
+    """Подсказки по началу названия организации или вида деятельности"""
+    service = factory.create_autocomplete_service(db)
+    return await service.suggest(q, limit=limit, kinds=types)
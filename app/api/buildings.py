@@ -1,18 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.api.dependencies import get_db, get_service_factory
+from typing import List, Optional
+from app.api.dependencies import get_db, get_service_factory, get_write_pipeline
+from app.api.writes import submit_write
+from app.core.config import get_settings
+from app.core.counts import COUNT_DESCRIPTION, set_total_count_headers
+from app.core.content_negotiation import NegotiatedResponse, negotiate_response_format
+from app.core.pagination import CURSOR_DESCRIPTION, MAX_SEARCH_LIMIT, set_next_cursor_header
 from app.core.security import verify_api_key
-from app.schemas.schemas import Building, BuildingCreate
+from app.schemas.schemas import Building, BuildingCreate, BuildingImportReport, WriteJobStatus
+from app.services.building_import import BuildingImporter, parse_rows
 from app.services.service_factory import ConcreteServiceFactory
+from app.services.write_pipeline import GroupCommitPipeline
 
-router = APIRouter(prefix="/buildings", tags=["buildings"])
+router = APIRouter(
+    prefix="/buildings",
+    tags=["buildings"],
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
 
 
 @router.get("/", response_model=List[Building])
 async def get_buildings(
+    response: Response,
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(100, ge=1, le=1000, description="Максимальное количество записей"),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
@@ -20,6 +34,8 @@ async def get_buildings(
     """Получить список всех зданий"""
     service = factory.create_building_service(db)
     buildings = await service.get_all(skip=skip, limit=limit)
+    if count:
+        set_total_count_headers(response, await service.count_all(mode=count))
     return buildings
 
 
@@ -42,26 +58,84 @@ async def get_building(
 
 @router.get("/search/address", response_model=List[Building])
 async def search_buildings_by_address(
+    response: Response,
     address: str = Query(..., description="Поисковый запрос по адресу"),
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT, description="Максимальное число результатов"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
 ):
     """Поиск зданий по адресу"""
     service = factory.create_building_service(db)
-    buildings = await service.find_by_address(address)
-    return buildings
+    try:
+        page = await service.find_by_address(address, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    if count:
+        set_total_count_headers(response, await service.count_by_address(address, mode=count))
+    return page.items
+
+
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+}
+
+
+@router.post(
+    "/import",
+    response_model=BuildingImportReport,
+    openapi_extra={"requestBody": {"content": {
+        content_type: {"schema": {"type": "string"}} for content_type in IMPORT_CONTENT_TYPES
+    }}}
+)
+async def import_buildings(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Формат тела, по умолчанию по Content-Type"),
+    db: AsyncSession = Depends(get_db),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Потоковый импорт зданий из CSV (колонки address, latitude, longitude) или NDJSON.
+    Дубликаты существующих зданий пропускаются, ошибки возвращаются по строкам.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    file_format = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if file_format is None:
+        raise HTTPException(status_code=415, detail="Use text/csv or application/x-ndjson or pass format")
+
+    settings = get_settings()
+    importer = BuildingImporter(
+        factory.create_building_service(db),
+        batch_size=settings.import_batch_size,
+        max_errors=settings.import_max_errors
+    )
+    return await importer.run(parse_rows(request.stream(), file_format))
 
 
-@router.post("/", response_model=Building)
+@router.post("/", response_model=Building, responses={202: {"model": WriteJobStatus}})
 async def create_building(
     building: BuildingCreate,
+    request: Request,
+    commit_mode: str = Query(
+        "immediate",
+        pattern="^(immediate|batch|deferred)$",
+        description="immediate - отдельная транзакция, batch - групповой коммит с ожиданием, deferred - 202 и ссылка на статус"
+    ),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
+    pipeline: GroupCommitPipeline = Depends(get_write_pipeline),
     api_key: str = Depends(verify_api_key)
 ):
     service = factory.create_building_service(db)
     try:
-        return await service.create(building)
+        if commit_mode == "immediate":
+            return await service.create(building)
+        return await submit_write(pipeline, "building", building, commit_mode, request)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
\ No newline at end of file
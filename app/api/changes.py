@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.dependencies import get_db, get_service_factory
+from app.core.content_negotiation import NegotiatedResponse, negotiate_response_format
+from app.core.security import verify_api_key
+from app.schemas.schemas import ChangeFeed
+from app.services.service_factory import ConcreteServiceFactory
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["changes"],
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
+
+
+@router.get("/", response_model=ChangeFeed)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Токен последней полученной порции изменений"),
+    limit: int = Query(1000, ge=1, le=10000, description="Максимальное количество записей журнала"),
+    db: AsyncSession = Depends(get_db),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    api_key: str = Depends(verify_api_key)
+):
+    """Изменения справочника после указанного токена для инкрементальной синхронизации"""
+    service = factory.create_change_service(db)
+    return await service.get_changes(since=since, limit=limit)
@@ -1,13 +1,20 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database_factory import DatabaseManager, PostgreSQLFactory
 from app.services.service_factory import ConcreteServiceFactory
+from app.services.write_pipeline import GroupCommitPipeline
+from app.core.admission import AdmissionController
+from app.core.profiling import ProfileStore
+from app.core.slow_query_log import SlowQueryLog, current_route
 from app.core.config import get_settings
 import os
 
 _db_manager = None
 _service_factory = None
+_write_pipeline = None
+_admission_controller = None
+_profile_store = None
 
 
 def get_database_manager() -> DatabaseManager:
@@ -16,15 +23,40 @@ def get_database_manager() -> DatabaseManager:
     if _db_manager is None:
         settings = get_settings()
         factory = PostgreSQLFactory(settings.database_url)
+        slow_query_log = SlowQueryLog(
+            threshold_ms=settings.slow_query_threshold_ms,
+            max_entries=settings.slow_query_log_size,
+            explain_per_minute=settings.slow_query_explain_per_minute
+        )
         
-        _db_manager = DatabaseManager(factory)
+        _db_manager = DatabaseManager(factory, slow_query_log)
     return _db_manager
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+def get_statement_timeout(request: Request) -> int:
+    """Таймаут запросов к БД для маршрута (мс)"""
+    settings = get_settings()
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    return settings.route_statement_timeouts.get(path, settings.statement_timeout_ms)
+
+
+def get_read_path(request: Request) -> str:
+    """Путь чтения маршрута: orm или core (без ORM, JSON собирается в БД)"""
+    settings = get_settings()
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    return settings.route_read_paths.get(path, settings.read_path)
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """Получение сессии базы данных через Singleton"""
     db_manager = get_database_manager()
+    route = request.scope.get("route")
+    current_route.set(f"{request.method} {route.path if route is not None else request.url.path}")
     async for session in db_manager.get_session():
+        session.info["statement_timeout_ms"] = get_statement_timeout(request)
+        session.info["read_path"] = get_read_path(request)
         yield session
 
 
@@ -33,4 +65,42 @@ def get_service_factory() -> ConcreteServiceFactory:
     global _service_factory
     if _service_factory is None:
         _service_factory = ConcreteServiceFactory()
-    return _service_factory
\ No newline at end of file
+    return _service_factory
+
+
+def get_write_pipeline() -> GroupCommitPipeline:
+    """Получение Singleton экземпляра конвейера группового коммита"""
+    global _write_pipeline
+    if _write_pipeline is None:
+        settings = get_settings()
+        _write_pipeline = GroupCommitPipeline(
+            get_database_manager().session_factory,
+            get_service_factory(),
+            max_batch_size=settings.write_batch_max_size,
+            max_wait_ms=settings.write_batch_max_wait_ms,
+            max_queue_size=settings.write_queue_max_size,
+            job_retention=settings.write_job_retention
+        )
+    return _write_pipeline
+
+
+def get_admission_controller() -> AdmissionController:
+    """Получение Singleton экземпляра контроля допуска (лимит по умолчанию - размер пула БД)"""
+    global _admission_controller
+    if _admission_controller is None:
+        settings = get_settings()
+        _admission_controller = AdmissionController(
+            max_concurrency=settings.admission_max_concurrency or get_database_manager().pool_capacity,
+            queue_timeout_ms=settings.admission_queue_timeout_ms,
+            rate_per_second=settings.admission_rate_per_second,
+            burst=settings.admission_burst
+        )
+    return _admission_controller
+
+
+def get_profile_store() -> ProfileStore:
+    """Получение Singleton экземпляра каталога профилей"""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore(get_settings().profiling_dir)
+    return _profile_store
@@ -0,0 +1,140 @@
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncGenerator, List, Optional
+from app.api.dependencies import get_database_manager, get_service_factory
+from app.core.config import get_settings
+from app.core.events import (
+    ChangeBroadcaster, EventFilter, LAGGED, SeenEvents, format_sse, get_change_broadcaster
+)
+from app.core.security import verify_api_key
+from app.services.service_factory import ConcreteServiceFactory
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+REPLAY_PAGE_SIZE = 500
+
+
+async def _replay(
+    broadcaster: ChangeBroadcaster,
+    factory: ConcreteServiceFactory,
+    since: int
+) -> AsyncGenerator[dict, None]:
+    """Пропущенные события: из буфера рассылки, а если он уже не покрывает токен - из журнала"""
+    events = broadcaster.recent_since(since)
+    if events is not None:
+        for event in events:
+            yield event
+        return
+
+    async with get_database_manager().session_factory() as session:
+        service = factory.create_change_service(session)
+        while True:
+            events = await service.get_events(since=since, limit=REPLAY_PAGE_SIZE)
+            for event in events:
+                since = event["id"]
+                yield event
+            if len(events) < REPLAY_PAGE_SIZE:
+                return
+
+
+async def _event_stream(
+    request: Request,
+    broadcaster: ChangeBroadcaster,
+    factory: ConcreteServiceFactory,
+    event_filter: EventFilter,
+    since: Optional[int]
+) -> AsyncGenerator[str, None]:
+    """
+    Поток событий подписчика.
+
+    События приходят в порядке фиксации, и id в нем не монотонны: повторы
+    (после догоняющего чтения из буфера или журнала) отбрасываются по множеству
+    отданных id, а since - последнее отданное событие, место продолжения при LAGGED.
+    """
+    heartbeat = get_settings().event_heartbeat_seconds
+    seen = SeenEvents(get_settings().event_buffer_size * 10)
+    queue = broadcaster.subscribe()
+    try:
+        if since is None:
+            async with get_database_manager().session_factory() as session:
+                since = await factory.create_change_service(session).get_latest_token()
+            yield f"id: {since}\nretry: 3000\n\n"
+        backlog = _replay(broadcaster, factory, since)
+
+        while True:
+            if backlog is not None:
+                async for event in backlog:
+                    if seen.add(event["id"]):
+                        since = event["id"]
+                        event_filter.observe(event)
+                        if event_filter.matches(event):
+                            yield format_sse(event)
+                backlog = None
+
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+
+            if event is LAGGED:
+                backlog = _replay(broadcaster, factory, since)
+                continue
+
+            if not seen.add(event["id"]):
+                continue
+
+            since = event["id"]
+            event_filter.observe(event)
+            if event_filter.matches(event):
+                yield format_sse(event)
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Токен возобновления (вместо заголовка Last-Event-ID)"),
+    entity_types: Optional[List[str]] = Query(
+        None, description="Типы сущностей: organizations, buildings, activities, phones"
+    ),
+    activity_id: Optional[int] = Query(None, description="Только события поддерева указанного вида деятельности"),
+    min_latitude: Optional[float] = Query(None, ge=-90, le=90, description="Минимальная широта"),
+    max_latitude: Optional[float] = Query(None, ge=-90, le=90, description="Максимальная широта"),
+    min_longitude: Optional[float] = Query(None, ge=-180, le=180, description="Минимальная долгота"),
+    max_longitude: Optional[float] = Query(None, ge=-180, le=180, description="Максимальная долгота"),
+    last_event_id: Optional[str] = Header(None),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    broadcaster: ChangeBroadcaster = Depends(get_change_broadcaster),
+    api_key: str = Depends(verify_api_key)
+):
+    """Поток событий создания организаций, зданий, видов деятельности и телефонов (Server-Sent Events)"""
+    if since is None and last_event_id:
+        try:
+            since = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    activity_ids = None
+    if activity_id is not None:
+        async with get_database_manager().session_factory() as session:
+            activity_ids = await factory.create_activity_service(session).get_subtree_ids(activity_id)
+
+    event_filter = EventFilter(
+        entity_types=entity_types,
+        activity_ids=activity_ids,
+        min_latitude=min_latitude,
+        max_latitude=max_latitude,
+        min_longitude=min_longitude,
+        max_longitude=max_longitude
+    )
+
+    return StreamingResponse(
+        _event_stream(request, broadcaster, factory, event_filter, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,27 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from app.api.dependencies import get_db, get_service_factory
+from typing import List, Optional, Union
+from app.api.dependencies import get_db, get_service_factory, get_write_pipeline
+from app.api.writes import submit_write
+from app.core.counts import COUNT_DESCRIPTION, set_total_count_headers
+from app.core.content_negotiation import NegotiatedResponse, negotiate_response_format
+from app.core.pagination import CURSOR_DESCRIPTION, MAX_SEARCH_LIMIT, set_next_cursor_header
 from app.core.security import verify_api_key
 from app.schemas.schemas import (
     Organization, OrganizationCreate, OrganizationList, 
-    SearchArea, PaginationParams, ApiResponse
+    SearchArea, PolygonSearchArea, BatchGeoSearch, GeoBatchResult, FacetedOrganizationList,
+    PaginationParams, ApiResponse, WriteJobStatus
 )
 from app.services.service_factory import ConcreteServiceFactory
+from app.services.write_pipeline import GroupCommitPipeline
 
-router = APIRouter(prefix="/organizations", tags=["organizations"])
+router = APIRouter(
+    prefix="/organizations",
+    tags=["organizations"],
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
+
+FACETS_DESCRIPTION = "activity - добавить к результатам число организаций по видам деятельности (с учетом иерархии)"
 
 
 @router.get("/", response_model=List[OrganizationList])
 async def get_organizations(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
 ):
     service = factory.create_organization_service(db)
     organizations = await service.get_all(skip=skip, limit=limit)
+    if count:
+        set_total_count_headers(response, await service.count_all(mode=count))
     return organizations
 
 
@@ -43,45 +60,99 @@ async def get_organization(
 
 @router.get("/building/{building_id}", response_model=List[OrganizationList])
 async def get_organizations_by_building(
+    response: Response,
     building_id: int,
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT, description="Максимальное число результатов"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
 ):
     """Получить список организаций в конкретном здании"""
     service = factory.create_organization_service(db)
-    organizations = await service.find_by_building(building_id)
-    return organizations
+    try:
+        page = await service.find_by_building(building_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    return page.items
+
+
+@router.get("/by-phone/{phone_number}", response_model=List[OrganizationList])
+async def get_organizations_by_phone(
+    response: Response,
+    phone_number: str,
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT, description="Максимальное число результатов"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    api_key: str = Depends(verify_api_key)
+):
+    """Получить организации по номеру телефона (в любом формате записи)"""
+    service = factory.create_organization_service(db)
+    try:
+        page = await service.find_by_phone(phone_number, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    return page.items
 
 
-@router.get("/activity/{activity_name}", response_model=List[OrganizationList])
+@router.get("/activity/{activity_name}", response_model=Union[List[OrganizationList], FacetedOrganizationList])
 async def get_organizations_by_activity(
+    response: Response,
     activity_name: str,
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT, description="Максимальное число результатов"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
+    facets: Optional[str] = Query(None, pattern="^activity$", description=FACETS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
 ):
     """Получить список организаций по виду деятельности (включая иерархию)"""
     service = factory.create_organization_service(db)
-    organizations = await service.find_by_activity(activity_name)
-    return organizations
+    try:
+        page = await service.find_by_activity(activity_name, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    if count:
+        set_total_count_headers(response, await service.count_by_activity(activity_name, mode=count))
+    if facets:
+        return {"items": page.items, "facets": {facets: await service.get_activity_facets(activity_name)}}
+    return page.items
 
 
-@router.get("/search/name", response_model=List[OrganizationList])
+@router.get("/search/name", response_model=Union[List[OrganizationList], FacetedOrganizationList])
 async def search_organizations_by_name(
+    response: Response,
     name: str = Query(..., description="Поисковый запрос по названию"),
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT, description="Максимальное число результатов"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
+    facets: Optional[str] = Query(None, pattern="^activity$", description=FACETS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
 ):
     """Поиск организаций по названию"""
     service = factory.create_organization_service(db)
-    organizations = await service.find_by_name(name)
-    return organizations
+    try:
+        page = await service.find_by_name(name, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    if count:
+        set_total_count_headers(response, await service.count_by_name(name, mode=count))
+    if facets:
+        return {"items": page.items, "facets": {facets: await service.get_name_facets(name)}}
+    return page.items
 
 
-@router.post("/search/geographic", response_model=List[OrganizationList])
+@router.post("/search/geographic", response_model=Union[List[OrganizationList], FacetedOrganizationList])
 async def search_organizations_by_geographic_area(
+    response: Response,
     latitude: float = Query(..., ge=-90, le=90, description="Широта центра поиска"),
     longitude: float = Query(..., ge=-180, le=180, description="Долгота центра поиска"),
     radius: Optional[float] = Query(None, gt=0, description="Радиус поиска в километрах"),
@@ -89,13 +160,17 @@ async def search_organizations_by_geographic_area(
     max_latitude: Optional[float] = Query(None, ge=-90, le=90, description="Максимальная широта"),
     min_longitude: Optional[float] = Query(None, ge=-180, le=180, description="Минимальная долгота"),
     max_longitude: Optional[float] = Query(None, ge=-180, le=180, description="Максимальная долгота"),
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT, description="Максимальное число результатов"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
+    facets: Optional[str] = Query(None, pattern="^activity$", description=FACETS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
     api_key: str = Depends(verify_api_key)
 ):
     """Поиск организаций в заданном радиусе или прямоугольной области"""
     service = factory.create_organization_service(db)
-    organizations = await service.find_by_geographic_area(
+    area = dict(
         latitude=latitude,
         longitude=longitude,
         radius=radius,
@@ -104,18 +179,74 @@ async def search_organizations_by_geographic_area(
         min_longitude=min_longitude,
         max_longitude=max_longitude
     )
-    return organizations
+    try:
+        page = await service.find_by_geographic_area(**area, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    if count:
+        set_total_count_headers(response, await service.count_by_geographic_area(**area, mode=count))
+    if facets:
+        return {"items": page.items, "facets": {facets: await service.get_geographic_area_facets(**area)}}
+    return page.items
+
+
+@router.post("/search/geographic/batch", response_model=List[GeoBatchResult])
+async def search_organizations_near_points(
+    search: BatchGeoSearch,
+    db: AsyncSession = Depends(get_db),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    api_key: str = Depends(verify_api_key)
+):
+    """Поиск организаций в радиусе или k ближайших для многих точек за один запрос"""
+    service = factory.create_organization_service(db)
+    return await service.find_near_points(search)
+
+
+@router.post("/search/polygon", response_model=Union[List[OrganizationList], FacetedOrganizationList])
+async def search_organizations_in_polygon(
+    response: Response,
+    area: PolygonSearchArea,
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT, description="Максимальное число результатов"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, pattern="^(auto|exact|estimated)$", description=COUNT_DESCRIPTION),
+    facets: Optional[str] = Query(None, pattern="^activity$", description=FACETS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    factory: ConcreteServiceFactory = Depends(get_service_factory),
+    api_key: str = Depends(verify_api_key)
+):
+    """Поиск организаций в полигоне или мультиполигоне GeoJSON"""
+    service = factory.create_organization_service(db)
+    try:
+        page = await service.find_in_polygon(area, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    if count:
+        set_total_count_headers(response, await service.count_by_polygon(area, mode=count))
+    if facets:
+        return {"items": page.items, "facets": {facets: await service.get_polygon_facets(area)}}
+    return page.items
 
 
-@router.post("/", response_model=Organization)
+@router.post("/", response_model=Organization, responses={202: {"model": WriteJobStatus}})
 async def create_organization(
     organization: OrganizationCreate,
+    request: Request,
+    commit_mode: str = Query(
+        "immediate",
+        pattern="^(immediate|batch|deferred)$",
+        description="immediate - отдельная транзакция, batch - групповой коммит с ожиданием, deferred - 202 и ссылка на статус"
+    ),
     db: AsyncSession = Depends(get_db),
     factory: ConcreteServiceFactory = Depends(get_service_factory),
+    pipeline: GroupCommitPipeline = Depends(get_write_pipeline),
     api_key: str = Depends(verify_api_key)
 ):
     service = factory.create_organization_service(db)
     try:
-        return await service.create(organization)
+        if commit_mode == "immediate":
+            return await service.create(organization)
+        return await submit_write(pipeline, "organization", organization, commit_mode, request)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
\ No newline at end of file
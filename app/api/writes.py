@@ -0,0 +1,79 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.api.dependencies import get_write_pipeline
+from app.core.content_negotiation import NegotiatedResponse, negotiate_response_format
+from app.core.security import verify_api_key
+from app.schemas.schemas import WriteJobStatus, WritePipelineStats
+from app.services.write_pipeline import GroupCommitPipeline, WriteJob
+
+router = APIRouter(
+    prefix="/writes",
+    tags=["writes"],
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
+
+
+def build_job_status(job: WriteJob, request: Request) -> WriteJobStatus:
+    return WriteJobStatus(
+        job_id=job.id,
+        entity_type=job.entity_type,
+        status=job.status,
+        entity_id=job.entity_id,
+        error=job.error,
+        status_url=str(request.url_for("get_write_job", job_id=job.id))
+    )
+
+
+async def submit_write(
+    pipeline: GroupCommitPipeline,
+    entity_type: str,
+    entity_data,
+    commit_mode: str,
+    request: Request
+):
+    """
+    Создание сущности через конвейер группового коммита.
+
+    В режиме batch ответ возвращается после фиксации пакета,
+    в режиме deferred сразу возвращается 202 со ссылкой на статус.
+    """
+    try:
+        job = pipeline.submit(entity_type, entity_data)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Write queue is full", headers={"Retry-After": "1"})
+
+    if commit_mode == "deferred":
+        job_status = build_job_status(job, request)
+        return NegotiatedResponse(
+            content=job_status.model_dump(),
+            status_code=202,
+            headers={"Location": job_status.status_url}
+        )
+
+    return await job.wait()
+
+
+@router.get("/metrics", response_model=WritePipelineStats)
+async def get_write_metrics(
+    pipeline: GroupCommitPipeline = Depends(get_write_pipeline),
+    api_key: str = Depends(verify_api_key)
+):
+    """Метрики конвейера группового коммита: глубина очереди и размеры пакетов"""
+    return pipeline.get_stats()
+
+
+@router.get("/{job_id}", response_model=WriteJobStatus)
+async def get_write_job(
+    job_id: str,
+    request: Request,
+    pipeline: GroupCommitPipeline = Depends(get_write_pipeline),
+    api_key: str = Depends(verify_api_key)
+):
+    """Статус отложенной операции создания"""
+    job = pipeline.get_job(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Write job not found")
+
+    return build_job_status(job, request)
@@ -0,0 +1,25 @@
+import hashlib
+from app.core.normalization import normalize_name
+
+# Точность координат ключа: 5 знаков, около метра
+COORDINATE_PRECISION = 5
+
+
+def normalize_address(address: str) -> str:
+    """Адрес без регистра, пунктуации и лишних пробелов"""
+    return normalize_name(address)
+
+
+def _format_coordinate(value: float) -> str:
+    # + 0.0 убирает отрицательный ноль после округления
+    return f"{round(value, COORDINATE_PRECISION) + 0.0:.{COORDINATE_PRECISION}f}"
+
+
+def building_dedup_key(address: str, latitude: float, longitude: float) -> str:
+    """
+    Ключ дубликатов здания: хеш нормализованного адреса и округленных координат.
+
+    "г. Москва, ул.Ленина 1" и "Г. МОСКВА, ул. Ленина, 1" в одной точке дают один ключ.
+    """
+    value = f"{normalize_address(address)}|{_format_coordinate(latitude)}|{_format_coordinate(longitude)}"
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from app.core.security import is_valid_api_key
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше burst в запасе"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> Tuple[bool, float]:
+        """Взять токен. Возвращает (успех, секунд до появления следующего токена)"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Контроль допуска запросов.
+
+    Ограничивает частоту запросов по API ключу (если задан rate_per_second)
+    и общее число одновременных запросов размером пула соединений. Запрос, не получивший слот за
+    queue_timeout, сразу получает 503 вместо ожидания внутри пула SQLAlchemy.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        queue_timeout_ms: int = 500,
+        rate_per_second: Optional[float] = None,
+        burst: int = 100,
+        max_tracked_keys: int = 10000
+    ):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout_ms / 1000
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._max_tracked_keys = max_tracked_keys
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._stats = {
+            "admitted_total": 0,
+            "queued_total": 0,
+            "rejected_rate_limited_total": 0,
+            "rejected_overloaded_total": 0,
+            "in_flight": 0,
+            "waiting": 0,
+        }
+
+    def check_rate(self, client_key: str) -> Tuple[bool, float]:
+        if self.rate_per_second is None:
+            return True, 0.0
+        bucket = self._buckets.get(client_key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_second, self.burst)
+            self._buckets[client_key] = bucket
+            while len(self._buckets) > self._max_tracked_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_key)
+
+        allowed, retry_after = bucket.try_acquire()
+        if not allowed:
+            self._stats["rejected_rate_limited_total"] += 1
+        return allowed, retry_after
+
+    async def acquire(self) -> bool:
+        """Занять слот выполнения. False, если слот не освободился за queue_timeout"""
+        if self._semaphore.locked():
+            self._stats["queued_total"] += 1
+            self._stats["waiting"] += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._stats["rejected_overloaded_total"] += 1
+                return False
+            finally:
+                self._stats["waiting"] -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self._stats["admitted_total"] += 1
+        self._stats["in_flight"] += 1
+        return True
+
+    def release(self):
+        self._stats["in_flight"] -= 1
+        self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "max_concurrency": self.max_concurrency,
+            "queue_timeout_ms": int(self.queue_timeout * 1000),
+            "tracked_keys": len(self._buckets),
+        }
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware контроля допуска для запросов к API"""
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        path_prefix: str = "/api/",
+        exempt_paths: Iterable[str] = (),
+        key_validator: Optional[Callable[[str], bool]] = None
+    ):
+        self.app = app
+        self.controller = controller
+        self.key_validator = key_validator or is_valid_api_key
+        self.path_prefix = path_prefix
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(self.path_prefix) or path.startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        allowed, retry_after = self.controller.check_rate(self._client_key(scope))
+        if not allowed:
+            await self._reject(send, 429, "Rate limit exceeded", retry_after)
+            return
+
+        if not await self.controller.acquire():
+            await self._reject(send, 503, "Service overloaded", self.controller.queue_timeout)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    def _client_key(self, scope) -> str:
+        """
+        Ключ ведра: проверенный API ключ, иначе адрес клиента - случайный
+        токен в каждом запросе не дает нового ведра и не вытесняет настоящие ключи.
+        """
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                token = value.decode("latin-1").removeprefix("Bearer ").strip()
+                if token and self.key_validator(token):
+                    return f"key:{token}"
+                break
+        client: Optional[Tuple[str, int]] = scope.get("client")
+        return f"anonymous:{client[0]}" if client else "anonymous"
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str, retry_after: float):
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
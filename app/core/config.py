@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -11,6 +12,64 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     max_activity_depth: int = 3
+    activity_import_max_nodes: int = 10000
+    db_pool_prewarm: int = 5
+    db_drain_timeout_seconds: float = 30.0
+    write_batch_max_size: int = 100
+    write_batch_max_wait_ms: int = 20
+    write_queue_max_size: int = 10000
+    write_job_retention: int = 10000
+    import_batch_size: int = 1000
+    import_max_errors: int = 1000
+    event_buffer_size: int = 1000
+    event_subscriber_queue_size: int = 1000
+    event_heartbeat_seconds: float = 15.0
+    statement_timeout_ms: int = 5000
+    route_statement_timeouts: Dict[str, int] = {
+        "/api/v1/organizations/search/geographic": 2000,
+        "/api/v1/organizations/search/geographic/batch": 5000,
+        "/api/v1/organizations/search/name": 2000,
+        "/api/v1/organizations/search/polygon": 2000,
+        "/api/v1/buildings/search/address": 2000,
+        "/api/v1/activities/search/name": 2000,
+    }
+    read_path: str = "orm"
+    route_read_paths: Dict[str, str] = {
+        "/api/v1/organizations/": "core",
+        "/api/v1/organizations/{organization_id}": "core",
+        "/api/v1/organizations/building/{building_id}": "core",
+        "/api/v1/organizations/by-phone/{phone_number}": "core",
+        "/api/v1/organizations/activity/{activity_name}": "core",
+        "/api/v1/organizations/search/name": "core",
+        "/api/v1/organizations/search/geographic": "core",
+    }
+    single_flight_enabled: bool = True
+    count_exact_threshold: int = 100000
+    count_cache_ttl_seconds: float = 10.0
+    count_cache_size: int = 1000
+    geo_tile_cache_enabled: bool = True
+    geo_tile_precision: int = 5
+    geo_tile_max_tiles: int = 256
+    geo_tile_cache_size: int = 10000
+    geo_tile_cache_ttl_seconds: float = 60.0
+    admin_api_key: Optional[str] = None
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5.0
+    profiling_dir: str = "profiles"
+    tracing_exporter: str = "none"
+    tracing_file_path: str = "traces/spans.jsonl"
+    tracing_sample_rate: float = 0.0
+    tracing_slow_request_ms: Optional[float] = 500.0
+    tracing_max_spans: int = 1000
+    slow_query_threshold_ms: float = 200.0
+    slow_query_log_size: int = 100
+    slow_query_explain_per_minute: float = 6.0
+    # Выключено по умолчанию; лимит частоты - только при отдельных ключах клиентов
+    admission_enabled: bool = False
+    admission_max_concurrency: Optional[int] = None
+    admission_queue_timeout_ms: int = 500
+    admission_rate_per_second: Optional[float] = None
+    admission_burst: int = 100
 
     class Config:
         env_file = ".env"
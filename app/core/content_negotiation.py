@@ -0,0 +1,125 @@
+import json
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import msgpack
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+COLUMNAR_JSON_MEDIA_TYPE = "application/vnd.columnar+json"
+COLUMNAR_MSGPACK_MEDIA_TYPE = "application/vnd.columnar+msgpack"
+
+_SUPPORTED_MEDIA_TYPES = {
+    MSGPACK_MEDIA_TYPE: MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    COLUMNAR_JSON_MEDIA_TYPE: COLUMNAR_JSON_MEDIA_TYPE,
+    COLUMNAR_MSGPACK_MEDIA_TYPE: COLUMNAR_MSGPACK_MEDIA_TYPE,
+}
+
+_response_media_type: ContextVar[str] = ContextVar("response_media_type", default=JSON_MEDIA_TYPE)
+
+
+def select_media_type(accept: Optional[str]) -> str:
+    """Выбор формата ответа по заголовку Accept (JSON по умолчанию)"""
+    if not accept:
+        return JSON_MEDIA_TYPE
+
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        parts = [part.strip() for part in item.split(";")]
+        media_type = parts[0].lower()
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0 and (media_type in _SUPPORTED_MEDIA_TYPES or media_type == JSON_MEDIA_TYPE):
+            candidates.append((-quality, position, media_type))
+
+    if not candidates:
+        return JSON_MEDIA_TYPE
+
+    media_type = min(candidates)[2]
+    return _SUPPORTED_MEDIA_TYPES.get(media_type, JSON_MEDIA_TYPE)
+
+
+async def negotiate_response_format(request: Request) -> str:
+    """Зависимость роутера: запоминает выбранный формат ответа для текущего запроса"""
+    media_type = select_media_type(request.headers.get("accept"))
+    _response_media_type.set(media_type)
+    return media_type
+
+
+def _to_table(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    columns = list(rows[0].keys()) if rows else []
+    return {"columns": columns, "rows": [[row.get(column) for column in columns] for row in rows]}
+
+
+def to_columnar(content: Any) -> Any:
+    """
+    Колоночное представление страницы списка.
+
+    Имена полей передаются один раз, а вложенные объекты с id (здания,
+    виды деятельности, телефоны) выносятся в общие таблицы страницы
+    и заменяются индексами строк в этих таблицах.
+    """
+    if not isinstance(content, list) or not all(isinstance(row, dict) for row in content):
+        return content
+
+    shared: Dict[str, Dict[str, Any]] = {}
+
+    def reference(field: str, value: Dict[str, Any]) -> Any:
+        if "id" not in value:
+            return value
+        table = shared.setdefault(field, {"index": {}, "rows": []})
+        key = value["id"]
+        if key not in table["index"]:
+            table["index"][key] = len(table["rows"])
+            table["rows"].append(value)
+        return table["index"][key]
+
+    rows = []
+    for row in content:
+        compact_row = {}
+        for field, value in row.items():
+            if isinstance(value, dict):
+                value = reference(field, value)
+            elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                value = [reference(field, item) for item in value]
+            compact_row[field] = value
+        rows.append(compact_row)
+
+    result = _to_table(rows)
+    result["tables"] = {field: _to_table(table["rows"]) for field, table in shared.items()}
+    return result
+
+
+class NegotiatedResponse(JSONResponse):
+    """Ответ, кодируемый в JSON или MessagePack согласно заголовку Accept"""
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+        background=None
+    ):
+        self.media_type = _response_media_type.get()
+        super().__init__(content, status_code, headers, media_type, background)
+        self.headers["Vary"] = "Accept"
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type in (COLUMNAR_JSON_MEDIA_TYPE, COLUMNAR_MSGPACK_MEDIA_TYPE):
+            content = to_columnar(content)
+
+        if self.media_type in (MSGPACK_MEDIA_TYPE, COLUMNAR_MSGPACK_MEDIA_TYPE):
+            return msgpack.packb(content, use_bin_type=True)
+
+        if self.media_type == COLUMNAR_JSON_MEDIA_TYPE:
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        return super().render(content)
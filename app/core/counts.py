@@ -0,0 +1,113 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.events import get_change_broadcaster
+
+EXACT = "exact"
+ESTIMATED = "estimated"
+COUNT_DESCRIPTION = (
+    "Вернуть общее число записей в заголовке X-Total-Count: exact - точно, "
+    "estimated - оценка планировщика, auto - точно для небольших таблиц"
+)
+
+_total_counter = None
+
+
+class TotalCounter:
+    """
+    Общее число записей для постраничных списков.
+
+    В режиме auto сначала берется оценка планировщика PostgreSQL (reltuples
+    для всей таблицы, строки плана EXPLAIN для выборки с фильтром); если она
+    меньше exact_threshold, число пересчитывается точно через COUNT(*).
+    Результат кэшируется на ttl по ключу фильтра и сбрасывается событиями
+    изменения соответствующей таблицы.
+    """
+
+    def __init__(self, exact_threshold: int = 100000, ttl_seconds: float = 10.0, max_entries: int = 1000):
+        self.exact_threshold = exact_threshold
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, Hashable], Tuple[float, int, str]]" = OrderedDict()
+
+    async def count(
+        self,
+        db: AsyncSession,
+        statement,
+        table: str,
+        filter_key: Hashable = None,
+        mode: str = "auto"
+    ) -> Tuple[int, str]:
+        """
+        Число строк statement и способ подсчета (exact или estimated).
+        filter_key - None для всей таблицы, иначе ключ фильтра выборки.
+        """
+        key = (table, filter_key)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic() and (mode != EXACT or cached[2] == EXACT):
+            self._cache.move_to_end(key)
+            return cached[1], cached[2]
+
+        total, kind = None, EXACT
+        if mode != EXACT and db.bind.dialect.name == "postgresql":
+            estimate = await self._estimate(db, statement, table if filter_key is None else None)
+            if estimate is not None and (mode == ESTIMATED or estimate >= self.exact_threshold):
+                total, kind = estimate, ESTIMATED
+        if total is None:
+            result = await db.execute(select(func.count()).select_from(statement.subquery()))
+            total = result.scalar_one()
+
+        self._cache[key] = (time.monotonic() + self.ttl, total, kind)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return total, kind
+
+    @staticmethod
+    async def _estimate(db: AsyncSession, statement, table: Optional[str]) -> Optional[int]:
+        if table is not None:
+            result = await db.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+            )
+            reltuples = result.scalar()
+            # -1: таблица еще не анализировалась
+            if reltuples is not None and reltuples >= 0:
+                return int(reltuples)
+
+        compiled = statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+        conn = await db.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def handle_event(self, event: Dict[str, Any]):
+        """Сброс закэшированных чисел таблицы, в которой произошло изменение"""
+        table = event.get("entity_type")
+        for key in [key for key in self._cache if key[0] == table]:
+            del self._cache[key]
+
+
+def get_total_counter() -> TotalCounter:
+    """Получение Singleton экземпляра подсчета общего числа записей"""
+    global _total_counter
+    if _total_counter is None:
+        settings = get_settings()
+        _total_counter = TotalCounter(
+            exact_threshold=settings.count_exact_threshold,
+            ttl_seconds=settings.count_cache_ttl_seconds,
+            max_entries=settings.count_cache_size
+        )
+        get_change_broadcaster().add_listener(_total_counter.handle_event)
+    return _total_counter
+
+
+def set_total_count_headers(response, total: Tuple[int, str]):
+    count, kind = total
+    response.headers["X-Total-Count"] = str(count)
+    response.headers["X-Total-Count-Type"] = kind
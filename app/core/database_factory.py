@@ -1,7 +1,12 @@
+import threading
 from abc import ABC, abstractmethod
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from app.core.engine_lifecycle import EngineHandle, EngineLifecycleManager
 from app.core.patterns import SingletonMeta
+from app.core.slow_query_log import SlowQueryLog
 
 
 class DatabaseFactory(ABC):
@@ -37,43 +42,101 @@ class PostgreSQLFactory(DatabaseFactory):
 
 
 
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """SET LOCAL statement_timeout из session.info в начале каждой транзакции PostgreSQL"""
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
 class DatabaseManager(metaclass=SingletonMeta):
-    """Singleton менеджер базы данных с поддержкой разных БД через фабрики"""
+    """
+    Singleton менеджер базы данных с поддержкой разных БД через фабрики.
+
+    Движок хранится в менеджере жизненного цикла под именем DEFAULT_ENGINE:
+    смена фабрики не теряет пул старого движка, а закрывает его после
+    завершения открытых на нем сессий.
+    """
+
+    DEFAULT_ENGINE = "default"
     
-    def __init__(self, factory: DatabaseFactory = None):
+    def __init__(self, factory: DatabaseFactory = None, slow_query_log: SlowQueryLog = None):
         if not hasattr(self, '_initialized'):
             self._factory = factory
-            self._engine = None
-            self._session_factory = None
+            self._slow_query_log = slow_query_log
+            self._lifecycle = EngineLifecycleManager()
+            self._lock = threading.Lock()
             self._initialized = True
 
     def set_factory(self, factory: DatabaseFactory):
-        """Установить фабрику БД"""
+        """Установить фабрику БД. Текущий движок закрывается после завершения его сессий"""
+        with self._lock:
+            self._factory = factory
+            handle = self._lifecycle.get(self.DEFAULT_ENGINE)
+            if handle is not None:
+                self._lifecycle.register(self.DEFAULT_ENGINE, self._create_engine(factory))
+
+    async def reconfigure(self, factory: DatabaseFactory, prewarm: int = 0, drain_timeout: float = 30.0):
+        """Переключиться на новую фабрику: прогреть новый движок, затем дождаться освобождения старого"""
+        engine = self._create_engine(factory)
         self._factory = factory
-        self._engine = None
-        self._session_factory = None
+        await self._lifecycle.swap(self.DEFAULT_ENGINE, engine, prewarm=prewarm, drain_timeout=drain_timeout)
+
+    async def start(self, prewarm: int = 0):
+        """Создать движок и открыть prewarm соединений пула заранее"""
+        await self._handle.prewarm(prewarm)
+
+    async def shutdown(self, drain_timeout: float = 30.0) -> bool:
+        """Дождаться завершения открытых сессий (не дольше drain_timeout) и закрыть пулы"""
+        return await self._lifecycle.shutdown(drain_timeout)
+
+    def _create_engine(self, factory: DatabaseFactory):
+        if factory is None:
+            raise ValueError("Database factory not set")
+        engine = create_async_engine(factory.get_database_url(), **factory.get_engine_kwargs())
+        if self._slow_query_log is not None:
+            self._slow_query_log.attach(engine)
+        return engine
+
+    @property
+    def _handle(self) -> EngineHandle:
+        handle = self._lifecycle.get(self.DEFAULT_ENGINE)
+        if handle is None:
+            with self._lock:
+                handle = self._lifecycle.get(self.DEFAULT_ENGINE)
+                if handle is None:
+                    handle = self._lifecycle.register(self.DEFAULT_ENGINE, self._create_engine(self._factory))
+        return handle
 
     @property
     def engine(self):
-        if self._engine is None:
-            if self._factory is None:
-                raise ValueError("Database factory not set")
-            
-            database_url = self._factory.get_database_url()
-            engine_kwargs = self._factory.get_engine_kwargs()
-            self._engine = create_async_engine(database_url, **engine_kwargs)
-        return self._engine
+        return self._handle.engine
+
+    @property
+    def lifecycle(self) -> EngineLifecycleManager:
+        return self._lifecycle
+
+    @property
+    def slow_query_log(self) -> SlowQueryLog:
+        return self._slow_query_log
+
+    @property
+    def pool_capacity(self) -> int:
+        """Максимальное число одновременных соединений пула"""
+        if self._factory is None:
+            raise ValueError("Database factory not set")
+        engine_kwargs = self._factory.get_engine_kwargs()
+        return engine_kwargs.get("pool_size", 5) + engine_kwargs.get("max_overflow", 10)
 
     @property
     def session_factory(self):
-        if self._session_factory is None:
-            self._session_factory = async_sessionmaker(
-                bind=self.engine,
-                class_=AsyncSession,
-                expire_on_commit=False
-            )
-        return self._session_factory
+        """Фабрика сессий, всегда открывающая сессию на текущем движке"""
+        return self._create_session
+
+    def _create_session(self, **kwargs) -> AsyncSession:
+        return self._handle.session_factory(**kwargs)
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
-            yield session
\ No newline at end of file
+            yield session
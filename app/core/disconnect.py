@@ -0,0 +1,54 @@
+import asyncio
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    ASGI middleware, отменяющий обработку запроса при отключении клиента.
+
+    Сообщения клиента читаются одной фоновой задачей и передаются приложению
+    через очередь на одно сообщение: следующий фрагмент тела читается, только
+    когда приложение забрало предыдущий, поэтому большое тело не копится в памяти.
+    Получив http.disconnect до завершения ответа, задача отменяет обработчик:
+    выполняющийся запрос asyncpg прерывается, а сессия закрывается и возвращает
+    соединение в пул. После отправки последней части ответа задача
+    останавливается и уже не отменяет обработчик (фоновые задачи ответа).
+    """
+
+    def __init__(self, app, path_prefix: str = "/api/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope.get("path", "").startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+        watcher = None
+
+        async def send_response(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                watcher.cancel()
+
+        handler = asyncio.ensure_future(self.app(scope, messages.get, send_response))
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    handler.cancel()
+                    if not messages.full():
+                        messages.put_nowait(message)
+                    return
+                await messages.put(message)
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not watcher.done() or watcher.cancelled():
+                raise
+        finally:
+            watcher.cancel()
+            handler.cancel()
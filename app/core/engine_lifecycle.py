@@ -0,0 +1,191 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+class TrackedSession(AsyncSession):
+    """Сессия, учитываемая в числе активных сессий своего движка до закрытия"""
+
+    def __init__(self, *args, engine_handle: Optional["EngineHandle"] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._engine_handle = engine_handle
+        if engine_handle is not None:
+            engine_handle.acquire()
+
+    @property
+    def engine_handle(self) -> Optional["EngineHandle"]:
+        return self._engine_handle
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            handle, self._engine_handle = self._engine_handle, None
+            if handle is not None:
+                handle.release()
+
+
+class EngineHandle:
+    """Движок с фабрикой сессий и счетчиком сессий, открытых через нее"""
+
+    def __init__(self, name: str, engine: AsyncEngine, generation: int):
+        self.name = name
+        self.engine = engine
+        self.generation = generation
+        self.in_flight = 0
+        self.state = "active"
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.session_factory = async_sessionmaker(
+            bind=engine,
+            class_=TrackedSession,
+            expire_on_commit=False,
+            engine_handle=self
+        )
+
+    def acquire(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def release(self):
+        self.in_flight -= 1
+        if self.in_flight <= 0:
+            self._idle.set()
+
+    async def prewarm(self, connections: int):
+        """Открыть до connections соединений заранее, чтобы первые запросы не ждали подключения"""
+        pool_size = getattr(self.engine.pool, "size", None)
+        if connections <= 0 or pool_size is None:
+            return
+        opened = await asyncio.gather(
+            *(self.engine.connect().start() for _ in range(min(connections, pool_size()))),
+            return_exceptions=True
+        )
+        warm = [conn for conn in opened if not isinstance(conn, BaseException)]
+        try:
+            for conn in warm:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            for conn in warm:
+                await conn.close()
+        errors = [conn for conn in opened if isinstance(conn, BaseException)]
+        if errors:
+            raise errors[0]
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Дождаться закрытия активных сессий (не дольше timeout) и закрыть пул.
+        Возвращает False, если сессии не закрылись вовремя.
+        """
+        self.state = "draining"
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            drained = True
+        except asyncio.TimeoutError:
+            drained = False
+        await self.engine.dispose()
+        self.state = "disposed"
+        return drained
+
+    def get_stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        checked_out = getattr(pool, "checkedout", None)
+        size = getattr(pool, "size", None)
+        return {
+            "name": self.name,
+            "generation": self.generation,
+            "state": self.state,
+            "in_flight_sessions": self.in_flight,
+            "pool_size": size() if size is not None else None,
+            "checked_out_connections": checked_out() if checked_out is not None else None,
+        }
+
+
+class EngineLifecycleManager:
+    """
+    Именованные движки БД.
+
+    Замена движка атомарна: новые сессии сразу открываются на новом движке,
+    а старый закрывается только после завершения уже открытых на нем сессий.
+    """
+
+    def __init__(self):
+        self._handles: Dict[str, EngineHandle] = {}
+        self._retiring: Set[EngineHandle] = set()
+        self._deferred: List[EngineHandle] = []
+        self._drain_tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, name: str) -> Optional[EngineHandle]:
+        return self._handles.get(name)
+
+    def register(self, name: str, engine: AsyncEngine) -> EngineHandle:
+        """Установить движок под именем. Прежний движок (если был) выводится из работы"""
+        with self._lock:
+            self._generation += 1
+            handle = EngineHandle(name, engine, self._generation)
+            previous = self._handles.get(name)
+            self._handles[name] = handle
+        if previous is not None:
+            self.retire(previous)
+        return handle
+
+    async def swap(self, name: str, engine: AsyncEngine, prewarm: int = 0, drain_timeout: float = 30.0) -> EngineHandle:
+        """Прогреть новый движок, переключить на него имя и дождаться освобождения старого"""
+        with self._lock:
+            self._generation += 1
+            handle = EngineHandle(name, engine, self._generation)
+        try:
+            await handle.prewarm(prewarm)
+        except Exception:
+            await engine.dispose()
+            raise
+
+        with self._lock:
+            previous = self._handles.get(name)
+            self._handles[name] = handle
+        if previous is not None:
+            self._retiring.add(previous)
+            try:
+                await previous.drain(drain_timeout)
+            finally:
+                self._retiring.discard(previous)
+        return handle
+
+    def retire(self, handle: EngineHandle, drain_timeout: float = 30.0):
+        """
+        Вывести движок из работы в фоне. Без цикла событий соединения закрыть
+        нельзя, поэтому движок закрывается при следующем shutdown.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            with self._lock:
+                self._deferred.append(handle)
+            self._retiring.add(handle)
+            handle.state = "retired"
+            return
+
+        self._retiring.add(handle)
+        task = loop.create_task(handle.drain(drain_timeout))
+        self._drain_tasks.add(task)
+        task.add_done_callback(lambda done: (self._drain_tasks.discard(done), self._retiring.discard(handle)))
+
+    async def shutdown(self, drain_timeout: float = 30.0) -> bool:
+        """Дождаться сессий всех движков и закрыть их. False, если кто-то не успел"""
+        with self._lock:
+            handles = list(self._handles.values()) + self._deferred
+            self._handles.clear()
+            self._deferred = []
+        results = await asyncio.gather(*(handle.drain(drain_timeout) for handle in handles))
+        if self._drain_tasks:
+            await asyncio.gather(*self._drain_tasks, return_exceptions=True)
+        self._retiring.difference_update(handles)
+        return all(results)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        handles = list(self._handles.values()) + list(self._retiring)
+        return [handle.get_stats() for handle in handles]
@@ -0,0 +1,201 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from app.core.config import get_settings
+
+LAGGED = object()
+
+_change_broadcaster = None
+
+
+def entity_payload(entity) -> Dict[str, Any]:
+    """Данные сущности, передаваемые в событии изменения"""
+    table = entity.__tablename__
+    if table == "organizations":
+        building = entity.__dict__.get("building")
+        activities = entity.__dict__.get("activities") or []
+        return {
+            "name": entity.name,
+            "building_id": entity.building_id,
+            "latitude": building.latitude if building is not None else None,
+            "longitude": building.longitude if building is not None else None,
+            "activity_ids": [activity.id for activity in activities],
+        }
+    if table == "buildings":
+        return {"address": entity.address, "latitude": entity.latitude, "longitude": entity.longitude}
+    if table == "activities":
+        return {"name": entity.name, "parent_id": entity.parent_id, "level": entity.level}
+    if table == "phones":
+        return {"number": entity.number}
+    return {}
+
+
+def build_event(change, entity) -> Dict[str, Any]:
+    return {
+        "id": change.id,
+        "entity_type": change.entity_type,
+        "entity_id": change.entity_id,
+        "operation": change.operation,
+        "data": entity_payload(entity) if entity is not None else {},
+    }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['entity_type']}\ndata: {data}\n\n"
+
+
+class EventFilter:
+    """
+    Фильтр событий подписчика.
+
+    Фильтр по поддереву деятельности пропускает организации с видами деятельности
+    из поддерева и сами виды деятельности поддерева, географический - организации
+    и здания внутри прямоугольника. При заданных фильтрах остальные события отбрасываются.
+    """
+
+    def __init__(
+        self,
+        entity_types: Optional[Iterable[str]] = None,
+        activity_ids: Optional[Iterable[int]] = None,
+        min_latitude: Optional[float] = None,
+        max_latitude: Optional[float] = None,
+        min_longitude: Optional[float] = None,
+        max_longitude: Optional[float] = None
+    ):
+        self.entity_types: Optional[Set[str]] = set(entity_types) if entity_types else None
+        self.activity_ids: Optional[Set[int]] = set(activity_ids) if activity_ids is not None else None
+        self.box = (min_latitude, max_latitude, min_longitude, max_longitude)
+        self.has_box = any(bound is not None for bound in self.box)
+
+    def observe(self, event: Dict[str, Any]):
+        """Расширение поддерева при создании дочерних видов деятельности"""
+        if self.activity_ids is not None and event["entity_type"] == "activities":
+            if event["data"].get("parent_id") in self.activity_ids:
+                self.activity_ids.add(event["entity_id"])
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        entity_type = event["entity_type"]
+        data = event["data"]
+
+        if self.entity_types is not None and entity_type not in self.entity_types:
+            return False
+
+        if self.activity_ids is not None:
+            if entity_type == "organizations":
+                if not self.activity_ids.intersection(data.get("activity_ids", [])):
+                    return False
+            elif entity_type == "activities":
+                if event["entity_id"] not in self.activity_ids:
+                    return False
+            else:
+                return False
+
+        if self.has_box:
+            if entity_type not in ("organizations", "buildings"):
+                return False
+            if not self._in_box(data.get("latitude"), data.get("longitude")):
+                return False
+
+        return True
+
+    def _in_box(self, latitude: Optional[float], longitude: Optional[float]) -> bool:
+        if latitude is None or longitude is None:
+            return False
+        min_latitude, max_latitude, min_longitude, max_longitude = self.box
+        return (
+            (min_latitude is None or latitude >= min_latitude)
+            and (max_latitude is None or latitude <= max_latitude)
+            and (min_longitude is None or longitude >= min_longitude)
+            and (max_longitude is None or longitude <= max_longitude)
+        )
+
+
+class SeenEvents:
+    """Id последних отданных подписчику событий для отбрасывания повторов"""
+
+    def __init__(self, maxlen: int = 10000):
+        self._order: deque = deque()
+        self._ids: Set[int] = set()
+        self._maxlen = maxlen
+
+    def add(self, event_id: int) -> bool:
+        """Запомнить id; False, если событие уже было отдано"""
+        if event_id in self._ids:
+            return False
+        self._ids.add(event_id)
+        self._order.append(event_id)
+        if len(self._order) > self._maxlen:
+            self._ids.discard(self._order.popleft())
+        return True
+
+
+class ChangeBroadcaster:
+    """
+    Внутрипроцессная рассылка событий создания всем подписчикам.
+
+    Последние события хранятся в кольцевом буфере для быстрого возобновления
+    по токену. Подписчик, не успевающий читать, получает отметку LAGGED
+    и догоняет пропущенное по журналу изменений.
+    """
+
+    def __init__(self, buffer_size: int = 1000, subscriber_queue_size: int = 1000):
+        self._recent: deque = deque(maxlen=buffer_size)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._subscriber_queue_size = subscriber_queue_size
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self._subscriber_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Синхронный обработчик, вызываемый для каждого события (внутренние индексы и кэши)"""
+        self._listeners.append(listener)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: Dict[str, Any]):
+        self._recent.append(event)
+        for listener in self._listeners:
+            listener(event)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._mark_lagged(queue)
+
+    def recent_since(self, since: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        События после токена из буфера или None, если токена в буфере уже нет.
+
+        События публикуются в порядке фиксации, а id выдаются при вставке, поэтому
+        отдается все, что опубликовано после события с id токена, а не id больше токена.
+        """
+        events = list(self._recent)
+        for position in range(len(events) - 1, -1, -1):
+            if events[position]["id"] == since:
+                return events[position + 1:]
+        return None
+
+    @staticmethod
+    def _mark_lagged(queue: asyncio.Queue):
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(LAGGED)
+
+
+def get_change_broadcaster() -> ChangeBroadcaster:
+    """Получение Singleton экземпляра рассылки событий"""
+    global _change_broadcaster
+    if _change_broadcaster is None:
+        settings = get_settings()
+        _change_broadcaster = ChangeBroadcaster(settings.event_buffer_size, settings.event_subscriber_queue_size)
+    return _change_broadcaster
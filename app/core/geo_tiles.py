@@ -0,0 +1,202 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.events import get_change_broadcaster
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Организация в тайле: (id, широта, долгота) - координат достаточно для точного отбора без БД
+TileEntry = Tuple[int, float, float]
+# Границы тайла: (min_lat, max_lat, min_lon, max_lon)
+Bounds = Tuple[float, float, float, float]
+
+_geo_tile_cache = None
+
+
+def _grid(precision: int) -> Tuple[int, int]:
+    """Число ячеек geohash заданной точности по широте и по долготе"""
+    bits = 5 * precision
+    return 2 ** (bits // 2), 2 ** ((bits + 1) // 2)
+
+
+def _cell(latitude: float, longitude: float, precision: int) -> Tuple[int, int]:
+    rows, columns = _grid(precision)
+    row = min(int((latitude + 90.0) / 180.0 * rows), rows - 1)
+    column = min(int((longitude + 180.0) / 360.0 * columns), columns - 1)
+    return max(row, 0), max(column, 0)
+
+
+def _cell_geohash(row: int, column: int, precision: int) -> str:
+    # Биты geohash чередуются начиная с долготы, от старших к младшим
+    bits = 5 * precision
+    latitude_bits, longitude_bits = bits // 2, (bits + 1) // 2
+    value = 0
+    for position in range(bits):
+        if position % 2 == 0:
+            bit = (column >> (longitude_bits - 1 - position // 2)) & 1
+        else:
+            bit = (row >> (latitude_bits - 1 - position // 2)) & 1
+        value = (value << 1) | bit
+    return "".join(BASE32[(value >> shift) & 31] for shift in range(bits - 5, -1, -5))
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int) -> str:
+    return _cell_geohash(*_cell(latitude, longitude, precision), precision)
+
+
+def covering_tiles(bounds: Bounds, precision: int, max_tiles: int) -> Optional[Dict[str, Bounds]]:
+    """Тайлы, покрывающие прямоугольник, с их границами. None, если тайлов больше max_tiles"""
+    min_latitude, max_latitude, min_longitude, max_longitude = bounds
+    first_row, first_column = _cell(min_latitude, min_longitude, precision)
+    last_row, last_column = _cell(max_latitude, max_longitude, precision)
+    if (last_row - first_row + 1) * (last_column - first_column + 1) > max_tiles:
+        return None
+
+    rows, columns = _grid(precision)
+    height, width = 180.0 / rows, 360.0 / columns
+    return {
+        _cell_geohash(row, column, precision): (
+            row * height - 90.0, (row + 1) * height - 90.0,
+            column * width - 180.0, (column + 1) * width - 180.0
+        )
+        for row in range(first_row, last_row + 1)
+        for column in range(first_column, last_column + 1)
+    }
+
+
+class GeoTileCache:
+    """
+    Кэш организаций по тайлам geohash для географического поиска.
+
+    Запрос приводится к набору тайлов заданной точности, поэтому близкие
+    координаты разных клиентов попадают в одни и те же записи кэша. Недостающие
+    тайлы загружаются одним запросом к документам организаций; точный отбор по
+    радиусу или прямоугольнику выполняет вызывающий. Тайл сбрасывается событием
+    создания здания или организации в нем, остальное ограничено ttl.
+    """
+
+    def __init__(self, precision: int = 5, max_tiles: int = 256, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.precision = precision
+        self.max_tiles = max_tiles
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._tiles: "OrderedDict[str, Tuple[float, List[TileEntry]]]" = OrderedDict()
+        # Версии сброса тайлов: загрузка, начатая до сброса, не должна записать устаревшие данные
+        self._version = 0
+        self._invalidated: Dict[str, int] = {}
+        self._cleared_at = -1
+        self._loads_in_flight = 0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    async def candidates(self, db: AsyncSession, bounds: Bounds) -> Optional[List[TileEntry]]:
+        """Организации всех тайлов, покрывающих прямоугольник. None, если область слишком велика для кэша"""
+        tiles = covering_tiles(bounds, self.precision, self.max_tiles)
+        if tiles is None:
+            return None
+
+        now = time.monotonic()
+        entries: List[TileEntry] = []
+        missing: Dict[str, Bounds] = {}
+        for tile, tile_bounds in tiles.items():
+            cached = self._tiles.get(tile)
+            if cached is not None and cached[0] > now:
+                self._tiles.move_to_end(tile)
+                entries.extend(cached[1])
+            else:
+                missing[tile] = tile_bounds
+        self._hits += len(tiles) - len(missing)
+        self._misses += len(missing)
+
+        if missing:
+            loaded = await self._load(db, missing)
+            for tile_entries in loaded.values():
+                entries.extend(tile_entries)
+        return entries
+
+    async def _load(self, db: AsyncSession, tiles: Dict[str, Bounds]) -> Dict[str, List[TileEntry]]:
+        from app.models.models import OrganizationDocument
+
+        version = self._version
+        self._loads_in_flight += 1
+        try:
+            # Один запрос по объемлющему прямоугольнику; лишние точки отсекаются по тайлу
+            query = select(
+                OrganizationDocument.organization_id, OrganizationDocument.latitude, OrganizationDocument.longitude
+            ).where(
+                OrganizationDocument.latitude >= min(bounds[0] for bounds in tiles.values()),
+                OrganizationDocument.latitude <= max(bounds[1] for bounds in tiles.values()),
+                OrganizationDocument.longitude >= min(bounds[2] for bounds in tiles.values()),
+                OrganizationDocument.longitude <= max(bounds[3] for bounds in tiles.values()),
+            )
+            loaded: Dict[str, List[TileEntry]] = {tile: [] for tile in tiles}
+            for organization_id, latitude, longitude in await db.execute(query):
+                tile = encode_geohash(latitude, longitude, self.precision)
+                if tile in loaded:
+                    loaded[tile].append((organization_id, latitude, longitude))
+        finally:
+            self._loads_in_flight -= 1
+
+        expires = time.monotonic() + self.ttl
+        for tile, tile_entries in loaded.items():
+            if self._cleared_at < version and self._invalidated.get(tile, -1) < version:
+                self._tiles[tile] = (expires, tile_entries)
+                self._tiles.move_to_end(tile)
+        while len(self._tiles) > self.max_entries:
+            self._tiles.popitem(last=False)
+        if not self._loads_in_flight:
+            self._invalidated.clear()
+        return loaded
+
+    def invalidate_point(self, latitude: float, longitude: float):
+        tile = encode_geohash(latitude, longitude, self.precision)
+        self._tiles.pop(tile, None)
+        if self._loads_in_flight:
+            self._invalidated[tile] = self._version
+        self._version += 1
+        self._invalidations += 1
+
+    def handle_event(self, event: Dict[str, Any]):
+        """Сброс тайла созданного здания или организации"""
+        if event.get("entity_type") not in ("buildings", "organizations"):
+            return
+        data = event.get("data") or {}
+        if data.get("latitude") is None or data.get("longitude") is None:
+            # Координаты неизвестны - тайл не определить, сбрасывается весь кэш
+            self.clear()
+            return
+        self.invalidate_point(data["latitude"], data["longitude"])
+
+    def clear(self):
+        self._tiles.clear()
+        self._cleared_at = self._version
+        self._version += 1
+        self._invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "precision": self.precision,
+            "tiles": len(self._tiles),
+            "hits": self._hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+        }
+
+
+def get_geo_tile_cache() -> GeoTileCache:
+    """Получение Singleton экземпляра кэша тайлов географического поиска"""
+    global _geo_tile_cache
+    if _geo_tile_cache is None:
+        settings = get_settings()
+        _geo_tile_cache = GeoTileCache(
+            precision=settings.geo_tile_precision,
+            max_tiles=settings.geo_tile_max_tiles,
+            max_entries=settings.geo_tile_cache_size,
+            ttl_seconds=settings.geo_tile_cache_ttl_seconds
+        )
+        get_change_broadcaster().add_listener(_geo_tile_cache.handle_event)
+    return _geo_tile_cache
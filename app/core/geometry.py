@@ -0,0 +1,87 @@
+from typing import Sequence, Tuple
+import numpy as np
+
+# Полигон в порядке GeoJSON: список колец [[lon, lat], ...], первое кольцо внешнее, остальные - дыры
+Polygon = Sequence[Sequence[Sequence[float]]]
+
+
+def _ring_array(ring) -> np.ndarray:
+    # Высота (третья координата GeoJSON) не учитывается
+    return np.asarray([position[:2] for position in ring], dtype=float)
+
+
+def bounding_box(polygons: Sequence[Polygon]) -> Tuple[float, float, float, float]:
+    """Ограничивающий прямоугольник внешних колец: (min_lat, max_lat, min_lon, max_lon)"""
+    exteriors = np.concatenate([_ring_array(polygon[0]) for polygon in polygons])
+    return (
+        float(exteriors[:, 1].min()),
+        float(exteriors[:, 1].max()),
+        float(exteriors[:, 0].min()),
+        float(exteriors[:, 0].max()),
+    )
+
+
+def _points_in_ring(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    ring: np.ndarray,
+    max_matrix_size: int
+) -> np.ndarray:
+    # Метод луча: матрица точек x ребер кольца, блоками не больше max_matrix_size ячеек
+    x1, y1 = ring[:-1, 0], ring[:-1, 1]
+    x2, y2 = ring[1:, 0], ring[1:, 1]
+    inside = np.zeros(len(latitudes), dtype=bool)
+    chunk_size = max(1, max_matrix_size // max(1, len(x1)))
+
+    for start in range(0, len(latitudes), chunk_size):
+        px = longitudes[start:start + chunk_size, None]
+        py = latitudes[start:start + chunk_size, None]
+        crosses = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            intersection_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        inside[start:start + chunk_size] = np.logical_xor.reduce(crosses & (px < intersection_x), axis=1)
+    return inside
+
+
+def points_in_polygons(
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+    polygons: Sequence[Polygon],
+    max_matrix_size: int = 2_000_000
+) -> np.ndarray:
+    """
+    Маска точек, попавших хотя бы в один полигон.
+
+    Внутри полигона действует правило четности по всем кольцам,
+    поэтому точки в дырах исключаются.
+    """
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    inside = np.zeros(len(latitudes), dtype=bool)
+    if not len(latitudes):
+        return inside
+
+    for polygon in polygons:
+        in_polygon = np.zeros(len(latitudes), dtype=bool)
+        for ring in polygon:
+            in_polygon ^= _points_in_ring(latitudes, longitudes, _ring_array(ring), max_matrix_size)
+        inside |= in_polygon
+    return inside
+
+
+# Километров в градусе: та же плоская аппроксимация, что и в поиске по радиусу
+KM_PER_DEGREE = 111.32
+
+
+def distances_km(
+    point_latitudes: Sequence[float],
+    point_longitudes: Sequence[float],
+    latitudes: Sequence[float],
+    longitudes: Sequence[float]
+) -> np.ndarray:
+    """Матрица расстояний точки x объекты в километрах"""
+    point_latitudes = np.asarray(point_latitudes, dtype=float)[:, None]
+    point_longitudes = np.asarray(point_longitudes, dtype=float)[:, None]
+    latitudes = np.asarray(latitudes, dtype=float)[None, :]
+    longitudes = np.asarray(longitudes, dtype=float)[None, :]
+    return np.hypot(latitudes - point_latitudes, longitudes - point_longitudes) * KM_PER_DEGREE
@@ -0,0 +1,8 @@
+import re
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_name(name: str) -> str:
+    """Нормализация названия: нижний регистр, ё -> е, без пунктуации и лишних пробелов"""
+    return _NON_WORD.sub(" ", name.lower().replace("ё", "е")).strip()
@@ -0,0 +1,92 @@
+import base64
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+from sqlalchemy import case, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_SEARCH_LIMIT = 1000
+CURSOR_DESCRIPTION = "Курсор следующей страницы из заголовка X-Next-Cursor предыдущего ответа"
+
+
+@dataclass
+class SearchPage:
+    """Страница результатов поиска и курсор следующей страницы (None - страниц больше нет)"""
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    data = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _cursor_value(value: Any, expected: type) -> Any:
+    # bool - подкласс int, но в ключах сортировки не встречается; int допустим вместо float
+    if isinstance(value, bool):
+        raise ValueError("Invalid cursor")
+    if expected is float and isinstance(value, (int, float)) and math.isfinite(value):
+        return float(value)
+    if expected is not float and isinstance(value, expected):
+        return value
+    raise ValueError("Invalid cursor")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """
+    Значения ключа сортировки из курсора, types - ожидаемый тип каждого значения.
+    ValueError, если курсор поврежден или от другого поиска.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    return [_cursor_value(value, expected) for value, expected in zip(values, types)]
+
+
+def relevance_keys(column, query: str, id_column) -> List[Any]:
+    """
+    Ключ сортировки текстового поиска: точное совпадение, затем совпадение
+    с начала строки, затем вхождение; внутри группы - более короткие строки.
+    """
+    rank = case((column.ilike(query), 0), (column.ilike(f"{query}%"), 1), else_=2)
+    return [rank, func.length(column), id_column]
+
+
+# Типы значений ключа relevance_keys в курсоре
+RELEVANCE_KEY_TYPES = (int, int, int)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query,
+    sort_keys: Sequence[Any],
+    key_types: Sequence[type],
+    limit: int,
+    cursor: Optional[str] = None
+) -> SearchPage:
+    """
+    Первые limit строк запроса по ключу сортировки, вычисленному в БД.
+
+    Страницы разбиваются по ключу (keyset): следующая страница начинается
+    строго после ключа последней строки, поэтому глубина листания не влияет
+    на стоимость запроса. Последним элементом ключа должен быть id,
+    key_types - типы значений ключа для проверки курсора.
+    """
+    if cursor:
+        query = query.where(tuple_(*sort_keys) > tuple_(*decode_cursor(cursor, key_types)))
+    query = query.add_columns(*sort_keys).order_by(*sort_keys).limit(limit + 1)
+
+    # Уникальность по ключу сортировки: выбираемые значения (JSON) могут быть нехэшируемыми
+    rows = (await db.execute(query)).unique(lambda row: tuple(row[1:])).all()
+    next_cursor = encode_cursor(rows[limit - 1][1:]) if len(rows) > limit else None
+    return SearchPage([row[0] for row in rows[:limit]], next_cursor)
+
+
+def set_next_cursor_header(response, page: SearchPage):
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
@@ -1,3 +1,4 @@
+import threading
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, List, AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
@@ -7,16 +8,26 @@ from app.core.config import get_settings
 
 class SingletonMeta(type):
     _instances: Dict[type, Any] = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
+            with cls._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
 
 class BaseService(ABC):
+    def __init_subclass__(cls, **kwargs):
+        """Публичные async методы сервисов выполняются в спанах трассировки"""
+        super().__init_subclass__(**kwargs)
+        from app.core.tracing import instrument_methods
+        instrument_methods(cls)
+
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
+        self._pending_changes = []
 
     @abstractmethod
     async def get_all(self, **kwargs):
@@ -30,10 +41,34 @@ class BaseService(ABC):
     def get_model_class(self):
         pass
 
+    async def count_all(self, mode: str = "auto"):
+        """Общее число записей таблицы: (число, exact или estimated)"""
+        from app.core.counts import get_total_counter
+        from sqlalchemy import select
+
+        model = self.get_model_class()
+        return await get_total_counter().count(self.db, select(model.id), model.__tablename__, mode=mode)
+
     async def create_entity(self, entity_data, **kwargs):
         await self._validate_creation_data(entity_data)
         entity = await self._build_entity(entity_data, **kwargs)
         await self._save_entity(entity)
+        entity = await self._post_creation_hook(entity)
+        self.publish_changes()
+        return entity
+
+    async def stage_entity(self, entity_data, **kwargs):
+        """Создание сущности без фиксации транзакции (для пакетной записи)"""
+        await self._validate_creation_data(entity_data)
+        entity = await self._build_entity(entity_data, **kwargs)
+        self.db.add(entity)
+        await self.db.flush()
+        await self._record_change(entity)
+        return entity
+
+    async def finish_entity(self, entity):
+        """Загрузка сущности после фиксации пакета, в котором она была создана"""
+        await self.db.refresh(entity)
         return await self._post_creation_hook(entity)
 
     async def _validate_creation_data(self, entity_data):
@@ -45,9 +80,31 @@ class BaseService(ABC):
 
     async def _save_entity(self, entity):
         self.db.add(entity)
+        await self.db.flush()
+        await self._record_change(entity)
         await self.db.commit()
         await self.db.refresh(entity)
 
+    async def _record_change(self, entity, operation: str = "create"):
+        """Запись в журнал изменений в той же транзакции, что и сама сущность"""
+        from app.models.models import ChangeLog
+
+        change = ChangeLog(entity_type=entity.__tablename__, entity_id=entity.id, operation=operation)
+        self.db.add(change)
+        self._pending_changes.append((change, entity))
+
+    def publish_changes(self):
+        """Рассылка подписчикам изменений, зафиксированных в базе"""
+        from app.core.events import get_change_broadcaster, build_event
+
+        broadcaster = get_change_broadcaster()
+        for change, entity in self._pending_changes:
+            broadcaster.publish(build_event(change, entity))
+        self._pending_changes = []
+
+    def discard_changes(self):
+        self._pending_changes = []
+
     async def _post_creation_hook(self, entity):
         return entity
 
@@ -65,8 +122,21 @@ class ServiceFactory(ABC):
     def create_activity_service(self, db_session: AsyncSession):
         pass
 
+    @abstractmethod
+    def create_change_service(self, db_session: AsyncSession):
+        pass
+
+    @abstractmethod
+    def create_autocomplete_service(self, db_session: AsyncSession):
+        pass
+
 
 class SearchStrategy(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        from app.core.tracing import instrument_methods
+        instrument_methods(cls, ["execute_search"])
+
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
     
@@ -74,87 +144,448 @@ class SearchStrategy(ABC):
     async def execute_search(self, **kwargs):
         pass
 
+    def _organizations_query(self):
+        """
+        Выборка организаций для поиска: ORM сущности со связями или, на пути
+        чтения core, готовые к ответу JSON строки одним запросом (с зданием).
+        """
+        from app.core.read_paths import organization_rows, use_core
+        from app.models.models import Organization
+        from sqlalchemy.orm import joinedload, selectinload
+        from sqlalchemy import select
+
+        if use_core(self.db):
+            return organization_rows(self.db.bind.dialect.name)
+        return select(Organization).options(
+            joinedload(Organization.building),
+            selectinload(Organization.phones),
+            selectinload(Organization.activities)
+        )
+
+    @abstractmethod
+    async def matching_ids(self, **kwargs):
+        """Запрос id всех найденных организаций без пагинации (для фасетов и общего числа)"""
+        pass
+
+    async def count_matches(self, mode: str = "auto", **kwargs):
+        """
+        Общее число найденных организаций: (число, exact или estimated).
+        Кэшируется по стратегии и параметрам поиска (строки без учета регистра, как в ilike).
+        """
+        from app.core.counts import get_total_counter
+        from app.core.single_flight import _freeze
+        from app.models.models import Organization
+
+        filter_key = (type(self).__name__,) + tuple(sorted(
+            (name, value.casefold() if isinstance(value, str) else _freeze(value)) for name, value in kwargs.items()
+        ))
+        return await get_total_counter().count(
+            self.db, await self.matching_ids(**kwargs), Organization.__tablename__, filter_key=filter_key, mode=mode
+        )
+
+    async def activity_facets(self, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Число найденных организаций по видам деятельности одним агрегирующим запросом.
+
+        Организация учитывается во всех предках своих видов деятельности,
+        но не более одного раза в каждом из них.
+        """
+        from app.models.models import Activity, organization_activity_association
+        from sqlalchemy import select, func
+        
+        ancestors = select(
+            Activity.id.label("activity_id"),
+            Activity.id.label("ancestor_id"),
+            Activity.parent_id.label("parent_id")
+        ).cte("activity_ancestors", recursive=True)
+        ancestors = ancestors.union_all(
+            select(ancestors.c.activity_id, Activity.id, Activity.parent_id)
+            .join(Activity, Activity.id == ancestors.c.parent_id)
+        )
+
+        organization_id = organization_activity_association.c.organization_id
+        count = func.count(organization_id.distinct()).label("count")
+        query = select(Activity.id, Activity.name, Activity.parent_id, Activity.level, count).join(
+            ancestors, ancestors.c.ancestor_id == Activity.id
+        ).join(
+            organization_activity_association,
+            organization_activity_association.c.activity_id == ancestors.c.activity_id
+        ).where(
+            organization_id.in_(await self.matching_ids(**kwargs))
+        ).group_by(
+            Activity.id, Activity.name, Activity.parent_id, Activity.level
+        ).order_by(count.desc(), Activity.name)
+        
+        result = await self.db.execute(query)
+        return [dict(row._mapping) for row in result]
+
 
 class GeographicSearchStrategy(SearchStrategy):
-    async def execute_search(self, latitude: float, longitude: float, 
-                           radius: Optional[float] = None, 
+    async def execute_search(self, latitude: float, longitude: float,
+                             radius: Optional[float] = None,
+                             min_latitude: Optional[float] = None,
+                             max_latitude: Optional[float] = None,
+                             min_longitude: Optional[float] = None,
+                             max_longitude: Optional[float] = None,
+                             limit: int = 100, cursor: Optional[str] = None, **kwargs):
+        from app.core.pagination import fetch_page
+        from app.core.read_paths import use_core
+        from app.models.models import Organization
+        
+        query = self._organizations_query()
+        if not use_core(self.db):
+            query = query.join(Organization.building)
+        query = query.where(*self._conditions(
+            latitude, longitude, radius, min_latitude, max_latitude, min_longitude, max_longitude
+        ))
+        
+        # Ближайшие к центру первыми, в том числе при поиске в прямоугольнике
+        sort_keys = [self._distance(latitude, longitude), Organization.id]
+        return await fetch_page(self.db, query, sort_keys, (float, int), limit, cursor)
+
+    async def matching_ids(self, latitude: float, longitude: float,
+                           radius: Optional[float] = None,
                            min_latitude: Optional[float] = None,
                            max_latitude: Optional[float] = None,
                            min_longitude: Optional[float] = None,
                            max_longitude: Optional[float] = None, **kwargs):
-        from app.models.models import Organization, Building
-        from sqlalchemy.orm import joinedload, selectinload
-        from sqlalchemy import select, func, and_
+        from app.models.models import Organization
+        from sqlalchemy import select
         
-        query = select(Organization).options(
-            joinedload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities)
-        ).join(Organization.building)
+        return select(Organization.id).join(Organization.building).where(*self._conditions(
+            latitude, longitude, radius, min_latitude, max_latitude, min_longitude, max_longitude
+        ))
+
+    @staticmethod
+    def _distance(latitude: float, longitude: float):
+        from app.models.models import Building
+        from sqlalchemy import func
         
+        return func.sqrt(
+            func.pow(Building.latitude - latitude, 2) + 
+            func.pow(Building.longitude - longitude, 2)
+        ) * 111.32
+
+    @classmethod
+    def _conditions(cls, latitude, longitude, radius, min_latitude, max_latitude, min_longitude, max_longitude) -> list:
+        from app.models.models import Building
+        
+        if radius is not None:
+            return [cls._distance(latitude, longitude) <= radius]
+
+        conditions = []
+        if min_latitude is not None:
+            conditions.append(Building.latitude >= min_latitude)
+        if max_latitude is not None:
+            conditions.append(Building.latitude <= max_latitude)
+        if min_longitude is not None:
+            conditions.append(Building.longitude >= min_longitude)
+        if max_longitude is not None:
+            conditions.append(Building.longitude <= max_longitude)
+        return conditions
+
+
+class TiledGeographicSearchStrategy(GeographicSearchStrategy):
+    """
+    Географический поиск через кэш тайлов: кандидаты берутся из тайлов,
+    покрывающих область, и точно отбираются по радиусу или прямоугольнику.
+    Слишком большие области ищутся напрямую в БД.
+    """
+
+    def __init__(self, db_session: AsyncSession, tile_cache):
+        super().__init__(db_session)
+        self.tile_cache = tile_cache
+
+    async def execute_search(self, latitude: float, longitude: float,
+                             radius: Optional[float] = None,
+                             min_latitude: Optional[float] = None,
+                             max_latitude: Optional[float] = None,
+                             min_longitude: Optional[float] = None,
+                             max_longitude: Optional[float] = None,
+                             limit: int = 100, cursor: Optional[str] = None, **kwargs):
+        from app.core.geometry import KM_PER_DEGREE, distances_km
+        from app.core.pagination import SearchPage, decode_cursor, encode_cursor
+        from app.core.read_paths import use_core
+        from app.models.models import OrganizationDocument
+        from app.schemas.schemas import Organization as OrganizationSchema
+        from sqlalchemy import select
+        import numpy as np
+
         if radius is not None:
-            distance_formula = func.sqrt(
-                func.pow(Building.latitude - latitude, 2) + 
-                func.pow(Building.longitude - longitude, 2)
-            ) * 111.32
-            query = query.where(distance_formula <= radius)
+            delta = radius / KM_PER_DEGREE
+            bounds = (latitude - delta, latitude + delta, longitude - delta, longitude + delta)
         else:
-            conditions = []
-            if min_latitude is not None:
-                conditions.append(Building.latitude >= min_latitude)
-            if max_latitude is not None:
-                conditions.append(Building.latitude <= max_latitude)
-            if min_longitude is not None:
-                conditions.append(Building.longitude >= min_longitude)
-            if max_longitude is not None:
-                conditions.append(Building.longitude <= max_longitude)
-            
-            if conditions:
-                query = query.where(and_(*conditions))
-        
-        result = await self.db.execute(query)
-        return result.scalars().unique().all()
+            bounds = (
+                min_latitude if min_latitude is not None else -90.0,
+                max_latitude if max_latitude is not None else 90.0,
+                min_longitude if min_longitude is not None else -180.0,
+                max_longitude if max_longitude is not None else 180.0,
+            )
+        after = tuple(decode_cursor(cursor, (float, int))) if cursor else None
 
+        candidates = await self.tile_cache.candidates(self.db, bounds)
+        if candidates is None:
+            return await super().execute_search(
+                latitude=latitude, longitude=longitude, radius=radius,
+                min_latitude=min_latitude, max_latitude=max_latitude,
+                min_longitude=min_longitude, max_longitude=max_longitude,
+                limit=limit, cursor=cursor
+            )
+        if not candidates:
+            return SearchPage()
 
-class NameSearchStrategy(SearchStrategy):
-    async def execute_search(self, name: str, **kwargs):
+        ids = np.fromiter((entry[0] for entry in candidates), dtype=np.int64, count=len(candidates))
+        latitudes = np.fromiter((entry[1] for entry in candidates), dtype=float, count=len(candidates))
+        longitudes = np.fromiter((entry[2] for entry in candidates), dtype=float, count=len(candidates))
+        distances = distances_km([latitude], [longitude], latitudes, longitudes)[0]
+
+        if radius is not None:
+            mask = distances <= radius
+        else:
+            mask = (
+                (latitudes >= bounds[0]) & (latitudes <= bounds[1]) &
+                (longitudes >= bounds[2]) & (longitudes <= bounds[3])
+            )
+        if after is not None:
+            mask &= (distances > after[0]) | ((distances == after[0]) & (ids > after[1]))
+
+        matched = np.flatnonzero(mask)
+        order = matched[np.lexsort((ids[matched], distances[matched]))][:limit + 1]
+        page_ids = [int(organization_id) for organization_id in ids[order[:limit]]]
+        next_cursor = None
+        if len(order) > limit:
+            last = order[limit - 1]
+            next_cursor = encode_cursor([float(distances[last]), int(ids[last])])
+
+        result = await self.db.execute(
+            select(OrganizationDocument.organization_id, OrganizationDocument.document)
+            .where(OrganizationDocument.organization_id.in_(page_ids))
+        )
+        documents = dict(result.all())
+        items = [documents[organization_id] for organization_id in page_ids if organization_id in documents]
+        if not use_core(self.db):
+            items = [OrganizationSchema.model_validate(document) for document in items]
+        return SearchPage(items, next_cursor)
+
+
+class BatchGeographicSearchStrategy(SearchStrategy):
+    """
+    Поиск ближайших организаций сразу для многих точек.
+
+    Точки передаются в БД одним параметром и соединяются со зданиями по
+    прямоугольнику вокруг каждой точки, поэтому читаются только кандидаты
+    рядом с точками. Без радиуса (k ближайших) прямоугольник расширяется
+    вдвое для точек, у которых в круге еще меньше limit_per_point организаций.
+    """
+
+    initial_radius_km = 1.0
+
+    async def execute_search(self, points: List, limit_per_point: int, radius: Optional[float] = None, **kwargs):
+        from app.core.read_paths import in_ids
         from app.models.models import Organization
         from sqlalchemy.orm import joinedload, selectinload
         from sqlalchemy import select
-        
+
+        matches = await self._matches(points, limit_per_point, radius)
+        selected_ids = {organization_id for point_matches in matches for organization_id, _ in point_matches}
+        if not selected_ids:
+            return matches
+
         query = select(Organization).options(
             joinedload(Organization.building),
             selectinload(Organization.phones),
             selectinload(Organization.activities)
-        ).where(Organization.name.ilike(f"%{name}%"))
-        
+        ).where(in_ids(self.db.bind.dialect.name, Organization.id, selected_ids))
         result = await self.db.execute(query)
-        return result.scalars().unique().all()
+        organizations = {organization.id: organization for organization in result.scalars().unique().all()}
+        return [
+            [(organizations[organization_id], distance) for organization_id, distance in point_matches]
+            for point_matches in matches
+        ]
+
+    async def matching_ids(self, points: List, limit_per_point: int, radius: Optional[float] = None, **kwargs):
+        from app.core.read_paths import in_ids
+        from app.models.models import Organization
+        from sqlalchemy import select
+
+        matches = await self._matches(points, limit_per_point, radius)
+        selected_ids = {organization_id for point_matches in matches for organization_id, _ in point_matches}
+        return select(Organization.id).where(in_ids(self.db.bind.dialect.name, Organization.id, selected_ids))
+
+    async def _matches(self, points: List, limit_per_point: int, radius: Optional[float]) -> List[List]:
+        """(id организации, расстояние) для каждой точки"""
+        from app.core.geometry import KM_PER_DEGREE
+
+        matches: List[List] = [[] for _ in points]
+        pending = list(range(len(points)))
+        search_radius = radius if radius is not None else self.initial_radius_km
+        while pending:
+            found = await self._nearby([points[index] for index in pending], search_radius, limit_per_point)
+            # На расстоянии 360 градусов прямоугольник покрывает все здания
+            exhausted = radius is not None or search_radius / KM_PER_DEGREE >= 360
+            retry = []
+            for index, point_matches in zip(pending, found):
+                if len(point_matches) < limit_per_point and not exhausted:
+                    retry.append(index)
+                else:
+                    matches[index] = point_matches
+            pending = retry
+            search_radius *= 2
+        return matches
+
+    async def _nearby(self, points: List, radius: float, limit_per_point: int) -> List[List]:
+        """Не больше limit_per_point организаций не дальше radius для каждой точки, по расстоянию и id"""
+        import numpy as np
+        from app.core.geometry import KM_PER_DEGREE
+        from app.core.read_paths import point_rows
+        from app.models.models import Organization, Building
+        from sqlalchemy import and_, select
+
+        point_latitudes = np.asarray([latitude for latitude, _ in points], dtype=float)
+        point_longitudes = np.asarray([longitude for _, longitude in points], dtype=float)
+        rows = point_rows(self.db.bind.dialect.name, point_latitudes.tolist(), point_longitudes.tolist())
+        margin = radius / KM_PER_DEGREE
+        query = select(rows.c.position, Organization.id, Building.latitude, Building.longitude).select_from(rows).join(
+            Building, and_(
+                Building.latitude.between(rows.c.latitude - margin, rows.c.latitude + margin),
+                Building.longitude.between(rows.c.longitude - margin, rows.c.longitude + margin)
+            )
+        ).join(Organization, Organization.building_id == Building.id)
+        candidates = (await self.db.execute(query)).all()
+
+        matches: List[List] = [[] for _ in points]
+        if not candidates:
+            return matches
+
+        positions, organization_ids, latitudes, longitudes = (np.asarray(column) for column in zip(*candidates))
+        positions = positions.astype(int)
+        distances = np.hypot(
+            latitudes.astype(float) - point_latitudes[positions],
+            longitudes.astype(float) - point_longitudes[positions]
+        ) * KM_PER_DEGREE
+        within = distances <= radius
+        positions, organization_ids, distances = positions[within], organization_ids[within], distances[within]
+
+        # По точке, затем по расстоянию и id; ранг внутри точки отсекает лишнее
+        order = np.lexsort((organization_ids, distances, positions))
+        positions, organization_ids, distances = positions[order], organization_ids[order], distances[order]
+        _, first, counts = np.unique(positions, return_index=True, return_counts=True)
+        keep = np.arange(len(positions)) - np.repeat(first, counts) < limit_per_point
+        for position, organization_id, distance in zip(positions[keep], organization_ids[keep], distances[keep]):
+            matches[position].append((int(organization_id), float(distance)))
+        return matches
+
+
+class PolygonSearchStrategy(SearchStrategy):
+    """
+    Поиск организаций в полигонах GeoJSON.
+
+    Здания отбираются по ограничивающему прямоугольнику через индекс координат
+    и читаются потоком порциями по candidates_batch_size, каждая порция
+    проверяется на попадание в полигоны векторизованно. Найденные здания
+    передаются в запрос организаций одним параметром-массивом.
+    """
+
+    candidates_batch_size = 10000
+
+    async def execute_search(self, polygons: List, limit: int = 100, cursor: Optional[str] = None, **kwargs):
+        from app.core.pagination import SearchPage, decode_cursor, fetch_page
+        from app.core.read_paths import in_ids
+        from app.models.models import Organization
+        
+        if cursor:
+            decode_cursor(cursor, (int,))
+        building_ids = await self._building_ids(polygons)
+        if not building_ids:
+            return SearchPage()
+
+        query = self._organizations_query().where(
+            in_ids(self.db.bind.dialect.name, Organization.building_id, building_ids)
+        )
+        
+        return await fetch_page(self.db, query, [Organization.id], (int,), limit, cursor)
+
+    async def matching_ids(self, polygons: List, **kwargs):
+        from app.core.read_paths import in_ids
+        from app.models.models import Organization
+        from sqlalchemy import select
+
+        building_ids = await self._building_ids(polygons)
+        return select(Organization.id).where(in_ids(self.db.bind.dialect.name, Organization.building_id, building_ids))
+
+    async def _building_ids(self, polygons: List) -> List[int]:
+        from app.core.geometry import bounding_box, points_in_polygons
+        from app.models.models import Building
+        from sqlalchemy import select
+
+        min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(polygons)
+        candidates_query = select(Building.id, Building.latitude, Building.longitude).where(
+            Building.latitude.between(min_latitude, max_latitude),
+            Building.longitude.between(min_longitude, max_longitude)
+        )
+        building_ids = []
+        candidates = await self.db.stream(candidates_query)
+        async for partition in candidates.partitions(self.candidates_batch_size):
+            partition_ids, latitudes, longitudes = zip(*partition)
+            inside = points_in_polygons(latitudes, longitudes, polygons)
+            building_ids.extend(building_id for building_id, is_inside in zip(partition_ids, inside) if is_inside)
+        return building_ids
+
+
+class NameSearchStrategy(SearchStrategy):
+    async def execute_search(self, name: str, limit: int = 100, cursor: Optional[str] = None, **kwargs):
+        from app.core.pagination import RELEVANCE_KEY_TYPES, fetch_page, relevance_keys
+        from app.models.models import Organization
+        
+        query = self._organizations_query().where(Organization.name.ilike(f"%{name}%"))
+        
+        sort_keys = relevance_keys(Organization.name, name, Organization.id)
+        return await fetch_page(self.db, query, sort_keys, RELEVANCE_KEY_TYPES, limit, cursor)
+
+    async def matching_ids(self, name: str, **kwargs):
+        from app.models.models import Organization
+        from sqlalchemy import select
+        
+        return select(Organization.id).where(Organization.name.ilike(f"%{name}%"))
 
 
 class ActivitySearchStrategy(SearchStrategy):
-    async def execute_search(self, activity_name: str, **kwargs):
+    async def execute_search(self, activity_name: str, limit: int = 100, cursor: Optional[str] = None, **kwargs):
+        from app.core.pagination import SearchPage, decode_cursor, fetch_page
         from app.models.models import Organization, Activity
-        from sqlalchemy.orm import joinedload, selectinload
-        from sqlalchemy import select
         
+        if cursor:
+            decode_cursor(cursor, (str, int))
+        activity_ids = await self._subtree_ids(activity_name)
+        
+        if not activity_ids:
+            return SearchPage()
+
+        # EXISTS вместо JOIN: организация с несколькими видами деятельности поддерева не дублируется
+        query = self._organizations_query().where(Organization.activities.any(Activity.id.in_(activity_ids)))
+        
+        return await fetch_page(self.db, query, [Organization.name, Organization.id], (str, int), limit, cursor)
+
+    async def matching_ids(self, activity_name: str, **kwargs):
+        from app.models.models import Organization, Activity
+        from sqlalchemy import false, select
+
+        activity_ids = await self._subtree_ids(activity_name)
+        if not activity_ids:
+            return select(Organization.id).where(false())
+        return select(Organization.id).where(Organization.activities.any(Activity.id.in_(activity_ids)))
+
+    async def _subtree_ids(self, activity_name: str) -> List[int]:
+        """id первого подходящего по названию вида деятельности и всех его потомков"""
+        from app.models.models import Activity
+        from sqlalchemy import select
+
         activity_query = select(Activity).where(Activity.name.ilike(f"%{activity_name}%"))
         activity_result = await self.db.execute(activity_query)
         main_activity = activity_result.scalars().first()
-        
         if not main_activity:
             return []
-
-        activity_ids = await self._get_activity_hierarchy_ids(main_activity.id)
-        
-        query = select(Organization).options(
-            joinedload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities)
-        ).join(Organization.activities).where(Activity.id.in_(activity_ids))
-        
-        result = await self.db.execute(query)
-        return result.scalars().unique().all()
+        return await self._get_activity_hierarchy_ids(main_activity.id)
 
     async def _get_activity_hierarchy_ids(self, activity_id: int) -> List[int]:
         from app.models.models import Activity
@@ -181,4 +612,10 @@ class SearchContext:
         self._strategy = strategy
     
     async def search(self, **kwargs):
-        return await self._strategy.execute_search(**kwargs)
\ No newline at end of file
+        return await self._strategy.execute_search(**kwargs)
+
+    async def activity_facets(self, **kwargs):
+        return await self._strategy.activity_facets(**kwargs)
+
+    async def count_matches(self, mode: str = "auto", **kwargs):
+        return await self._strategy.count_matches(mode=mode, **kwargs)
\ No newline at end of file
@@ -0,0 +1,16 @@
+import re
+
+_NON_DIGIT = re.compile(r"\D")
+
+
+def normalize_phone_number(number: str) -> str:
+    """
+    Ключ номера телефона: только цифры.
+
+    Российский префикс 8 у одиннадцатизначных номеров приводится к 7,
+    чтобы "8-923-666-13-13" и "+7 (923) 666-13-13" были одним номером.
+    """
+    digits = _NON_DIGIT.sub("", number)
+    if len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    return digits
@@ -0,0 +1,102 @@
+from bisect import bisect_left, insort
+from heapq import nsmallest
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.events import get_change_broadcaster
+from app.core.normalization import normalize_name
+
+ORGANIZATION = "organization"
+ACTIVITY = "activity"
+
+_EVENT_KINDS = {"organizations": ORGANIZATION, "activities": ACTIVITY}
+
+_prefix_index = None
+
+
+class PrefixIndex:
+    """
+    Префиксный индекс названий организаций и видов деятельности.
+
+    Отсортированный массив ключей, по ключу на каждое слово названия
+    (с этого слова до конца строки), поэтому "рог" находит "ООО Рога и Копыта".
+    Поиск - бинарный поиск границ диапазона и выбор top-k.
+    """
+
+    def __init__(self, max_scan: int = 5000):
+        self.max_scan = max_scan
+        self.loaded = False
+        self._keys: List[Tuple[str, int, str, int]] = []
+        self._names: Dict[Tuple[str, int], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def rebuild(self, entries: Iterable[Tuple[str, int, str]]):
+        """Полная перестройка индекса по (тип, id, название)"""
+        self._names = {}
+        keys = []
+        for kind, entity_id, name in entries:
+            self._names[(kind, entity_id)] = name
+            keys.extend(self._make_keys(kind, entity_id, name))
+        keys.sort()
+        self._keys = keys
+        self.loaded = True
+
+    def add(self, kind: str, entity_id: int, name: str):
+        if (kind, entity_id) in self._names:
+            return
+        self._names[(kind, entity_id)] = name
+        for key in self._make_keys(kind, entity_id, name):
+            insort(self._keys, key)
+
+    def handle_event(self, event: dict):
+        """Слушатель рассылки событий: добавляет созданные организации и виды деятельности"""
+        kind = _EVENT_KINDS.get(event["entity_type"])
+        if kind is not None and event["data"].get("name"):
+            self.add(kind, event["entity_id"], event["data"]["name"])
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[dict]:
+        """
+        Top-k совпадений по префиксу.
+
+        Выше ранжируются совпадения с начала названия, затем более короткие названия.
+        Ранжируются только первые max_scan ключей диапазона префикса (в порядке
+        ключей), поэтому для коротких префиксов с большим диапазоном лучшее по
+        рангу название за окном может не попасть в выдачу - уточнение запроса
+        сужает диапазон, и ранжирование становится точным.
+        """
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        kinds = set(kinds) if kinds else None
+
+        start = bisect_left(self._keys, (prefix,))
+        best: Dict[Tuple[str, int], Tuple[int, int, str]] = {}
+        for key, word_position, kind, entity_id in self._keys[start:start + self.max_scan]:
+            if not key.startswith(prefix):
+                break
+            if kinds is not None and kind not in kinds:
+                continue
+            name = self._names[(kind, entity_id)]
+            rank = (0 if word_position == 0 else 1, len(name), name)
+            if (kind, entity_id) not in best or rank < best[(kind, entity_id)]:
+                best[(kind, entity_id)] = rank
+
+        top = nsmallest(limit, best.items(), key=lambda item: item[1])
+        return [{"id": entity_id, "name": self._names[(kind, entity_id)], "type": kind} for (kind, entity_id), _ in top]
+
+    @staticmethod
+    def _make_keys(kind: str, entity_id: int, name: str) -> List[Tuple[str, int, str, int]]:
+        words = normalize_name(name).split(" ")
+        return [
+            (" ".join(words[position:]), position, kind, entity_id)
+            for position in range(len(words)) if words[position]
+        ]
+
+
+def get_prefix_index() -> PrefixIndex:
+    """Получение Singleton экземпляра префиксного индекса, подписанного на события создания"""
+    global _prefix_index
+    if _prefix_index is None:
+        _prefix_index = PrefixIndex()
+        get_change_broadcaster().add_listener(_prefix_index.handle_event)
+    return _prefix_index
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("active_profile", default=None)
+_sql_hooks_installed = False
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class RequestProfile:
+    """
+    Профиль одного запроса.
+
+    Фоновый поток с заданным интервалом снимает стек потока event loop,
+    но только когда в нем выполняется задача профилируемого запроса или
+    задача, запущенная из ее контекста (например, общий вызов single-flight).
+    Запросы SQL, выполненные в контексте запроса, агрегируются по тексту.
+    """
+
+    def __init__(self, method: str, path: str, interval_ms: float = 5.0):
+        self.id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self.sql: Dict[str, Dict[str, float]] = {}
+        self.started_at = time.perf_counter()
+        self.duration_ms = 0.0
+        self.tasks: weakref.WeakSet = weakref.WeakSet()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        _install_task_factory(loop)
+        self.tasks.add(asyncio.current_task())
+        thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, args=(loop, thread_id), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.duration_ms = (time.perf_counter() - self.started_at) * 1000
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def record_sql(self, statement: str, duration_ms: float):
+        stats = self.sql.setdefault(statement, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+
+    def _sample(self, loop, thread_id: int):
+        while not self._stop.wait(self.interval):
+            if asyncio.current_task(loop) not in self.tasks:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Стеки в свернутом формате flamegraph.pl / speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        statements = sorted(
+            ({"statement": statement, **stats} for statement, stats in self.sql.items()),
+            key=lambda item: item["total_ms"],
+            reverse=True
+        )
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration_ms, 3),
+            "samples": sum(self.stacks.values()),
+            "sql_count": sum(stats["count"] for stats in self.sql.values()),
+            "sql_total_ms": round(sum(stats["total_ms"] for stats in self.sql.values()), 3),
+            "sql": statements,
+        }
+
+
+def _install_task_factory(loop):
+    """
+    Фабрика задач цикла, относящая новую задачу к профилю из контекста,
+    в котором она создана: профиль наследуется задачами, запущенными запросом.
+    """
+    previous = loop.get_task_factory()
+    if getattr(previous, "__profiling__", False):
+        return
+
+    def task_factory(loop, coro, **kwargs):
+        if previous is not None:
+            task = previous(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        profile = context.get(_active_profile) if context is not None else _active_profile.get()
+        if profile is not None:
+            profile.tasks.add(task)
+        return task
+
+    task_factory.__profiling__ = True
+    loop.set_task_factory(task_factory)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время начала хранится в контексте выполнения, а не в conn.info: при ошибке
+    # запроса оно уходит вместе с контекстом и не достается следующему запросу соединения
+    if _active_profile.get() is not None and context is not None:
+        context._profile_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    started = getattr(context, "_profile_query_start", None)
+    if profile is not None and started is not None:
+        profile.record_sql(statement, (time.perf_counter() - started) * 1000)
+
+
+def install_sql_hooks():
+    global _sql_hooks_installed
+    if not _sql_hooks_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _sql_hooks_installed = True
+
+
+class ProfileStore:
+    """Каталог сохраненных профилей: <id>.folded и <id>.json"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def save(self, profile: RequestProfile):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{profile.id}.folded"), "w", encoding="utf-8") as f:
+            f.write(profile.folded())
+        with open(os.path.join(self.directory, f"{profile.id}.json"), "w", encoding="utf-8") as f:
+            json.dump(profile.summary(), f, ensure_ascii=False, indent=2)
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((name for name in os.listdir(self.directory) if name.endswith(".json")), reverse=True)
+        summaries = []
+        for name in names[:limit]:
+            with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                summary = json.load(f)
+            summary.pop("sql", None)
+            summaries.append(summary)
+        return summaries
+
+    def get_summary(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(profile_id, "json")
+        if path is None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def get_folded(self, profile_id: str) -> Optional[str]:
+        path = self._path(profile_id, "folded")
+        if path is None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def _path(self, profile_id: str, extension: str) -> Optional[str]:
+        if os.path.basename(profile_id) != profile_id:
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{extension}")
+        return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware профилирования по запросу.
+
+    Запрос профилируется, если передан заголовок X-Profile с верным X-Admin-Key
+    или он попал в выборку sample_rate. В остальных случаях middleware
+    только проверяет заголовки.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        admin_key: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+        path_prefix: str = "/api/"
+    ):
+        self.app = app
+        self.store = store
+        self.admin_key = admin_key
+        self.sample_rate = sample_rate
+        self.interval_ms = interval_ms
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope.get("path", "").startswith(self.path_prefix) \
+                or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        install_sql_hooks()
+        profile = RequestProfile(scope.get("method", ""), scope["path"], self.interval_ms)
+        token = _active_profile.set(profile)
+        profile.start()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", profile.id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            _active_profile.reset(token)
+            await asyncio.get_running_loop().run_in_executor(None, self.store.save, profile)
+
+    def _should_profile(self, scope) -> bool:
+        if self.admin_key:
+            headers = dict(scope.get("headers", []))
+            if b"x-profile" in headers:
+                admin_key = headers.get(b"x-admin-key", b"").decode("latin-1")
+                return secrets.compare_digest(admin_key, self.admin_key)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
@@ -0,0 +1,108 @@
+import json
+from typing import Any, Dict, Iterable, Sequence
+from sqlalchemy import JSON, Float, Integer, any_, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ORM = "orm"
+CORE = "core"
+
+
+def use_core(db: AsyncSession) -> bool:
+    """Читать ли без ORM: путь чтения задается для маршрута в info сессии"""
+    return db.info.get("read_path") == CORE
+
+
+def json_object(dialect: str, fields: Dict[str, Any]):
+    """JSON объект из пар ключ - выражение, собранный в БД"""
+    arguments = []
+    for key, value in fields.items():
+        arguments.extend((literal_column(f"'{key}'"), value))
+    if dialect == "postgresql":
+        return func.json_build_object(*arguments, type_=JSON)
+    return func.json_object(*arguments, type_=JSON)
+
+
+def json_array(dialect: str, element, order_by, *conditions):
+    """Коррелированный подзапрос: JSON массив элементов (пустой, если строк нет)"""
+    if dialect == "postgresql":
+        aggregate = func.coalesce(func.json_agg(aggregate_order_by(element, order_by)), literal_column("'[]'::json"))
+        return select(aggregate).where(*conditions).scalar_subquery()
+    # В SQLite результат подзапроса - текст, json() возвращает ему тип JSON внутри объекта
+    return func.json(select(func.json_group_array(element)).where(*conditions).scalar_subquery())
+
+
+def in_ids(dialect: str, column, ids: Iterable[int]):
+    """
+    Условие column IN ids одним параметром запроса: массив в PostgreSQL,
+    JSON массив в SQLite - число id не упирается в лимит параметров драйвера.
+    """
+    ids = [int(value) for value in ids]
+    if dialect == "postgresql":
+        return column == any_(literal(ids, ARRAY(Integer)))
+    values = func.json_each(literal(json.dumps(ids))).table_valued("value")
+    return column.in_(select(values.c.value))
+
+
+def point_rows(dialect: str, latitudes: Sequence[float], longitudes: Sequence[float]):
+    """
+    Точки как таблица (position, latitude, longitude) из одного параметра:
+    unnest массивов в PostgreSQL, json_each в SQLite; position с нуля.
+    """
+    if dialect == "postgresql":
+        points = func.unnest(
+            literal([float(value) for value in latitudes], ARRAY(Float)),
+            literal([float(value) for value in longitudes], ARRAY(Float))
+        ).table_valued("latitude", "longitude", with_ordinality="position").render_derived()
+        return select(
+            (points.c.position - 1).label("position"), points.c.latitude, points.c.longitude
+        ).subquery()
+    points = func.json_each(literal(json.dumps([[float(a), float(b)] for a, b in zip(latitudes, longitudes)])))
+    points = points.table_valued("key", "value")
+    return select(
+        points.c.key.label("position"),
+        func.json_extract(points.c.value, "$[0]", type_=Float).label("latitude"),
+        func.json_extract(points.c.value, "$[1]", type_=Float).label("longitude")
+    ).subquery()
+
+
+def organization_rows(dialect: str):
+    """
+    Выборка организаций без ORM: одна колонка с готовым для ответа JSON
+    (здание, телефоны, виды деятельности), собранным в БД за один запрос.
+    """
+    from app.models.models import (
+        Activity, Building, Organization, Phone,
+        organization_activity_association, organization_phone_association
+    )
+
+    phones = json_array(
+        dialect,
+        json_object(dialect, {"id": Phone.id, "number": Phone.number}),
+        Phone.id,
+        Phone.id == organization_phone_association.c.phone_id,
+        organization_phone_association.c.organization_id == Organization.id
+    )
+    activities = json_array(
+        dialect,
+        json_object(dialect, {
+            "id": Activity.id, "name": Activity.name, "parent_id": Activity.parent_id, "level": Activity.level
+        }),
+        Activity.id,
+        Activity.id == organization_activity_association.c.activity_id,
+        organization_activity_association.c.organization_id == Organization.id
+    )
+    document = json_object(dialect, {
+        "id": Organization.id,
+        "name": Organization.name,
+        "building_id": Organization.building_id,
+        "building": json_object(dialect, {
+            "id": Building.id, "address": Building.address,
+            "latitude": Building.latitude, "longitude": Building.longitude
+        }),
+        "phones": phones,
+        "activities": activities,
+    })
+    return select(document.label("organization")).select_from(Organization).join(
+        Building, Building.id == Organization.building_id
+    )
@@ -1,14 +1,17 @@
 import secrets
-from fastapi import HTTPException, status, Depends
+from typing import Optional
+from fastapi import HTTPException, status, Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import get_settings
 
 security = HTTPBearer(auto_error=False)
 
 
+def is_valid_api_key(key: str) -> bool:
+    return secrets.compare_digest(key, get_settings().api_key)
+
+
 async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    settings = get_settings()
-    
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -16,11 +19,24 @@ async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(sec
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not secrets.compare_digest(credentials.credentials, settings.api_key):
+    if not is_valid_api_key(credentials.credentials):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return credentials.credentials
\ No newline at end of file
+    return credentials.credentials
+
+
+async def verify_admin_key(x_admin_key: Optional[str] = Header(None)) -> str:
+    """Ключ администратора из X-Admin-Key; без ADMIN_API_KEY административные данные недоступны"""
+    admin_key = get_settings().admin_api_key
+
+    if not admin_key or not x_admin_key or not secrets.compare_digest(x_admin_key, admin_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin key required",
+        )
+
+    return x_admin_key
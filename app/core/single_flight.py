@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+
+_single_flight = None
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вызовов.
+
+    Первый вызов с ключом запускает выполнение, остальные ждут его результата.
+    Выполнение идет в отдельной задаче, поэтому отмена одного из ожидающих
+    запросов не прерывает его для остальных.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"calls_total": 0, "executions_total": 0, "coalesced_total": 0}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        self._stats["calls_total"] += 1
+        task = self._calls.get(key)
+        if task is None:
+            self._stats["executions_total"] += 1
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._stats["coalesced_total"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self._stats["calls_total"]
+        return {
+            **self._stats,
+            "in_flight": len(self._calls),
+            "coalescing_ratio": self._stats["coalesced_total"] / calls if calls else 0.0,
+        }
+
+
+def get_single_flight() -> SingleFlight:
+    """Получение Singleton экземпляра объединения вызовов"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
+
+
+def _freeze(value: Any) -> Hashable:
+    if hasattr(value, "model_dump_json"):
+        return value.model_dump_json()
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _shared_session(db: AsyncSession) -> AsyncSession:
+    """
+    Сессия общего вызова на движке сессии db. Сессия из фабрики движка учитывается
+    в его активных сессиях, поэтому замена и закрытие движка дожидаются общего вызова.
+    """
+    handle = getattr(db, "engine_handle", None)
+    if handle is not None:
+        return handle.session_factory(info=dict(db.info))
+    return AsyncSession(db.bind, expire_on_commit=False, info=dict(db.info))
+
+
+def coalesced(casefold: Iterable[str] = ()):
+    """
+    Декоратор метода чтения сервиса: одинаковые одновременные вызовы
+    выполняются одним запросом к БД.
+
+    Ключ - класс сервиса, имя метода, путь чтения сессии и аргументы с учетом значений по умолчанию;
+    аргументы из casefold сравниваются без учета регистра (поиск через ilike).
+    Общий вызов выполняется в собственной сессии, а если сессия сервиса уже
+    в транзакции (возможны незафиксированные изменения), вызов не объединяется.
+    """
+    casefold = frozenset(casefold)
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if not get_settings().single_flight_enabled or self.db.in_transaction():
+                return await method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = tuple(
+                (name, value.casefold() if name in casefold and isinstance(value, str) else _freeze(value))
+                for name, value in list(bound.arguments.items())[1:]
+            )
+            # Путь чтения определяет форму результата (ORM сущности или готовый JSON)
+            key = (type(self).__name__, method.__name__, self.db.info.get("read_path"), arguments)
+
+            async def call():
+                async with _shared_session(self.db) as session:
+                    return await method(type(self)(session), *args, **kwargs)
+
+            return await get_single_flight().do(key, call)
+
+        return wrapper
+
+    return decorator
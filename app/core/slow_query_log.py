@@ -0,0 +1,106 @@
+import asyncio
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import event
+from app.core.admission import TokenBucket
+
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+_capturing_plan: ContextVar[bool] = ContextVar("capturing_plan", default=False)
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов движка.
+
+    Запросы дольше threshold_ms попадают в кольцевой буфер вместе с параметрами
+    и маршрутом. План выполнения снимается в фоне отдельным соединением:
+    EXPLAIN (ANALYZE, BUFFERS) для SELECT и EXPLAIN для остальных запросов
+    (ANALYZE выполнил бы изменение повторно). Частота снятия планов ограничена.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 200.0,
+        max_entries: int = 100,
+        explain_per_minute: float = 6.0,
+        explain_timeout_ms: int = 10000,
+        max_parameters_length: int = 1000
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_parameters_length = max_parameters_length
+        self._entries: deque = deque(maxlen=max_entries)
+        self._explain_bucket = TokenBucket(explain_per_minute / 60, max(1, int(explain_per_minute)))
+        self._engine = None
+        self._plan_tasks: Set[asyncio.Task] = set()
+
+    def attach(self, engine):
+        """Подключение к AsyncEngine через события синхронного движка"""
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Записи журнала, новые первыми"""
+        return list(reversed(self._entries))
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # В контексте выполнения, а не в conn.info: начало упавшего запроса не переживает его
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_start", None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms or _capturing_plan.get():
+            return
+
+        entry = {
+            "timestamp": datetime.now(timezone.utc),
+            "duration_ms": round(duration_ms, 3),
+            "route": current_route.get(),
+            "statement": statement,
+            "parameters": repr(parameters)[:self.max_parameters_length],
+            "plan": None,
+            "plan_status": "skipped",
+        }
+        self._entries.append(entry)
+
+        if executemany or self._engine is None or not self._explain_bucket.try_acquire()[0]:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        entry["plan_status"] = "pending"
+        # Ссылка на задачу держится до ее завершения, иначе цикл может собрать ее сборщиком мусора
+        task = loop.create_task(self._capture_plan(entry, conn.dialect.name, statement, parameters))
+        self._plan_tasks.add(task)
+        task.add_done_callback(self._plan_tasks.discard)
+
+    async def _capture_plan(self, entry: Dict[str, Any], dialect: str, statement: str, parameters):
+        if dialect == "postgresql":
+            is_select = statement.lstrip().upper().startswith("SELECT")
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) " if is_select else "EXPLAIN "
+        elif dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            entry["plan_status"] = "unsupported"
+            return
+
+        _capturing_plan.set(True)
+        try:
+            async with self._engine.connect() as conn:
+                if dialect == "postgresql":
+                    await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                result = await conn.exec_driver_sql(prefix + statement, parameters)
+                entry["plan"] = "\n".join(" ".join(str(value) for value in row) for row in result.all())
+                entry["plan_status"] = "captured"
+                await conn.rollback()
+        except Exception as e:
+            entry["plan_status"] = f"failed: {e.__class__.__name__}"
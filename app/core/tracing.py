@@ -0,0 +1,384 @@
+import asyncio
+import functools
+import importlib
+import inspect
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Коды OTLP: вид спана и статус
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+TRACE_ID_HEADER = "X-Trace-Id"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_active_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("active_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_sql_hooks_installed = False
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """Спан в модели данных OpenTelemetry; время - наносекунды Unix"""
+
+    def __init__(self, trace: "RequestTrace", name: str, parent: Optional["Span"] = None,
+                 kind: int = SPAN_KIND_INTERNAL, parent_span_id: Optional[str] = None):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent is not None else parent_span_id
+        self.attributes: Dict[str, Any] = {}
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+        self.attributes["exception.type"] = type(error).__name__
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.finish_span(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class RequestTrace:
+    """Спаны одного запроса; лишние сверх max_spans отбрасываются с подсчетом"""
+
+    def __init__(self, trace_id: Optional[str] = None, sampled: bool = False, max_spans: int = 1000):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.sampled = sampled
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+
+    def finish_span(self, span: Span):
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Дочерний спан текущего; без активной трассировки ничего не делает"""
+    trace = _active_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = Span(trace, name, parent=_current_span.get(), kind=kind)
+    for key, value in attributes.items():
+        current.set_attribute(key, value)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def _result_count(result) -> Optional[int]:
+    items = getattr(result, "items", result)
+    return len(items) if isinstance(items, (list, tuple)) else None
+
+
+def traced(name: Optional[str] = None):
+    """Декоратор async метода: вызов выполняется в спане <класс>.<метод>"""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if _active_trace.get() is None:
+                return await method(self, *args, **kwargs)
+            with span(name or f"{type(self).__name__}.{method.__name__}", code_function=method.__name__) as current:
+                result = await method(self, *args, **kwargs)
+                current.set_attribute("result.count", _result_count(result))
+                return result
+
+        wrapper.__traced__ = True
+        return wrapper
+
+    return decorator
+
+
+def instrument_methods(cls, names: Optional[List[str]] = None):
+    """Обернуть в спаны публичные async методы, объявленные в самом классе (или только names)"""
+    for attribute, value in list(vars(cls).items()):
+        if names is not None and attribute not in names:
+            continue
+        if attribute.startswith("_") or not inspect.iscoroutinefunction(value):
+            continue
+        if getattr(value, "__traced__", False) or getattr(value, "__isabstractmethod__", False):
+            continue
+        setattr(cls, attribute, traced()(value))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _active_trace.get()
+    if trace is None:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    current = Span(trace, f"db {operation}", parent=_current_span.get(), kind=SPAN_KIND_CLIENT)
+    current.set_attribute("db.system", conn.dialect.name)
+    current.set_attribute("db.operation", operation)
+    current.set_attribute("db.statement", statement[:2000])
+    conn.info.setdefault("trace_sql_spans", []).append(current)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_sql_spans")
+    if not spans:
+        return
+    current = spans.pop()
+    # -1, если драйвер не сообщает число строк (SELECT в SQLite); asyncpg сообщает его и для SELECT
+    if context is not None and context.rowcount >= 0:
+        current.set_attribute("db.rows", context.rowcount)
+    current.end()
+
+
+def _handle_error(context):
+    spans = context.connection.info.get("trace_sql_spans") if context.connection is not None else None
+    if spans:
+        current = spans.pop()
+        current.record_exception(context.original_exception)
+        current.end()
+
+
+def install_sql_hooks():
+    global _sql_hooks_installed
+    if not _sql_hooks_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _sql_hooks_installed = True
+
+
+class SpanExporter(ABC):
+    """Получатель завершенных трасс"""
+
+    @abstractmethod
+    def export(self, trace: RequestTrace):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+def otlp_payload(trace: RequestTrace, service_name: str) -> Dict[str, Any]:
+    """Трасса в формате OTLP/JSON (ExportTraceServiceRequest)"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": _otlp_value(service_name)}]},
+            "scopeSpans": [{
+                "scope": {"name": "app.core.tracing"},
+                "spans": [span.to_otlp() for span in trace.spans],
+            }],
+        }]
+    }
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """Краткое дерево спанов в поток вывода"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def export(self, trace: RequestTrace):
+        children: Dict[Optional[str], List[Span]] = {}
+        for current in sorted(trace.spans, key=lambda item: item.start_ns):
+            children.setdefault(current.parent_span_id, []).append(current)
+        span_ids = {current.span_id for current in trace.spans}
+        roots = [current for current in trace.spans if current.parent_span_id not in span_ids]
+
+        lines = [f"trace {trace.trace_id}"]
+
+        def walk(current: Span, depth: int):
+            rows = current.attributes.get("db.rows")
+            suffix = f" rows={rows}" if rows is not None else ""
+            lines.append(f"{'  ' * (depth + 1)}{current.name} {current.duration_ms:.3f} ms{suffix}")
+            for child in children.get(current.span_id, []):
+                walk(child, depth + 1)
+
+        for root in sorted(roots, key=lambda item: item.start_ns):
+            walk(root, 0)
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+
+class FileSpanExporter(SpanExporter):
+    """Трассы построчно в формате OTLP/JSON - читается OTel Collector (otlpjsonfile) и Jaeger"""
+
+    def __init__(self, path: str, service_name: str = "organizations-api"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, trace: RequestTrace):
+        line = json.dumps(otlp_payload(trace, self.service_name), ensure_ascii=False)
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class InMemorySpanExporter(SpanExporter):
+    def __init__(self):
+        self.traces: List[RequestTrace] = []
+
+    def export(self, trace: RequestTrace):
+        self.traces.append(trace)
+
+
+def create_exporter(
+    name: str,
+    file_path: str = "traces/spans.jsonl",
+    service_name: str = "organizations-api"
+) -> Optional[SpanExporter]:
+    """Экспортер по имени: none, console, file или путь к классу вида package.module:ClassName"""
+    if name == "none":
+        return None
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "file":
+        return FileSpanExporter(file_path, service_name)
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown trace exporter: {name}")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware трассировки.
+
+    Спаны записываются для каждого запроса, а экспортируются только попавшие
+    в выборку (sample_rate или флаг sampled входящего traceparent) и запросы
+    дольше slow_threshold_ms - медленный запрос можно разобрать по спанам
+    после того, как он уже случился.
+    """
+
+    def __init__(
+        self,
+        app,
+        exporter: SpanExporter,
+        sample_rate: float = 0.0,
+        slow_threshold_ms: Optional[float] = 500.0,
+        max_spans: int = 1000,
+        path_prefix: str = "/api/"
+    ):
+        self.app = app
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.max_spans = max_spans
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope.get("path", "").startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        install_sql_hooks()
+        trace_id, parent_span_id, sampled = self._parse_traceparent(scope)
+        trace = RequestTrace(
+            trace_id=trace_id,
+            sampled=sampled or (self.sample_rate > 0 and random.random() < self.sample_rate),
+            max_spans=self.max_spans
+        )
+        method = scope.get("method", "")
+        root = Span(trace, f"{method} {scope['path']}", kind=SPAN_KIND_SERVER, parent_span_id=parent_span_id)
+        root.set_attribute("http.request.method", method)
+        root.set_attribute("url.path", scope["path"])
+        trace_token = _active_trace.set(trace)
+        span_token = _current_span.set(root)
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status_code = STATUS_ERROR
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-trace-id", trace.trace_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        except BaseException as e:
+            root.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(span_token)
+            _active_trace.reset(trace_token)
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                root.name = f"{method} {route.path}"
+                root.set_attribute("http.route", route.path)
+            root.end()
+            if trace.dropped_spans:
+                root.set_attribute("trace.dropped_spans", trace.dropped_spans)
+            if trace.sampled or (self.slow_threshold_ms is not None and root.duration_ms >= self.slow_threshold_ms):
+                await asyncio.get_running_loop().run_in_executor(None, self.exporter.export, trace)
+
+    @staticmethod
+    def _parse_traceparent(scope):
+        """W3C traceparent: продолжение внешней трассы и ее решение о выборке"""
+        headers = dict(scope.get("headers", []))
+        match = _TRACEPARENT.match(headers.get(b"traceparent", b"").decode("latin-1").strip())
+        if match is None or match.group(1) == "0" * 32:
+            return None, None, False
+        return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
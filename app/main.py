@@ -1,22 +1,43 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import get_settings
-from app.api.dependencies import get_database_manager
-from app.api import organizations, buildings, activities
+from app.api.dependencies import (
+    get_database_manager, get_service_factory, get_write_pipeline, get_admission_controller, get_profile_store
+)
+from app.api import organizations, buildings, activities, writes, changes, events, autocomplete, admin
+from app.core.admission import AdmissionControlMiddleware
+from app.core.disconnect import CancelOnDisconnectMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, create_exporter
+from app.services.organization_documents import backfill_missing_documents
 from app.models import Base
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    settings = get_settings()
     db_manager = get_database_manager()
+    await db_manager.start(prewarm=settings.db_pool_prewarm)
     
     async with db_manager.engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
+    async with db_manager.session_factory() as session:
+        # Документы организаций для баз, созданных create_all или заполненных без сервисов
+        await backfill_missing_documents(session)
+        await session.commit()
+        await get_service_factory().create_autocomplete_service(session).load_index()
+    
+    write_pipeline = get_write_pipeline()
+    write_pipeline.start()
+    
     yield
     
-    await db_manager.engine.dispose()
+    await write_pipeline.stop()
+    await db_manager.shutdown(drain_timeout=settings.db_drain_timeout_seconds)
 
 
 def create_application() -> FastAPI:
@@ -32,17 +53,58 @@ def create_application() -> FastAPI:
         redoc_url="/redoc"
     )
 
+    if settings.admin_api_key or settings.profiling_sample_rate > 0:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=get_profile_store(),
+            admin_key=settings.admin_api_key,
+            sample_rate=settings.profiling_sample_rate,
+            interval_ms=settings.profiling_interval_ms
+        )
+
+    app.add_middleware(CancelOnDisconnectMiddleware)
+
+    trace_exporter = create_exporter(settings.tracing_exporter, settings.tracing_file_path, settings.app_name)
+    if trace_exporter is not None:
+        app.add_middleware(
+            TracingMiddleware,
+            exporter=trace_exporter,
+            sample_rate=settings.tracing_sample_rate,
+            slow_threshold_ms=settings.tracing_slow_request_ms,
+            max_spans=settings.tracing_max_spans
+        )
+
+    if settings.admission_enabled:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            controller=get_admission_controller(),
+            exempt_paths=["/api/v1/events/stream", "/api/v1/admin"]
+        )
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Total-Count", "X-Total-Count-Type", "X-Next-Cursor", "X-Trace-Id"],
     )
 
     app.include_router(organizations.router, prefix="/api/v1")
     app.include_router(buildings.router, prefix="/api/v1")
     app.include_router(activities.router, prefix="/api/v1")
+    app.include_router(writes.router, prefix="/api/v1")
+    app.include_router(changes.router, prefix="/api/v1")
+    app.include_router(events.router, prefix="/api/v1")
+    app.include_router(autocomplete.router, prefix="/api/v1")
+    app.include_router(admin.router, prefix="/api/v1")
+
+    @app.exception_handler(DBAPIError)
+    async def database_error_handler(request: Request, exc: DBAPIError):
+        # 57014 - query_canceled: сработал statement_timeout
+        if getattr(exc.orig, "sqlstate", None) == "57014" or getattr(exc.orig, "pgcode", None) == "57014":
+            return JSONResponse(status_code=504, content={"detail": "Database statement timeout"})
+        raise exc
 
     @app.get("/")
     async def root():
@@ -1,6 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey, Table, Text, DateTime, Index, JSON, event, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.sql.expression import FunctionElement
+from datetime import datetime
 from typing import List, Optional
+from app.core.addresses import building_dedup_key
 from app.models import Base
 
 
@@ -8,34 +13,51 @@ organization_activity_association = Table(
     'organization_activity',
     Base.metadata,
     Column('organization_id', Integer, ForeignKey('organizations.id'), primary_key=True),
-    Column('activity_id', Integer, ForeignKey('activities.id'), primary_key=True)
+    Column('activity_id', Integer, ForeignKey('activities.id'), primary_key=True, index=True)
 )
 
 organization_phone_association = Table(
     'organization_phone',
     Base.metadata,
     Column('organization_id', Integer, ForeignKey('organizations.id'), primary_key=True),
-    Column('phone_id', Integer, ForeignKey('phones.id'), primary_key=True)
+    Column('phone_id', Integer, ForeignKey('phones.id'), primary_key=True, index=True)
 )
 
 
-class Building(Base):
+class TimestampMixin:
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+class Building(TimestampMixin, Base):
     __tablename__ = 'buildings'
+    __table_args__ = (
+        Index('ix_buildings_latitude_longitude', 'latitude', 'longitude'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     address: Mapped[str] = mapped_column(String(500), nullable=False)
     latitude: Mapped[float] = mapped_column(Float, nullable=False)
     longitude: Mapped[float] = mapped_column(Float, nullable=False)
+    dedup_key: Mapped[str] = mapped_column(String(40), nullable=False, index=True, unique=True)
 
     organizations: Mapped[List["Organization"]] = relationship("Organization", back_populates="building")
 
 
-class Activity(Base):
+@event.listens_for(Building, "before_insert")
+def set_building_dedup_key(mapper, connection, target: Building):
+    if target.dedup_key is None:
+        target.dedup_key = building_dedup_key(target.address, target.latitude, target.longitude)
+
+
+class Activity(TimestampMixin, Base):
     __tablename__ = 'activities'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
-    parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('activities.id'), nullable=True)
+    parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('activities.id'), nullable=True, index=True)
     level: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
 
     parent: Mapped[Optional["Activity"]] = relationship("Activity", remote_side=[id], back_populates="children")
@@ -47,11 +69,12 @@ class Activity(Base):
     )
 
 
-class Phone(Base):
+class Phone(TimestampMixin, Base):
     __tablename__ = 'phones'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     number: Mapped[str] = mapped_column(String(20), nullable=False)
+    normalized_number: Mapped[str] = mapped_column(String(20), nullable=False, unique=True, index=True)
 
     organizations: Mapped[List["Organization"]] = relationship(
         "Organization", 
@@ -60,12 +83,12 @@ class Phone(Base):
     )
 
 
-class Organization(Base):
+class Organization(TimestampMixin, Base):
     __tablename__ = 'organizations'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(300), nullable=False, index=True)
-    building_id: Mapped[int] = mapped_column(Integer, ForeignKey('buildings.id'), nullable=False)
+    building_id: Mapped[int] = mapped_column(Integer, ForeignKey('buildings.id'), nullable=False, index=True)
 
     building: Mapped["Building"] = relationship("Building", back_populates="organizations")
     phones: Mapped[List["Phone"]] = relationship(
@@ -77,4 +100,70 @@ class Organization(Base):
         "Activity", 
         secondary=organization_activity_association, 
         back_populates="organizations"
-    )
\ No newline at end of file
+    )
+
+
+# JSONB в PostgreSQL, обычный JSON в остальных СУБД (SQLite в тестах)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class OrganizationDocument(Base):
+    """
+    Денормализованный документ организации для чтения одним запросом:
+    здание, телефоны и виды деятельности с путями в иерархии.
+    Пересобирается при записи организации (app.services.organization_documents).
+    """
+    __tablename__ = 'organization_documents'
+    __table_args__ = (
+        Index('ix_organization_documents_latitude_longitude', 'latitude', 'longitude'),
+    )
+
+    organization_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True
+    )
+    name: Mapped[str] = mapped_column(String(300), nullable=False, index=True)
+    building_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    address: Mapped[str] = mapped_column(String(500), nullable=False)
+    latitude: Mapped[float] = mapped_column(Float, nullable=False)
+    longitude: Mapped[float] = mapped_column(Float, nullable=False)
+    activity_ids: Mapped[list] = mapped_column(JSONDocument, nullable=False)
+    activity_path_ids: Mapped[list] = mapped_column(JSONDocument, nullable=False)
+    document: Mapped[dict] = mapped_column(JSONDocument, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class current_transaction_id(FunctionElement):
+    """id текущей транзакции PostgreSQL; в остальных СУБД NULL (запись в них последовательна)"""
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(current_transaction_id)
+def _compile_current_transaction_id(element, compiler, **kwargs):
+    return "NULL"
+
+
+@compiles(current_transaction_id, "postgresql")
+def _compile_current_transaction_id_postgresql(element, compiler, **kwargs):
+    return "pg_current_xact_id()::text::bigint"
+
+
+class ChangeLog(Base):
+    """
+    Журнал изменений для инкрементальной синхронизации.
+
+    id выдаются при вставке, а не в порядке фиксации, поэтому порядок записей
+    задает пара (transaction_id, id): транзакции с id меньше горизонта снимка
+    уже завершены, и более ранние записи после них появиться не могут.
+    """
+    __tablename__ = 'change_log'
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    operation: Mapped[str] = mapped_column(String(20), nullable=False)
+    transaction_id: Mapped[Optional[int]] = mapped_column(BigInteger, insert_default=current_transaction_id())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+Index('ix_change_log_commit_order', func.coalesce(ChangeLog.transaction_id, 0), ChangeLog.id)
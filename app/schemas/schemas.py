@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import Dict, List, Literal, Optional
+from datetime import datetime
 from enum import Enum
 
 
@@ -82,6 +83,19 @@ class OrganizationList(OrganizationBase):
     activities: List[Activity] = []
 
 
+class ActivityFacet(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    level: int
+    count: int = Field(..., description="Число найденных организаций с этим видом деятельности или его потомками")
+
+
+class FacetedOrganizationList(BaseModel):
+    items: List[OrganizationList]
+    facets: Dict[str, List[ActivityFacet]] = Field(..., description="Фасеты по запрошенным измерениям")
+
+
 class SearchArea(BaseModel):
     latitude: float = Field(..., ge=-90, le=90)
     longitude: float = Field(..., ge=-180, le=180)
@@ -92,11 +106,226 @@ class SearchArea(BaseModel):
     max_longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
+class PolygonSearchArea(BaseModel):
+    """Геометрия GeoJSON Polygon или MultiPolygon, координаты в порядке [долгота, широта]"""
+    type: Literal["Polygon", "MultiPolygon"]
+    coordinates: List = Field(..., description="Кольца полигона (или список полигонов для MultiPolygon)")
+
+    @model_validator(mode="after")
+    def validate_coordinates(self):
+        polygons = [self.coordinates] if self.type == "Polygon" else self.coordinates
+        if not polygons:
+            raise ValueError("Geometry must contain at least one polygon")
+        for polygon in polygons:
+            if not isinstance(polygon, list) or not polygon:
+                raise ValueError("Polygon must contain at least one ring")
+            for ring in polygon:
+                if not isinstance(ring, list) or len(ring) < 4:
+                    raise ValueError("Polygon ring must contain at least 4 positions")
+                for position in ring:
+                    if not isinstance(position, list) or len(position) < 2 \
+                            or not all(isinstance(value, (int, float)) for value in position[:2]):
+                        raise ValueError("Position must be [longitude, latitude]")
+                    if not (-180 <= position[0] <= 180 and -90 <= position[1] <= 90):
+                        raise ValueError("Position is out of range")
+                if ring[0][:2] != ring[-1][:2]:
+                    raise ValueError("Polygon ring must be closed")
+        return self
+
+    def polygons(self) -> List:
+        return [self.coordinates] if self.type == "Polygon" else self.coordinates
+
+
+class GeoPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+
+class BatchGeoSearch(BaseModel):
+    points: List[GeoPoint] = Field(..., min_length=1, max_length=1000, description="Точки поиска")
+    radius: Optional[float] = Field(None, gt=0, description="Радиус поиска в километрах")
+    k: Optional[int] = Field(None, ge=1, le=100, description="Число ближайших организаций")
+    limit_per_point: int = Field(10, ge=1, le=100, description="Максимум организаций на точку")
+
+    @model_validator(mode="after")
+    def validate_mode(self):
+        if (self.radius is None) == (self.k is None):
+            raise ValueError("Exactly one of radius or k must be set")
+        return self
+
+
+class GeoBatchResult(BaseModel):
+    point_index: int = Field(..., description="Номер точки в запросе")
+    organizations: List[OrganizationList] = Field(..., description="Организации по возрастанию расстояния")
+    distances_km: List[float] = Field(..., description="Расстояния до организаций в километрах")
+
+
+class BuildingImportError(BaseModel):
+    row: int = Field(..., description="Номер строки данных (без заголовка), 0 - ошибка файла")
+    error: str
+
+
+class BuildingImportReport(BaseModel):
+    total_rows: int
+    inserted: int
+    duplicates: int = Field(..., description="Строки, совпавшие с существующим зданием или предыдущей строкой файла")
+    failed: int
+    errors: List[BuildingImportError]
+    errors_truncated: bool = Field(..., description="В отчет попали не все ошибки")
+
+
+class ActivityTreeNode(ActivityBase):
+    children: List["ActivityTreeNode"] = Field(default=[], description="Дочерние виды деятельности")
+
+
+class ActivityTreeImport(BaseModel):
+    parent_id: Optional[int] = Field(None, description="ID существующей деятельности, к которой присоединяется дерево")
+    nodes: List[ActivityTreeNode] = Field(..., min_length=1, description="Корневые узлы импортируемого дерева")
+
+
+class ActivityTreeResult(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    level: int
+    children: List["ActivityTreeResult"] = []
+
+
+class ActivityTreeImportResult(BaseModel):
+    created: int
+    nodes: List[ActivityTreeResult] = Field(..., description="Созданные узлы с id в порядке и форме запроса")
+
+
 class PaginationParams(BaseModel):
     skip: int = Field(0, ge=0, description="Количество записей для пропуска")
     limit: int = Field(100, ge=1, le=1000, description="Максимальное количество записей")
 
 
+class BuildingDelta(Building):
+    updated_at: datetime
+
+
+class ActivityDelta(Activity):
+    updated_at: datetime
+
+
+class PhoneDelta(Phone):
+    updated_at: datetime
+
+
+class OrganizationDelta(OrganizationBase):
+    id: int
+    building_id: int
+    phone_ids: List[int] = []
+    activity_ids: List[int] = []
+    updated_at: datetime
+
+
+class ChangeFeed(BaseModel):
+    since: int = Field(..., description="Токен, переданный в запросе")
+    next_token: int = Field(..., description="Токен для следующего запроса")
+    has_more: bool = Field(..., description="Есть ли еще изменения после next_token")
+    organizations: List[OrganizationDelta] = []
+    buildings: List[BuildingDelta] = []
+    activities: List[ActivityDelta] = []
+    phones: List[PhoneDelta] = []
+
+
+class AutocompleteItem(BaseModel):
+    id: int
+    name: str
+    type: str = Field(..., description="organization или activity")
+
+
+class WriteJobStatus(BaseModel):
+    job_id: str
+    entity_type: str
+    status: str = Field(..., description="pending, committed или failed")
+    entity_id: Optional[int] = None
+    error: Optional[str] = None
+    status_url: Optional[str] = None
+
+
+class WritePipelineStats(BaseModel):
+    queue_depth: int
+    enqueued_total: int
+    committed_total: int
+    failed_total: int
+    batches_total: int
+    last_batch_size: int
+    max_batch_size_seen: int
+    avg_batch_size: float
+    running: bool
+
+
+class AdmissionStats(BaseModel):
+    admitted_total: int
+    queued_total: int
+    rejected_rate_limited_total: int
+    rejected_overloaded_total: int
+    in_flight: int
+    waiting: int
+    max_concurrency: int
+    queue_timeout_ms: int
+    tracked_keys: int
+
+
+class SingleFlightStats(BaseModel):
+    calls_total: int
+    executions_total: int
+    coalesced_total: int
+    in_flight: int
+    coalescing_ratio: float
+
+
+class GeoTileCacheStats(BaseModel):
+    precision: int
+    tiles: int
+    hits: int
+    misses: int
+    invalidations: int
+
+
+class EngineStats(BaseModel):
+    name: str
+    generation: int = Field(..., description="Порядковый номер движка, растет при каждой замене")
+    state: str = Field(..., description="active, draining или disposed")
+    in_flight_sessions: int
+    pool_size: Optional[int] = None
+    checked_out_connections: Optional[int] = None
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    duration_ms: float
+    samples: int
+    sql_count: int
+    sql_total_ms: float
+
+
+class SqlStatementStats(BaseModel):
+    statement: str
+    count: int
+    total_ms: float
+    max_ms: float
+
+
+class ProfileDetail(ProfileSummary):
+    sql: List[SqlStatementStats] = []
+
+
+class SlowQueryEntry(BaseModel):
+    timestamp: datetime
+    duration_ms: float
+    route: Optional[str] = None
+    statement: str
+    parameters: str
+    plan: Optional[str] = None
+    plan_status: str
+
+
 class ApiResponse(BaseModel):
     success: bool = True
     message: str = "Success"
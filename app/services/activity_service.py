@@ -1,10 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, func
 from typing import List, Optional
-from app.core.patterns import BaseService
+from app.core.patterns import BaseService, ActivitySearchStrategy
+from app.core.single_flight import coalesced
 from app.models.models import Activity
-from app.schemas.schemas import ActivityCreate
+from app.schemas.schemas import ActivityCreate, ActivityTreeImport
 from app.core.config import get_settings
 
 
@@ -13,6 +14,7 @@ class ActivityService(BaseService):
     def get_model_class(self):
         return Activity
     
+    @coalesced()
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[Activity]:
         query = select(Activity).options(
             selectinload(Activity.children)
@@ -20,6 +22,7 @@ class ActivityService(BaseService):
         result = await self.db.execute(query)
         return result.scalars().unique().all()
 
+    @coalesced()
     async def get_by_id(self, activity_id: int) -> Optional[Activity]:
         query = select(Activity).options(
             selectinload(Activity.children),
@@ -61,6 +64,74 @@ class ActivityService(BaseService):
             level=level
         )
 
+    async def import_tree(self, tree: ActivityTreeImport) -> dict:
+        """
+        Создание вложенного дерева видов деятельности в одной транзакции.
+
+        Глубина и размер проверяются в памяти до записи; узлы вставляются
+        по уровням, одним многострочным INSERT ... RETURNING на уровень.
+        """
+        settings = get_settings()
+        base_level = 0
+        if tree.parent_id is not None:
+            parent_result = await self.db.execute(select(Activity.level).where(Activity.id == tree.parent_id))
+            base_level = parent_result.scalar()
+            if base_level is None:
+                raise ValueError("Родительская активность не найдена")
+
+        # Уровни дерева: (узел, индекс родителя на предыдущем уровне)
+        levels = []
+        level = [(node, None) for node in tree.nodes]
+        total = 0
+        while level:
+            if base_level + len(levels) + 1 > settings.max_activity_depth:
+                raise ValueError(f"Превышена максимальная глубина активности ({settings.max_activity_depth})")
+            total += len(level)
+            if total > settings.activity_import_max_nodes:
+                raise ValueError(f"Слишком много узлов в дереве (максимум {settings.activity_import_max_nodes})")
+            levels.append(level)
+            level = [
+                (child, index)
+                for index, (node, _) in enumerate(level)
+                for child in node.children
+            ]
+
+        roots = []
+        parents = []
+        for depth, level in enumerate(levels, start=base_level + 1):
+            rows = [
+                {
+                    "name": node.name,
+                    "parent_id": tree.parent_id if parent_index is None else parents[parent_index][0].id,
+                    "level": depth,
+                }
+                for node, parent_index in level
+            ]
+            # RETURNING в порядке строк запроса: id сопоставляются узлам по позиции
+            result = await self.db.scalars(
+                insert(Activity).returning(Activity, sort_by_parameter_order=True), rows
+            )
+            activities = result.all()
+
+            created = []
+            for activity, (_, parent_index) in zip(activities, level):
+                await self._record_change(activity)
+                created_node = {
+                    "id": activity.id,
+                    "name": activity.name,
+                    "parent_id": activity.parent_id,
+                    "level": activity.level,
+                    "children": [],
+                }
+                (roots if parent_index is None else parents[parent_index][1]["children"]).append(created_node)
+                created.append((activity, created_node))
+            parents = created
+
+        await self.db.commit()
+        self.publish_changes()
+        return {"created": total, "nodes": roots}
+
+    @coalesced()
     async def get_root_activities(self) -> List[Activity]:
         query = select(Activity).options(
             selectinload(Activity.children)
@@ -68,6 +139,7 @@ class ActivityService(BaseService):
         result = await self.db.execute(query)
         return result.scalars().unique().all()
 
+    @coalesced()
     async def get_activity_tree(self, activity_id: int) -> Optional[Activity]:
         activity = await self.get_by_id(activity_id)
         if not activity:
@@ -87,10 +159,15 @@ class ActivityService(BaseService):
             if loaded_child and loaded_child.children:
                 await self._load_children_recursively(loaded_child)
 
+    @coalesced(casefold=("name",))
     async def find_by_name(self, name: str) -> List[Activity]:
         query = select(Activity).options(
             selectinload(Activity.children),
             selectinload(Activity.parent)
         ).where(Activity.name.ilike(f"%{name}%"))
         result = await self.db.execute(query)
-        return result.scalars().unique().all()
\ No newline at end of file
+        return result.scalars().unique().all()
+
+    async def get_subtree_ids(self, activity_id: int) -> List[int]:
+        strategy = ActivitySearchStrategy(self.db)
+        return await strategy._get_activity_hierarchy_ids(activity_id)
\ No newline at end of file
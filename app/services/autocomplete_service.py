@@ -0,0 +1,26 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from app.core.prefix_index import PrefixIndex, ORGANIZATION, ACTIVITY
+from app.models.models import Organization, Activity
+
+
+class AutocompleteService:
+    """Подсказки по названиям организаций и видов деятельности из префиксного индекса"""
+
+    def __init__(self, db_session: AsyncSession, index: PrefixIndex):
+        self.db = db_session
+        self.index = index
+
+    async def load_index(self):
+        organizations = await self.db.execute(select(Organization.id, Organization.name))
+        activities = await self.db.execute(select(Activity.id, Activity.name))
+
+        entries = [(ORGANIZATION, entity_id, name) for entity_id, name in organizations.all()]
+        entries.extend((ACTIVITY, entity_id, name) for entity_id, name in activities.all())
+        self.index.rebuild(entries)
+
+    async def suggest(self, query: str, limit: int = 10, kinds: Optional[List[str]] = None) -> List[dict]:
+        if not self.index.loaded:
+            await self.load_index()
+        return self.index.search(query, limit=limit, kinds=kinds)
@@ -0,0 +1,196 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.addresses import building_dedup_key
+from app.services.building_service import BuildingService
+
+FORMATS = ("csv", "ndjson")
+REQUIRED_FIELDS = ("address", "latitude", "longitude")
+MAX_ADDRESS_LENGTH = 500
+
+# (номер строки данных, запись или None, ошибка разбора или None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Строки UTF-8 из потока байтов без загрузки всего потока в память"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_csv_rows(lines: AsyncIterable[str]) -> AsyncIterator[ParsedRow]:
+    """
+    Записи CSV с заголовком.
+
+    Запись с переводом строки внутри кавычек собирается из нескольких строк:
+    она закончена, когда число кавычек в ней четное.
+    """
+    header: Optional[List[str]] = None
+    record = ""
+    row_number = 0
+    async for line in lines:
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            missing = [field for field in REQUIRED_FIELDS if field not in header]
+            if missing:
+                yield 0, None, f"Missing columns: {', '.join(missing)}"
+                return
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row_number, dict(zip(header, values)), None
+
+    if record:
+        yield row_number + 1, None, "Unterminated quoted field"
+
+
+async def iter_ndjson_rows(lines: AsyncIterable[str]) -> AsyncIterator[ParsedRow]:
+    """Записи NDJSON: по одному объекту JSON в строке, пустые строки пропускаются"""
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(value, dict):
+            yield row_number, None, "Row must be a JSON object"
+            continue
+        yield row_number, value, None
+
+
+def parse_rows(chunks: AsyncIterable[bytes], file_format: str) -> AsyncIterator[ParsedRow]:
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported format: {file_format}")
+    lines = iter_lines(chunks)
+    return iter_csv_rows(lines) if file_format == "csv" else iter_ndjson_rows(lines)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _coordinates(values: List[Any]) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        # Медленный путь только для пачек с нечисловыми значениями
+        return np.asarray([_to_float(value) for value in values], dtype=float)
+
+
+class BuildingImporter:
+    """
+    Потоковый импорт зданий.
+
+    Записи обрабатываются пачками: координаты проверяются векторно,
+    дубликаты отсеиваются по ключу здания (внутри файла и среди существующих
+    зданий), остальное вставляется одной транзакцией на пачку.
+    """
+
+    def __init__(self, service: BuildingService, batch_size: int = 1000, max_errors: int = 1000):
+        self.service = service
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self._seen_keys = set()
+        self._report = {
+            "total_rows": 0,
+            "inserted": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "errors": [],
+            "errors_truncated": False,
+        }
+
+    async def run(self, rows: AsyncIterable[ParsedRow]) -> Dict[str, Any]:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for row_number, record, error in rows:
+            if error is not None:
+                if row_number:
+                    self._report["total_rows"] += 1
+                self._add_error(row_number, error)
+                continue
+            self._report["total_rows"] += 1
+            batch.append((row_number, record))
+            if len(batch) >= self.batch_size:
+                await self._process_batch(batch)
+                batch = []
+        if batch:
+            await self._process_batch(batch)
+        return self._report
+
+    def _add_error(self, row_number: int, error: str):
+        self._report["failed"] += 1
+        if len(self._report["errors"]) < self.max_errors:
+            self._report["errors"].append({"row": row_number, "error": error})
+        else:
+            self._report["errors_truncated"] = True
+
+    async def _process_batch(self, batch: List[Tuple[int, Dict[str, Any]]]):
+        addresses = [record.get("address") for _, record in batch]
+        latitudes = _coordinates([record.get("latitude") for _, record in batch])
+        longitudes = _coordinates([record.get("longitude") for _, record in batch])
+
+        valid_latitudes = np.isfinite(latitudes) & (latitudes >= -90) & (latitudes <= 90)
+        valid_longitudes = np.isfinite(longitudes) & (longitudes >= -180) & (longitudes <= 180)
+
+        candidates = []
+        for index, (row_number, _) in enumerate(batch):
+            address = addresses[index].strip() if isinstance(addresses[index], str) else ""
+            if not address:
+                self._add_error(row_number, "Address is required")
+            elif len(address) > MAX_ADDRESS_LENGTH:
+                self._add_error(row_number, f"Address is longer than {MAX_ADDRESS_LENGTH} characters")
+            elif not valid_latitudes[index]:
+                self._add_error(row_number, "Latitude must be a number between -90 and 90")
+            elif not valid_longitudes[index]:
+                self._add_error(row_number, "Longitude must be a number between -180 and 180")
+            else:
+                latitude, longitude = float(latitudes[index]), float(longitudes[index])
+                candidates.append({
+                    "address": address,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "dedup_key": building_dedup_key(address, latitude, longitude),
+                })
+
+        existing = await self.service.find_existing_dedup_keys(list({row["dedup_key"] for row in candidates}))
+        new_rows = []
+        for row in candidates:
+            if row["dedup_key"] in existing or row["dedup_key"] in self._seen_keys:
+                self._report["duplicates"] += 1
+                continue
+            self._seen_keys.add(row["dedup_key"])
+            new_rows.append(row)
+
+        if new_rows:
+            inserted = await self.service.bulk_create(new_rows)
+            self._report["inserted"] += len(inserted)
+            self._report["duplicates"] += len(new_rows) - len(inserted)
@@ -1,8 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Set
+from app.core.addresses import building_dedup_key
+from app.core.counts import get_total_counter
 from app.core.patterns import BaseService
+from app.core.single_flight import coalesced
+from app.core.pagination import RELEVANCE_KEY_TYPES, SearchPage, fetch_page, relevance_keys
 from app.models.models import Building
 from app.schemas.schemas import BuildingCreate
 
@@ -12,18 +18,45 @@ class BuildingService(BaseService):
     def get_model_class(self):
         return Building
     
+    @coalesced()
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[Building]:
         query = select(Building).offset(skip).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    @coalesced()
     async def get_by_id(self, building_id: int) -> Optional[Building]:
         query = select(Building).where(Building.id == building_id)
         result = await self.db.execute(query)
         return result.scalars().first()
 
     async def create(self, building_data: BuildingCreate) -> Building:
-        return await self.create_entity(building_data)
+        """Создание здания; здание с тем же адресом и координатами возвращается без повторной вставки"""
+        existing = await self._find_duplicate(building_data)
+        if existing is not None:
+            return existing
+        try:
+            return await self.create_entity(building_data)
+        except IntegrityError:
+            # То же здание одновременно создано другим запросом
+            await self.db.rollback()
+            self.discard_changes()
+            existing = await self._find_duplicate(building_data)
+            if existing is None:
+                raise
+            return existing
+
+    async def stage_entity(self, entity_data: BuildingCreate, **kwargs) -> Building:
+        existing = await self._find_duplicate(entity_data)
+        if existing is not None:
+            return existing
+        return await super().stage_entity(entity_data, **kwargs)
+
+    async def _find_duplicate(self, building_data: BuildingCreate) -> Optional[Building]:
+        await self._validate_creation_data(building_data)
+        dedup_key = building_dedup_key(building_data.address, building_data.latitude, building_data.longitude)
+        result = await self.db.execute(select(Building).where(Building.dedup_key == dedup_key))
+        return result.scalars().first()
     
     async def _validate_creation_data(self, entity_data: BuildingCreate):
         if not (-90 <= entity_data.latitude <= 90):
@@ -39,7 +72,41 @@ class BuildingService(BaseService):
             longitude=entity_data.longitude
         )
 
-    async def find_by_address(self, address: str) -> List[Building]:
-        query = select(Building).where(Building.address.ilike(f"%{address}%"))
+    async def bulk_create(self, rows: List[dict]) -> List[Building]:
+        """
+        Создание пачки уже проверенных зданий в одной транзакции.
+
+        Вставка идет многострочными INSERT ... ON CONFLICT DO NOTHING по dedup_key:
+        здания, уже вставленные параллельным импортом, пропускаются и не возвращаются.
+        Изменения вставленных записываются в журнал и рассылаются после фиксации.
+        """
+        dialect = postgresql if self.db.bind.dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(Building).on_conflict_do_nothing(index_elements=[Building.dedup_key])
+        result = await self.db.scalars(statement.returning(Building), rows)
+        buildings = result.all()
+        for building in buildings:
+            await self._record_change(building)
+        await self.db.commit()
+        self.publish_changes()
+        return buildings
+
+    async def find_existing_dedup_keys(self, dedup_keys: List[str]) -> Set[str]:
+        if not dedup_keys:
+            return set()
+        query = select(Building.dedup_key).where(Building.dedup_key.in_(dedup_keys))
         result = await self.db.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        return set(result.scalars().all())
+
+    @coalesced(casefold=("address",))
+    async def find_by_address(self, address: str, limit: int = 100, cursor: Optional[str] = None) -> SearchPage:
+        query = select(Building).where(Building.address.ilike(f"%{address}%"))
+        sort_keys = relevance_keys(Building.address, address, Building.id)
+        return await fetch_page(self.db, query, sort_keys, RELEVANCE_KEY_TYPES, limit, cursor)
+
+    @coalesced(casefold=("address",))
+    async def count_by_address(self, address: str, mode: str = "auto"):
+        """Общее число зданий, найденных по адресу: (число, exact или estimated)"""
+        query = select(Building.id).where(Building.address.ilike(f"%{address}%"))
+        return await get_total_counter().count(
+            self.db, query, Building.__tablename__, filter_key=("address", address.casefold()), mode=mode
+        )
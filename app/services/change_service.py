@@ -0,0 +1,130 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import BigInteger, literal_column, select, func, tuple_
+from typing import Any, Dict, List, Set
+from app.core.events import build_event
+from app.models.models import ChangeLog, Organization, Building, Activity, Phone
+from app.schemas.schemas import (
+    ChangeFeed, OrganizationDelta, BuildingDelta, ActivityDelta, PhoneDelta
+)
+
+
+class ChangeService:
+    """Инкрементальная лента изменений поверх журнала change_log"""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    def _after(self, since: int) -> list:
+        """
+        Условия выборки записей после токена в порядке фиксации.
+
+        Токен - id последней полученной записи, его место в порядке
+        (transaction_id, id) берется из журнала. В PostgreSQL отдаются только
+        записи транзакций ниже xmin текущего снимка: все они уже завершены,
+        поэтому запись, зафиксированная позже, не окажется перед выданным токеном.
+        """
+        commit_order = self._commit_order()[0]
+        position = func.coalesce(
+            select(commit_order).where(ChangeLog.id == since).scalar_subquery(), 0
+        )
+        conditions = [tuple_(commit_order, ChangeLog.id) > tuple_(position, since)]
+        if self.db.bind.dialect.name == "postgresql":
+            conditions.append(
+                commit_order < literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint", BigInteger)
+            )
+        return conditions
+
+    @staticmethod
+    def _commit_order() -> list:
+        # Литерал 0, а не параметр: выражение совпадает с индексом ix_change_log_commit_order
+        return [func.coalesce(ChangeLog.transaction_id, literal_column("0", BigInteger)), ChangeLog.id]
+
+    async def get_changes(self, since: int = 0, limit: int = 1000) -> ChangeFeed:
+        query = select(ChangeLog.id, ChangeLog.entity_type, ChangeLog.entity_id).where(
+            *self._after(since)
+        ).order_by(*self._commit_order()).limit(limit + 1)
+        result = await self.db.execute(query)
+        entries = result.all()
+
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        changed: Dict[str, Set[int]] = {}
+        for _, entity_type, entity_id in entries:
+            changed.setdefault(entity_type, set()).add(entity_id)
+
+        return ChangeFeed(
+            since=since,
+            next_token=entries[-1][0] if entries else since,
+            has_more=has_more,
+            organizations=await self._load_organizations(changed.get(Organization.__tablename__, set())),
+            buildings=await self._load_plain(Building, BuildingDelta, changed.get(Building.__tablename__, set())),
+            activities=await self._load_plain(Activity, ActivityDelta, changed.get(Activity.__tablename__, set())),
+            phones=await self._load_plain(Phone, PhoneDelta, changed.get(Phone.__tablename__, set()))
+        )
+
+    async def _load_plain(self, model, schema, ids: Set[int]) -> List:
+        if not ids:
+            return []
+        result = await self.db.execute(select(model).where(model.id.in_(ids)).order_by(model.id))
+        return [schema.model_validate(entity) for entity in result.scalars().all()]
+
+    async def _load_organizations(self, ids: Set[int]) -> List[OrganizationDelta]:
+        if not ids:
+            return []
+        query = select(Organization).options(
+            selectinload(Organization.phones),
+            selectinload(Organization.activities)
+        ).where(Organization.id.in_(ids)).order_by(Organization.id)
+        result = await self.db.execute(query)
+
+        return [
+            OrganizationDelta(
+                id=organization.id,
+                name=organization.name,
+                building_id=organization.building_id,
+                phone_ids=[phone.id for phone in organization.phones],
+                activity_ids=[activity.id for activity in organization.activities],
+                updated_at=organization.updated_at
+            )
+            for organization in result.scalars().all()
+        ]
+
+    async def get_latest_token(self) -> int:
+        """id последней записи в порядке фиксации (0 для пустого журнала)"""
+        query = select(ChangeLog.id).where(*self._after(0)).order_by(
+            *(column.desc() for column in self._commit_order())
+        ).limit(1)
+        result = await self.db.execute(query)
+        return result.scalar() or 0
+
+    async def get_events(self, since: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """События создания после токена в формате рассылки подписчикам"""
+        query = select(ChangeLog).where(*self._after(since)).order_by(*self._commit_order()).limit(limit)
+        result = await self.db.execute(query)
+        changes = result.scalars().all()
+
+        ids_by_type: Dict[str, Set[int]] = {}
+        for change in changes:
+            ids_by_type.setdefault(change.entity_type, set()).add(change.entity_id)
+
+        models = {
+            Organization.__tablename__: (
+                Organization, [joinedload(Organization.building), selectinload(Organization.activities)]
+            ),
+            Building.__tablename__: (Building, []),
+            Activity.__tablename__: (Activity, []),
+            Phone.__tablename__: (Phone, []),
+        }
+
+        entities: Dict[tuple, Any] = {}
+        for entity_type, ids in ids_by_type.items():
+            if entity_type not in models:
+                continue
+            model, options = models[entity_type]
+            entity_result = await self.db.execute(select(model).options(*options).where(model.id.in_(ids)))
+            for entity in entity_result.scalars().unique().all():
+                entities[(entity_type, entity.id)] = entity
+
+        return [build_event(change, entities.get((change.entity_type, change.entity_id))) for change in changes]
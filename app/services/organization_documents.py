@@ -0,0 +1,148 @@
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import (
+    Activity, Building, Organization, OrganizationDocument, Phone,
+    organization_activity_association, organization_phone_association
+)
+
+BATCH_SIZE = 1000
+
+
+def build_document(
+    organization: Dict[str, Any],
+    phones: List[Dict[str, Any]],
+    activities: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Документ организации в форме ответа API (схема Organization)"""
+    return {
+        "id": organization["id"],
+        "name": organization["name"],
+        "building_id": organization["building_id"],
+        "building": {
+            "id": organization["building_id"],
+            "address": organization["address"],
+            "latitude": organization["latitude"],
+            "longitude": organization["longitude"],
+        },
+        "phones": phones,
+        "activities": activities,
+    }
+
+
+def _activity_paths(execute, activity_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Путь от корня иерархии до каждого из видов деятельности одним рекурсивным запросом"""
+    ancestors = select(
+        Activity.id.label("activity_id"),
+        Activity.id.label("ancestor_id"),
+        Activity.parent_id.label("parent_id")
+    ).where(Activity.id.in_(list(activity_ids))).cte("activity_ancestors", recursive=True)
+    ancestors = ancestors.union_all(
+        select(ancestors.c.activity_id, Activity.id, Activity.parent_id)
+        .join(Activity, Activity.id == ancestors.c.parent_id)
+    )
+    query = select(ancestors.c.activity_id, Activity.id, Activity.name, Activity.level).join(
+        Activity, Activity.id == ancestors.c.ancestor_id
+    ).order_by(ancestors.c.activity_id, Activity.level)
+
+    paths: Dict[int, List[Dict[str, Any]]] = {}
+    for activity_id, ancestor_id, name, _ in execute(query):
+        paths.setdefault(activity_id, []).append({"id": ancestor_id, "name": name})
+    return paths
+
+
+def refresh_documents_sync(connection, organization_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Пересборка документов организаций (всех, если organization_ids не задан).
+    Принимает синхронное соединение или сессию, чтобы работать и в миграции.
+    """
+    execute = connection.execute
+    if organization_ids is None:
+        organization_ids = execute(select(Organization.id).order_by(Organization.id)).scalars().all()
+    organization_ids = list(organization_ids)
+
+    for start in range(0, len(organization_ids), BATCH_SIZE):
+        batch = organization_ids[start:start + BATCH_SIZE]
+        organizations = execute(
+            select(
+                Organization.id, Organization.name, Organization.building_id,
+                Building.address, Building.latitude, Building.longitude
+            ).join(Building, Building.id == Organization.building_id).where(Organization.id.in_(batch))
+        ).mappings().all()
+
+        phones: Dict[int, List[Dict[str, Any]]] = {}
+        for organization_id, phone_id, number in execute(
+            select(organization_phone_association.c.organization_id, Phone.id, Phone.number)
+            .join(Phone, Phone.id == organization_phone_association.c.phone_id)
+            .where(organization_phone_association.c.organization_id.in_(batch))
+            .order_by(Phone.id)
+        ):
+            phones.setdefault(organization_id, []).append({"id": phone_id, "number": number})
+
+        activities: Dict[int, List[Dict[str, Any]]] = {}
+        for organization_id, activity_id, name, parent_id, level in execute(
+            select(
+                organization_activity_association.c.organization_id,
+                Activity.id, Activity.name, Activity.parent_id, Activity.level
+            )
+            .join(Activity, Activity.id == organization_activity_association.c.activity_id)
+            .where(organization_activity_association.c.organization_id.in_(batch))
+            .order_by(Activity.id)
+        ):
+            activities.setdefault(organization_id, []).append(
+                {"id": activity_id, "name": name, "parent_id": parent_id, "level": level}
+            )
+
+        activity_ids = {activity["id"] for items in activities.values() for activity in items}
+        paths = _activity_paths(execute, activity_ids) if activity_ids else {}
+
+        rows = []
+        for organization in organizations:
+            organization_activities = [
+                dict(activity, path=[ancestor["name"] for ancestor in paths.get(activity["id"], [])])
+                for activity in activities.get(organization["id"], [])
+            ]
+            path_ids = sorted({
+                ancestor["id"]
+                for activity in organization_activities
+                for ancestor in paths.get(activity["id"], [])
+            })
+            rows.append({
+                "organization_id": organization["id"],
+                "name": organization["name"],
+                "building_id": organization["building_id"],
+                "address": organization["address"],
+                "latitude": organization["latitude"],
+                "longitude": organization["longitude"],
+                "activity_ids": [activity["id"] for activity in organization_activities],
+                "activity_path_ids": path_ids,
+                "document": build_document(
+                    organization, phones.get(organization["id"], []), organization_activities
+                ),
+            })
+
+        execute(delete(OrganizationDocument).where(OrganizationDocument.organization_id.in_(batch)))
+        if rows:
+            execute(insert(OrganizationDocument), rows)
+    return len(organization_ids)
+
+
+async def refresh_organization_documents(db: AsyncSession, organization_ids: Optional[Iterable[int]] = None) -> int:
+    """Пересборка документов в текущей транзакции сессии (фиксирует вызывающий)"""
+    if organization_ids is not None:
+        organization_ids = list(organization_ids)
+    return await db.run_sync(refresh_documents_sync, organization_ids)
+
+
+async def backfill_missing_documents(db: AsyncSession) -> int:
+    """
+    Сборка документов организаций, у которых их нет: базы, созданные create_all
+    или заполненные в обход сервисов. Фиксирует вызывающий.
+    """
+    query = select(Organization.id).where(
+        ~exists().where(OrganizationDocument.organization_id == Organization.id)
+    ).order_by(Organization.id)
+    organization_ids = (await db.execute(query)).scalars().all()
+    if not organization_ids:
+        return 0
+    return await refresh_organization_documents(db, organization_ids)
@@ -1,14 +1,26 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy import select, func, and_, or_
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from app.core.patterns import (
     BaseService, SearchContext, GeographicSearchStrategy, 
-    NameSearchStrategy, ActivitySearchStrategy
+    NameSearchStrategy, ActivitySearchStrategy, PolygonSearchStrategy,
+    BatchGeographicSearchStrategy, TiledGeographicSearchStrategy
 )
-from app.models.models import Organization, Building, Activity, Phone
-from app.schemas.schemas import OrganizationCreate, SearchArea
-import math
+from app.core.config import get_settings
+from app.core.geo_tiles import get_geo_tile_cache
+from app.core.read_paths import organization_rows, use_core
+from app.core.single_flight import coalesced
+from app.core.pagination import SearchPage, decode_cursor, fetch_page
+from app.core.phones import normalize_phone_number
+from app.models.models import (
+    Organization, OrganizationDocument, Building, Activity, Phone, organization_phone_association
+)
+from app.schemas.schemas import (
+    Organization as OrganizationSchema, OrganizationCreate, SearchArea, PolygonSearchArea, BatchGeoSearch
+)
+from app.services.organization_documents import refresh_organization_documents
 
 
 class OrganizationService(BaseService):
@@ -16,25 +28,32 @@ class OrganizationService(BaseService):
     def get_model_class(self):
         return Organization
     
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Organization]:
-        query = select(Organization).options(
-            joinedload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities)
+    @coalesced()
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[OrganizationSchema]:
+        query = select(OrganizationDocument.document).order_by(
+            OrganizationDocument.organization_id
         ).offset(skip).limit(limit)
         
         result = await self.db.execute(query)
-        return result.scalars().unique().all()
+        return self._from_documents(result.scalars().all())
 
-    async def get_by_id(self, organization_id: int) -> Optional[Organization]:
-        query = select(Organization).options(
-            joinedload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities)
-        ).where(Organization.id == organization_id)
+    @coalesced()
+    async def get_by_id(self, organization_id: int) -> Optional[OrganizationSchema]:
+        query = select(OrganizationDocument.document).where(
+            OrganizationDocument.organization_id == organization_id
+        )
         
         result = await self.db.execute(query)
-        return result.scalars().first()
+        document = result.scalar()
+        if document is None or use_core(self.db):
+            return document
+        return OrganizationSchema.model_validate(document)
+
+    def _from_documents(self, documents) -> List[OrganizationSchema]:
+        # На пути чтения core документы отдаются как есть, без построения моделей
+        if use_core(self.db):
+            return list(documents)
+        return [OrganizationSchema.model_validate(document) for document in documents]
 
     async def create(self, organization_data: OrganizationCreate) -> Organization:
         return await self.create_entity(organization_data)
@@ -54,6 +73,10 @@ class OrganizationService(BaseService):
             
             if not activity:
                 raise ValueError(f"Активность с id {activity_id} не найдена")
+        
+        for phone_number in entity_data.phone_numbers:
+            if not normalize_phone_number(phone_number):
+                raise ValueError(f"Некорректный номер телефона: {phone_number}")
 
     async def _build_entity(self, entity_data: OrganizationCreate, **kwargs) -> Organization:
         organization = Organization(
@@ -61,16 +84,7 @@ class OrganizationService(BaseService):
             building_id=entity_data.building_id
         )
         
-        for phone_number in entity_data.phone_numbers:
-            phone_query = select(Phone).where(Phone.number == phone_number)
-            phone_result = await self.db.execute(phone_query)
-            phone = phone_result.scalars().first()
-            
-            if not phone:
-                phone = Phone(number=phone_number)
-                self.db.add(phone)
-                await self.db.flush()
-            
+        for phone in await self._upsert_phones(entity_data.phone_numbers):
             organization.phones.append(phone)
         
         for activity_id in entity_data.activity_ids:
@@ -83,31 +97,154 @@ class OrganizationService(BaseService):
         
         return organization
 
+    async def _upsert_phones(self, phone_numbers: List[str]) -> List[Phone]:
+        """Поиск телефонов по нормализованному номеру одним запросом и создание недостающих"""
+        numbers = {}
+        for phone_number in phone_numbers:
+            numbers.setdefault(normalize_phone_number(phone_number), phone_number)
+        
+        if not numbers:
+            return []
+        
+        phones_query = select(Phone).where(Phone.normalized_number.in_(numbers))
+        phones_result = await self.db.execute(phones_query)
+        phones = {phone.normalized_number: phone for phone in phones_result.scalars().all()}
+        
+        for normalized_number, phone_number in numbers.items():
+            if normalized_number in phones:
+                continue
+            
+            phone = Phone(number=phone_number, normalized_number=normalized_number)
+            try:
+                async with self.db.begin_nested():
+                    self.db.add(phone)
+                    await self.db.flush()
+            except IntegrityError:
+                # Тот же номер одновременно создан другим запросом
+                phone_query = select(Phone).where(Phone.normalized_number == normalized_number)
+                phone_result = await self.db.execute(phone_query)
+                phones[normalized_number] = phone_result.scalars().one()
+                continue
+            
+            await self._record_change(phone)
+            phones[normalized_number] = phone
+        
+        return [phones[normalized_number] for normalized_number in numbers]
+
+    async def _record_change(self, entity, operation: str = "create"):
+        await super()._record_change(entity, operation)
+        if isinstance(entity, Organization):
+            # Документ пересобирается в той же транзакции, что и сама организация
+            await refresh_organization_documents(self.db, [entity.id])
+
     async def _post_creation_hook(self, entity):
-        await self.db.refresh(entity)
+        # Здание и виды деятельности нужны в данных события о создании
+        await self.db.refresh(entity, ["building", "activities"])
         return await self.get_by_id(entity.id)
 
-    async def find_by_building(self, building_id: int) -> List[Organization]:
-        query = select(Organization).options(
-            joinedload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities)
-        ).where(Organization.building_id == building_id)
+    @coalesced()
+    async def find_by_building(self, building_id: int, limit: int = 100, cursor: Optional[str] = None) -> SearchPage:
+        query = select(OrganizationDocument.document).where(OrganizationDocument.building_id == building_id)
         
-        result = await self.db.execute(query)
-        return result.scalars().unique().all()
+        sort_keys = [OrganizationDocument.name, OrganizationDocument.organization_id]
+        page = await fetch_page(self.db, query, sort_keys, (str, int), limit, cursor)
+        return SearchPage(self._from_documents(page.items), page.next_cursor)
 
-    async def find_by_activity(self, activity_name: str) -> List[Organization]:
+    @coalesced()
+    async def find_by_phone(self, phone_number: str, limit: int = 100, cursor: Optional[str] = None) -> SearchPage:
+        if cursor:
+            decode_cursor(cursor, (int,))
+        normalized_number = normalize_phone_number(phone_number)
+        if not normalized_number:
+            return SearchPage()
+        
+        if use_core(self.db):
+            query = organization_rows(self.db.bind.dialect.name)
+        else:
+            query = select(Organization).options(
+                joinedload(Organization.building),
+                selectinload(Organization.phones),
+                selectinload(Organization.activities)
+            )
+        # IN по id организаций номера: выборка идет от индекса номера, организации не дублируются
+        phone_organizations = select(organization_phone_association.c.organization_id).join(
+            Phone, Phone.id == organization_phone_association.c.phone_id
+        ).where(Phone.normalized_number == normalized_number)
+        query = query.where(Organization.id.in_(phone_organizations))
+        
+        return await fetch_page(self.db, query, [Organization.id], (int,), limit, cursor)
+
+    @coalesced(casefold=("activity_name",))
+    async def find_by_activity(
+        self, activity_name: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> SearchPage:
+        strategy = ActivitySearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        return await search_context.search(activity_name=activity_name, limit=limit, cursor=cursor)
+
+    @coalesced(casefold=("activity_name",))
+    async def get_activity_facets(self, activity_name: str) -> List[dict]:
+        strategy = ActivitySearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        return await search_context.activity_facets(activity_name=activity_name)
+
+    @coalesced(casefold=("activity_name",))
+    async def count_by_activity(self, activity_name: str, mode: str = "auto"):
         strategy = ActivitySearchStrategy(self.db)
         search_context = SearchContext(strategy)
-        return await search_context.search(activity_name=activity_name)
+        return await search_context.count_matches(mode=mode, activity_name=activity_name)
+
+    @coalesced(casefold=("name",))
+    async def find_by_name(self, name: str, limit: int = 100, cursor: Optional[str] = None) -> SearchPage:
+        strategy = NameSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        return await search_context.search(name=name, limit=limit, cursor=cursor)
 
-    async def find_by_name(self, name: str) -> List[Organization]:
+    @coalesced(casefold=("name",))
+    async def get_name_facets(self, name: str) -> List[dict]:
         strategy = NameSearchStrategy(self.db)
         search_context = SearchContext(strategy)
-        return await search_context.search(name=name)
+        return await search_context.activity_facets(name=name)
 
+    @coalesced(casefold=("name",))
+    async def count_by_name(self, name: str, mode: str = "auto"):
+        strategy = NameSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        return await search_context.count_matches(mode=mode, name=name)
+
+    @coalesced()
     async def find_by_geographic_area(
+        self, 
+        latitude: float, 
+        longitude: float, 
+        radius: Optional[float] = None,
+        min_latitude: Optional[float] = None,
+        max_latitude: Optional[float] = None,
+        min_longitude: Optional[float] = None,
+        max_longitude: Optional[float] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> SearchPage:
+        if get_settings().geo_tile_cache_enabled:
+            strategy = TiledGeographicSearchStrategy(self.db, get_geo_tile_cache())
+        else:
+            strategy = GeographicSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        
+        return await search_context.search(
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            min_latitude=min_latitude,
+            max_latitude=max_latitude,
+            min_longitude=min_longitude,
+            max_longitude=max_longitude,
+            limit=limit,
+            cursor=cursor
+        )
+
+    @coalesced()
+    async def get_geographic_area_facets(
         self, 
         latitude: float, 
         longitude: float, 
@@ -116,11 +253,11 @@ class OrganizationService(BaseService):
         max_latitude: Optional[float] = None,
         min_longitude: Optional[float] = None,
         max_longitude: Optional[float] = None
-    ) -> List[Organization]:
+    ) -> List[dict]:
         strategy = GeographicSearchStrategy(self.db)
         search_context = SearchContext(strategy)
         
-        return await search_context.search(
+        return await search_context.activity_facets(
             latitude=latitude,
             longitude=longitude,
             radius=radius,
@@ -128,4 +265,67 @@ class OrganizationService(BaseService):
             max_latitude=max_latitude,
             min_longitude=min_longitude,
             max_longitude=max_longitude
-        )
\ No newline at end of file
+        )
+
+    @coalesced()
+    async def count_by_geographic_area(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: Optional[float] = None,
+        min_latitude: Optional[float] = None,
+        max_latitude: Optional[float] = None,
+        min_longitude: Optional[float] = None,
+        max_longitude: Optional[float] = None,
+        mode: str = "auto"
+    ):
+        strategy = GeographicSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+
+        return await search_context.count_matches(
+            mode=mode,
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            min_latitude=min_latitude,
+            max_latitude=max_latitude,
+            min_longitude=min_longitude,
+            max_longitude=max_longitude
+        )
+
+    @coalesced()
+    async def find_in_polygon(
+        self, area: PolygonSearchArea, limit: int = 100, cursor: Optional[str] = None
+    ) -> SearchPage:
+        strategy = PolygonSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        return await search_context.search(polygons=area.polygons(), limit=limit, cursor=cursor)
+
+    @coalesced()
+    async def get_polygon_facets(self, area: PolygonSearchArea) -> List[dict]:
+        strategy = PolygonSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        return await search_context.activity_facets(polygons=area.polygons())
+
+    @coalesced()
+    async def count_by_polygon(self, area: PolygonSearchArea, mode: str = "auto"):
+        strategy = PolygonSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        return await search_context.count_matches(mode=mode, polygons=area.polygons())
+
+    async def find_near_points(self, search: BatchGeoSearch) -> List[dict]:
+        strategy = BatchGeographicSearchStrategy(self.db)
+        search_context = SearchContext(strategy)
+        matches = await search_context.search(
+            points=[(point.latitude, point.longitude) for point in search.points],
+            radius=search.radius,
+            limit_per_point=search.k or search.limit_per_point
+        )
+        return [
+            {
+                "point_index": point_index,
+                "organizations": [organization for organization, _ in point_matches],
+                "distances_km": [round(distance, 3) for _, distance in point_matches],
+            }
+            for point_index, point_matches in enumerate(matches)
+        ]
@@ -3,6 +3,9 @@ from app.core.patterns import ServiceFactory
 from app.services.organization_service import OrganizationService
 from app.services.building_service import BuildingService
 from app.services.activity_service import ActivityService
+from app.services.change_service import ChangeService
+from app.services.autocomplete_service import AutocompleteService
+from app.core.prefix_index import get_prefix_index
 
 
 class ConcreteServiceFactory(ServiceFactory):
@@ -13,4 +16,10 @@ class ConcreteServiceFactory(ServiceFactory):
         return BuildingService(db_session)
 
     def create_activity_service(self, db_session: AsyncSession) -> ActivityService:
-        return ActivityService(db_session)
\ No newline at end of file
+        return ActivityService(db_session)
+
+    def create_change_service(self, db_session: AsyncSession) -> ChangeService:
+        return ChangeService(db_session)
+
+    def create_autocomplete_service(self, db_session: AsyncSession) -> AutocompleteService:
+        return AutocompleteService(db_session, get_prefix_index())
\ No newline at end of file
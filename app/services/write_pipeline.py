@@ -0,0 +1,205 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.patterns import ServiceFactory
+
+
+class WriteJob:
+    """Отложенная операция создания сущности в пакетном конвейере записи"""
+
+    def __init__(self, entity_type: str, entity_data):
+        self.id = uuid.uuid4().hex
+        self.entity_type = entity_type
+        self.entity_data = entity_data
+        self.status = "pending"
+        self.entity_id: Optional[int] = None
+        self.error: Optional[str] = None
+        self._future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    async def wait(self):
+        """Дождаться фиксации пакета и вернуть созданную сущность"""
+        return await asyncio.shield(self._future)
+
+    def complete(self, entity):
+        self.status = "committed"
+        self.entity_id = entity.id
+        if not self._future.done():
+            self._future.set_result(entity)
+
+    def fail(self, error: Exception):
+        self.status = "failed"
+        self.error = str(error)
+        if not self._future.done():
+            self._future.set_exception(error)
+        # Исключение могут так и не забрать (режим deferred) - не засоряем лог
+        self._future.exception()
+
+
+class GroupCommitPipeline:
+    """
+    Конвейер группового коммита.
+
+    Запросы на создание ставятся в очередь, фоновая задача собирает их в пакеты
+    по размеру или окну времени и фиксирует каждый пакет одной транзакцией.
+    Каждая сущность создается в своей точке сохранения, поэтому ошибка
+    в одной строке не отменяет остальные.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        service_factory: ServiceFactory,
+        max_batch_size: int = 100,
+        max_wait_ms: int = 20,
+        max_queue_size: int = 10000,
+        job_retention: int = 10000
+    ):
+        self._session_factory = session_factory
+        self._service_factory = service_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._max_queue_size = max_queue_size
+        self._job_retention = job_retention
+        self._jobs: "OrderedDict[str, WriteJob]" = OrderedDict()
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {
+            "enqueued_total": 0,
+            "committed_total": 0,
+            "failed_total": 0,
+            "batches_total": 0,
+            "last_batch_size": 0,
+            "max_batch_size_seen": 0,
+        }
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Остановить конвейер, зафиксировав все уже поставленные в очередь записи"""
+        if self._worker is None:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    def submit(self, entity_type: str, entity_data) -> WriteJob:
+        """Поставить создание сущности в очередь. Бросает asyncio.QueueFull при переполнении"""
+        self.start()
+        job = WriteJob(entity_type, entity_data)
+        self._queue.put_nowait(job)
+        self._remember(job)
+        self._stats["enqueued_total"] += 1
+        return job
+
+    def get_job(self, job_id: str) -> Optional[WriteJob]:
+        return self._jobs.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self._stats["batches_total"]
+        processed = self._stats["committed_total"] + self._stats["failed_total"]
+        return {
+            **self._stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "avg_batch_size": processed / batches if batches else 0.0,
+            "running": self._worker is not None and not self._worker.done(),
+        }
+
+    def _remember(self, job: WriteJob):
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._job_retention:
+            self._jobs.popitem(last=False)
+
+    def _create_service(self, entity_type: str, session):
+        create_service = getattr(self._service_factory, f"create_{entity_type}_service")
+        return create_service(session)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            job = await self._queue.get()
+            if job is None:
+                break
+
+            batch, stopping = await self._collect_batch(job)
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                for pending_job in batch:
+                    if pending_job.status == "pending":
+                        self._stats["failed_total"] += 1
+                        pending_job.fail(e)
+
+    async def _collect_batch(self, job: WriteJob):
+        """Пакет из job и задач, пришедших за окно max_wait: (пакет, получен ли сигнал остановки)"""
+        loop = asyncio.get_running_loop()
+        batch = [job]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                next_job = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if next_job is None:
+                return batch, True
+            batch.append(next_job)
+        return batch, False
+
+    async def _commit_batch(self, batch: List[WriteJob]):
+        self._stats["batches_total"] += 1
+        self._stats["last_batch_size"] = len(batch)
+        self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], len(batch))
+
+        async with self._session_factory() as session:
+            staged = []
+            for job in batch:
+                staged_job = await self._stage(session, job)
+                if staged_job is not None:
+                    staged.append(staged_job)
+
+            try:
+                await session.commit()
+            except SQLAlchemyError as e:
+                await session.rollback()
+                for job, service, _ in staged:
+                    service.discard_changes()
+                    self._stats["failed_total"] += 1
+                    job.fail(e)
+                return
+
+            for job, service, entity in staged:
+                try:
+                    entity = await service.finish_entity(entity)
+                except Exception as e:
+                    # Запись зафиксирована, но вернуть ее нельзя: задача завершается ошибкой,
+                    # событие придет подписчикам при повторе из журнала изменений
+                    service.discard_changes()
+                    self._stats["failed_total"] += 1
+                    job.fail(e)
+                    continue
+                service.publish_changes()
+                self._stats["committed_total"] += 1
+                job.complete(entity)
+
+    async def _stage(self, session, job: WriteJob):
+        """Создание сущности задачи в своей точке сохранения: (задача, сервис, сущность) или None при ошибке"""
+        service = None
+        try:
+            service = self._create_service(job.entity_type, session)
+            async with session.begin_nested():
+                entity = await service.stage_entity(job.entity_data)
+            return job, service, entity
+        except Exception as e:
+            # Ошибка одной записи (в том числе в данных запроса) не отменяет остальные
+            if service is not None:
+                service.discard_changes()
+            self._stats["failed_total"] += 1
+            job.fail(e)
+            return None
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from benchmarks.suite import CASES, SCALES, seed
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "default.json")
+
+
+async def measure(case, context: Dict[str, Any], iterations: int, warmup: int) -> Dict[str, float]:
+    """Время выполнения по итерациям и пик выделенной памяти за один отдельный прогон"""
+    for _ in range(warmup):
+        await case(context)
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await case(context)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        await case(context)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+async def run_scale(scale_name: str, cases: Iterable[str], iterations: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}", poolclass=NullPool)
+        try:
+            context = await seed(engine, SCALES[scale_name], random.Random(42))
+            return {
+                f"{scale_name}/{case_name}": await measure(CASES[case_name], context, iterations, warmup)
+                for case_name in cases
+            }
+        finally:
+            await engine.dispose()
+
+
+def run_benchmarks(
+    scales: Iterable[str],
+    cases: Iterable[str],
+    iterations: int = 20,
+    warmup: int = 3
+) -> Dict[str, Any]:
+    cases = list(cases)
+    results = {}
+    for scale_name in scales:
+        results.update(asyncio.run(run_scale(scale_name, cases, iterations, warmup)))
+    return {**environment(), "results": results}
+
+
+def environment() -> Dict[str, str]:
+    """Окружение замера: результаты с разных машин и версий Python не сравниваются"""
+    return {"python": platform.python_version(), "platform": platform.platform()}
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.25,
+    memory_threshold: float = 0.25,
+    min_delta_ms: float = 0.5
+) -> List[str]:
+    """
+    Регрессии относительно базовой линии.
+
+    Время сравнивается по медиане; разница меньше min_delta_ms не считается
+    регрессией, чтобы шум на очень быстрых замерах не ронял проверку.
+    ValueError, если базовая линия снята в другом окружении (платформа, версия Python).
+    """
+    for key in environment():
+        if baseline.get(key) != current.get(key):
+            raise ValueError(
+                f"Baseline {key} {baseline.get(key)!r} differs from current {current.get(key)!r}, "
+                f"record a baseline on this machine with --update-baseline"
+            )
+
+    regressions = []
+    for name, result in current["results"].items():
+        expected = baseline.get("results", {}).get(name)
+        if expected is None:
+            continue
+
+        delta_ms = result["median_ms"] - expected["median_ms"]
+        if result["median_ms"] > expected["median_ms"] * (1 + threshold) and delta_ms >= min_delta_ms:
+            regressions.append(
+                f"{name}: median {result['median_ms']:.3f} ms vs baseline {expected['median_ms']:.3f} ms "
+                f"(+{delta_ms / expected['median_ms']:.0%})"
+            )
+        if result["peak_kib"] > expected["peak_kib"] * (1 + memory_threshold):
+            regressions.append(
+                f"{name}: peak memory {result['peak_kib']:.1f} KiB vs baseline {expected['peak_kib']:.1f} KiB"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Микробенчмарки сервисного слоя")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Файл базовой линии")
+    parser.add_argument("--update-baseline", action="store_true", help="Записать результаты в файл базовой линии")
+    parser.add_argument(
+        "--threshold", type=float, default=float(os.environ.get("BENCHMARK_THRESHOLD", 0.25)),
+        help="Допустимый рост медианы времени, доля (BENCHMARK_THRESHOLD)"
+    )
+    parser.add_argument(
+        "--memory-threshold", type=float, default=float(os.environ.get("BENCHMARK_MEMORY_THRESHOLD", 0.25)),
+        help="Допустимый рост пика памяти, доля (BENCHMARK_MEMORY_THRESHOLD)"
+    )
+    parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    parser.add_argument("--output", help="Сохранить результаты в JSON файл")
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.scales, args.cases, args.iterations, args.warmup)
+    for name, result in current["results"].items():
+        print(f"{name:50} median {result['median_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+              f"peak {result['peak_kib']:>10.1f} KiB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {"results": {}}
+        if os.path.isfile(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        # Результаты из другого окружения не смешиваются с новыми
+        if any(baseline.get(key) != value for key, value in environment().items()):
+            baseline = {"results": {}}
+        baseline.update({key: value for key, value in current.items() if key != "results"})
+        baseline["results"].update(current["results"])
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.isfile(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    try:
+        regressions = compare_results(current, baseline, args.threshold, args.memory_threshold, args.min_delta_ms)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.patterns import ActivitySearchStrategy, GeographicSearchStrategy
+from app.core.prefix_index import ORGANIZATION, PrefixIndex
+from app.models import Base
+from app.models.models import Activity, Building, Organization, Phone
+from app.schemas.schemas import OrganizationCreate, OrganizationList
+from app.services.organization_documents import refresh_organization_documents
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+organization_list_adapter = TypeAdapter(List[OrganizationList])
+
+CENTER_LATITUDE = 55.7558
+CENTER_LONGITUDE = 37.6176
+
+
+@dataclass(frozen=True)
+class Scale:
+    buildings: int
+    organizations: int
+    # Дерево деятельности: fanout корней, у каждого fanout детей и fanout внуков
+    activity_fanout: int
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(buildings=20, organizations=100, activity_fanout=4),
+    "medium": Scale(buildings=100, organizations=1000, activity_fanout=8),
+    "large": Scale(buildings=500, organizations=5000, activity_fanout=16),
+}
+
+
+async def seed(engine, scale: Scale, rng: random.Random) -> Dict[str, Any]:
+    """Заполнение пустой базы набором данных заданного масштаба"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        buildings = [
+            Building(
+                address=f"Building {number}",
+                latitude=CENTER_LATITUDE + rng.uniform(-0.5, 0.5),
+                longitude=CENTER_LONGITUDE + rng.uniform(-0.5, 0.5)
+            )
+            for number in range(scale.buildings)
+        ]
+        session.add_all(buildings)
+
+        activities: List[Activity] = []
+        parents: List[Activity] = [None]
+        for level in range(1, 4):
+            level_activities = [
+                Activity(name=f"Activity {level}.{index}", parent=parent, level=level)
+                for index, parent in enumerate(
+                    parent for parent in parents for _ in range(scale.activity_fanout)
+                )
+            ]
+            activities.extend(level_activities)
+            parents = level_activities
+        session.add_all(activities)
+        await session.flush()
+
+        with session.no_autoflush:
+            for number in range(scale.organizations):
+                session.add(Organization(
+                    name=f"Organization {number}",
+                    building=rng.choice(buildings),
+                    phones=[Phone(number=f"8-900-{number:07d}", normalized_number=f"7900{number:07d}")],
+                    activities=rng.sample(activities, 2)
+                ))
+        await session.flush()
+        await refresh_organization_documents(session)
+        await session.commit()
+
+        return {
+            "session_factory": session_factory,
+            "scale": scale,
+            "root_activity_id": activities[0].id,
+            "building_ids": [building.id for building in buildings],
+            "activity_ids": [activity.id for activity in activities],
+            "organizations": None,
+        }
+
+
+async def activity_hierarchy_ids(context: Dict[str, Any]):
+    async with context["session_factory"]() as session:
+        await ActivitySearchStrategy(session)._get_activity_hierarchy_ids(context["root_activity_id"])
+
+
+async def geographic_search(context: Dict[str, Any]):
+    async with context["session_factory"]() as session:
+        await GeographicSearchStrategy(session).execute_search(
+            latitude=CENTER_LATITUDE, longitude=CENTER_LONGITUDE, radius=10
+        )
+
+
+async def organization_list_serialization(context: Dict[str, Any]):
+    if context["organizations"] is None:
+        async with context["session_factory"]() as session:
+            context["organizations"] = await factory.create_organization_service(session).get_all(limit=1000)
+    organization_list_adapter.dump_json(
+        organization_list_adapter.validate_python(context["organizations"], from_attributes=True)
+    )
+
+
+async def prefix_search(context: Dict[str, Any]):
+    if "prefix_index" not in context:
+        # Индекс в 20 раз больше числа организаций масштаба: на large - 100 тысяч названий
+        index = PrefixIndex()
+        index.rebuild(
+            (ORGANIZATION, number, f"Организация {number} Сервис")
+            for number in range(context["scale"].organizations * 20)
+        )
+        context["prefix_index"] = index
+    context["prefix_index"].search("организация 1234", limit=10)
+
+
+async def organization_create(context: Dict[str, Any]):
+    context["created"] = context.get("created", 0) + 1
+    async with context["session_factory"]() as session:
+        await factory.create_organization_service(session).create(OrganizationCreate(
+            name=f"Benchmark organization {context['created']}",
+            building_id=context["building_ids"][0],
+            phone_numbers=[f"8-901-{context['created']:07d}"],
+            activity_ids=context["activity_ids"][:2]
+        ))
+
+
+CASES: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {
+    "activity_hierarchy_ids": activity_hierarchy_ids,
+    "geographic_search": geographic_search,
+    "organization_list_serialization": organization_list_serialization,
+    "organization_create": organization_create,
+    "prefix_search": prefix_search,
+}
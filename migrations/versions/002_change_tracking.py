@@ -0,0 +1,47 @@
+"""Change tracking: timestamps and change log
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ['buildings', 'activities', 'phones', 'organizations']
+
+
+def upgrade() -> None:
+    for table_name in TRACKED_TABLES:
+        op.add_column(table_name, sa.Column('created_at', sa.DateTime(timezone=True),
+                                            server_default=sa.func.now(), nullable=False))
+        op.add_column(table_name, sa.Column('updated_at', sa.DateTime(timezone=True),
+                                            server_default=sa.func.now(), nullable=False))
+
+    op.create_table('change_log',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('entity_type', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Уже существующие записи попадают в журнал: первая синхронизация с токеном 0 получает весь справочник
+    for table_name in TRACKED_TABLES:
+        op.execute(
+            f"INSERT INTO change_log (entity_type, entity_id, operation) "
+            f"SELECT '{table_name}', id, 'create' FROM {table_name} ORDER BY id"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('change_log')
+    for table_name in reversed(TRACKED_TABLES):
+        op.drop_column(table_name, 'updated_at')
+        op.drop_column(table_name, 'created_at')
@@ -0,0 +1,53 @@
+"""Normalized phone number key
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+CANONICAL_PHONES = """
+    SELECT id, min(id) OVER (PARTITION BY normalized_number) AS keep_id FROM phones
+"""
+
+
+def upgrade() -> None:
+    op.add_column('phones', sa.Column('normalized_number', sa.String(length=20), nullable=True))
+
+    op.execute("UPDATE phones SET normalized_number = regexp_replace(number, '[^0-9]', '', 'g')")
+    op.execute("""
+        UPDATE phones SET normalized_number = '7' || substr(normalized_number, 2)
+        WHERE length(normalized_number) = 11 AND normalized_number LIKE '8%'
+    """)
+
+    # Дубликаты одного номера в разной записи сливаются в телефон с минимальным id
+    op.execute(f"""
+        INSERT INTO organization_phone (organization_id, phone_id)
+        SELECT DISTINCT op.organization_id, c.keep_id
+        FROM organization_phone op JOIN ({CANONICAL_PHONES}) c ON c.id = op.phone_id
+        WHERE c.id <> c.keep_id
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute(f"""
+        DELETE FROM organization_phone
+        WHERE phone_id IN (SELECT id FROM ({CANONICAL_PHONES}) c WHERE c.id <> c.keep_id)
+    """)
+    op.execute(f"""
+        DELETE FROM phones
+        WHERE id IN (SELECT id FROM ({CANONICAL_PHONES}) c WHERE c.id <> c.keep_id)
+    """)
+
+    op.alter_column('phones', 'normalized_number', nullable=False)
+    op.create_index(op.f('ix_phones_normalized_number'), 'phones', ['normalized_number'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_phones_normalized_number'), table_name='phones')
+    op.drop_column('phones', 'normalized_number')
@@ -0,0 +1,32 @@
+"""Indexes on foreign key columns
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+# Составные первичные ключи связующих таблиц начинаются с organization_id,
+# поэтому обратная сторона связи индексируется отдельно
+FOREIGN_KEY_INDEXES = [
+    ('organizations', 'building_id'),
+    ('activities', 'parent_id'),
+    ('organization_activity', 'activity_id'),
+    ('organization_phone', 'phone_id'),
+]
+
+
+def upgrade() -> None:
+    for table_name, column_name in FOREIGN_KEY_INDEXES:
+        op.create_index(op.f(f'ix_{table_name}_{column_name}'), table_name, [column_name], unique=False)
+
+
+def downgrade() -> None:
+    for table_name, column_name in reversed(FOREIGN_KEY_INDEXES):
+        op.drop_index(op.f(f'ix_{table_name}_{column_name}'), table_name=table_name)
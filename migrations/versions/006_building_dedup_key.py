@@ -0,0 +1,52 @@
+"""Building dedup key
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+import hashlib
+import re
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Копия app.core.addresses на момент миграции: ключи не должны меняться вместе с кодом приложения
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def _coordinate(value: float) -> str:
+    return f"{round(value, 5) + 0.0:.5f}"
+
+
+def building_dedup_key(address: str, latitude: float, longitude: float) -> str:
+    normalized = _NON_WORD.sub(" ", address.lower().replace("ё", "е")).strip()
+    value = f"{normalized}|{_coordinate(latitude)}|{_coordinate(longitude)}"
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column('buildings', sa.Column('dedup_key', sa.String(length=40), nullable=True))
+
+    connection = op.get_bind()
+    buildings = connection.execute(sa.text("SELECT id, address, latitude, longitude FROM buildings")).all()
+    update = sa.text("UPDATE buildings SET dedup_key = :dedup_key WHERE id = :id")
+    for start in range(0, len(buildings), BATCH_SIZE):
+        connection.execute(update, [
+            {"id": building_id, "dedup_key": building_dedup_key(address, latitude, longitude)}
+            for building_id, address, latitude, longitude in buildings[start:start + BATCH_SIZE]
+        ])
+
+    op.alter_column('buildings', 'dedup_key', nullable=False)
+    op.create_index(op.f('ix_buildings_dedup_key'), 'buildings', ['dedup_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_buildings_dedup_key'), table_name='buildings')
+    op.drop_column('buildings', 'dedup_key')
@@ -0,0 +1,159 @@
+"""Denormalized organization documents
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+JSON_DOCUMENT = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+# Копия app.services.organization_documents на момент миграции: форма документов
+# не должна меняться вместе с кодом приложения
+organization_documents = sa.table(
+    'organization_documents',
+    sa.column('organization_id', sa.Integer()),
+    sa.column('name', sa.String()),
+    sa.column('building_id', sa.Integer()),
+    sa.column('address', sa.String()),
+    sa.column('latitude', sa.Float()),
+    sa.column('longitude', sa.Float()),
+    sa.column('activity_ids', JSON_DOCUMENT),
+    sa.column('activity_path_ids', JSON_DOCUMENT),
+    sa.column('document', JSON_DOCUMENT),
+)
+
+
+def build_document(organization, phones, activities):
+    return {
+        "id": organization["id"],
+        "name": organization["name"],
+        "building_id": organization["building_id"],
+        "building": {
+            "id": organization["building_id"],
+            "address": organization["address"],
+            "latitude": organization["latitude"],
+            "longitude": organization["longitude"],
+        },
+        "phones": phones,
+        "activities": activities,
+    }
+
+
+def _activity_paths(connection):
+    """Путь от корня иерархии до каждого вида деятельности"""
+    activities = {
+        activity_id: (name, parent_id)
+        for activity_id, name, parent_id in connection.execute(sa.text("SELECT id, name, parent_id FROM activities"))
+    }
+    paths = {}
+    for activity_id in activities:
+        path, current = [], activity_id
+        while current is not None and current in activities:
+            name, parent_id = activities[current]
+            path.append({"id": current, "name": name})
+            current = parent_id
+        paths[activity_id] = path[::-1]
+    return paths
+
+
+def _fill_documents(connection) -> None:
+    paths = _activity_paths(connection)
+    organization_ids = connection.execute(sa.text("SELECT id FROM organizations ORDER BY id")).scalars().all()
+
+    for start in range(0, len(organization_ids), BATCH_SIZE):
+        batch = organization_ids[start:start + BATCH_SIZE]
+        organizations = connection.execute(sa.text(
+            "SELECT organizations.id, organizations.name, organizations.building_id, "
+            "buildings.address, buildings.latitude, buildings.longitude "
+            "FROM organizations JOIN buildings ON buildings.id = organizations.building_id "
+            "WHERE organizations.id IN :ids"
+        ).bindparams(sa.bindparam("ids", expanding=True)), {"ids": batch}).mappings().all()
+
+        phones = {}
+        for organization_id, phone_id, number in connection.execute(sa.text(
+            "SELECT organization_phone.organization_id, phones.id, phones.number "
+            "FROM organization_phone JOIN phones ON phones.id = organization_phone.phone_id "
+            "WHERE organization_phone.organization_id IN :ids ORDER BY phones.id"
+        ).bindparams(sa.bindparam("ids", expanding=True)), {"ids": batch}):
+            phones.setdefault(organization_id, []).append({"id": phone_id, "number": number})
+
+        activities = {}
+        for organization_id, activity_id, name, parent_id, level in connection.execute(sa.text(
+            "SELECT organization_activity.organization_id, activities.id, activities.name, "
+            "activities.parent_id, activities.level "
+            "FROM organization_activity JOIN activities ON activities.id = organization_activity.activity_id "
+            "WHERE organization_activity.organization_id IN :ids ORDER BY activities.id"
+        ).bindparams(sa.bindparam("ids", expanding=True)), {"ids": batch}):
+            activities.setdefault(organization_id, []).append({
+                "id": activity_id, "name": name, "parent_id": parent_id, "level": level,
+                "path": [ancestor["name"] for ancestor in paths.get(activity_id, [])]
+            })
+
+        rows = []
+        for organization in organizations:
+            organization_activities = activities.get(organization["id"], [])
+            rows.append({
+                "organization_id": organization["id"],
+                "name": organization["name"],
+                "building_id": organization["building_id"],
+                "address": organization["address"],
+                "latitude": organization["latitude"],
+                "longitude": organization["longitude"],
+                "activity_ids": [activity["id"] for activity in organization_activities],
+                "activity_path_ids": sorted({
+                    ancestor["id"]
+                    for activity in organization_activities
+                    for ancestor in paths.get(activity["id"], [])
+                }),
+                "document": build_document(
+                    organization, phones.get(organization["id"], []), organization_activities
+                ),
+            })
+        if rows:
+            op.bulk_insert(organization_documents, rows)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'organization_documents',
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=300), nullable=False),
+        sa.Column('building_id', sa.Integer(), nullable=False),
+        sa.Column('address', sa.String(length=500), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('activity_ids', JSON_DOCUMENT, nullable=False),
+        sa.Column('activity_path_ids', JSON_DOCUMENT, nullable=False),
+        sa.Column('document', JSON_DOCUMENT, nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('organization_id')
+    )
+    op.create_index(op.f('ix_organization_documents_name'), 'organization_documents', ['name'], unique=False)
+    op.create_index(
+        op.f('ix_organization_documents_building_id'), 'organization_documents', ['building_id'], unique=False
+    )
+    op.create_index(
+        'ix_organization_documents_latitude_longitude', 'organization_documents', ['latitude', 'longitude'],
+        unique=False
+    )
+
+    _fill_documents(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_index('ix_organization_documents_latitude_longitude', table_name='organization_documents')
+    op.drop_index(op.f('ix_organization_documents_building_id'), table_name='organization_documents')
+    op.drop_index(op.f('ix_organization_documents_name'), table_name='organization_documents')
+    op.drop_table('organization_documents')
@@ -0,0 +1,27 @@
+"""Change log commit order
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Записи, сделанные до миграции, получают NULL и в порядке фиксации идут первыми
+    op.add_column('change_log', sa.Column('transaction_id', sa.BigInteger(), nullable=True,
+                                          server_default=sa.text('pg_current_xact_id()::text::bigint')))
+    op.create_index('ix_change_log_commit_order', 'change_log',
+                    [sa.text('coalesce(transaction_id, 0)'), 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_change_log_commit_order', table_name='change_log')
+    op.drop_column('change_log', 'transaction_id')
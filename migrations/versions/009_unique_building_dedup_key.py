@@ -0,0 +1,50 @@
+"""Unique building dedup key
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+# Для каждого ключа остается здание с наименьшим id, остальные - дубликаты
+DUPLICATES = (
+    "SELECT id, min(id) OVER (PARTITION BY dedup_key) AS keep_id FROM buildings"
+)
+
+
+def upgrade() -> None:
+    # Организации дубликатов переносятся в оставшееся здание и попадают в журнал изменений
+    op.execute(
+        f"INSERT INTO change_log (entity_type, entity_id, operation) "
+        f"SELECT 'organizations', organizations.id, 'update' FROM organizations "
+        f"JOIN ({DUPLICATES}) duplicates ON duplicates.id = organizations.building_id "
+        f"WHERE duplicates.id <> duplicates.keep_id ORDER BY organizations.id"
+    )
+    # Их документы хранят адрес дубликата и пересобираются при следующем чтении
+    op.execute(
+        f"DELETE FROM organization_documents USING ({DUPLICATES}) duplicates "
+        f"WHERE duplicates.id = organization_documents.building_id AND duplicates.id <> duplicates.keep_id"
+    )
+    op.execute(
+        f"UPDATE organizations SET building_id = duplicates.keep_id, updated_at = now() "
+        f"FROM ({DUPLICATES}) duplicates "
+        f"WHERE duplicates.id = organizations.building_id AND duplicates.id <> duplicates.keep_id"
+    )
+    op.execute(
+        f"DELETE FROM buildings USING ({DUPLICATES}) duplicates "
+        f"WHERE duplicates.id = buildings.id AND duplicates.id <> duplicates.keep_id"
+    )
+
+    op.drop_index('ix_buildings_dedup_key', table_name='buildings')
+    op.create_index('ix_buildings_dedup_key', 'buildings', ['dedup_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_buildings_dedup_key', table_name='buildings')
+    op.create_index('ix_buildings_dedup_key', 'buildings', ['dedup_key'], unique=False)
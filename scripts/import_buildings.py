@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import json
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import get_settings
+from app.core.database_factory import DatabaseManager, PostgreSQLFactory
+from app.services.building_import import BuildingImporter, parse_rows
+from app.services.service_factory import ConcreteServiceFactory
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def read_chunks(path: str):
+    """Чтение файла блоками, чтобы не держать его в памяти целиком"""
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def import_buildings(path: str, file_format: str, batch_size: int):
+    """Импорт зданий из CSV или NDJSON файла"""
+    settings = get_settings()
+    db_manager = DatabaseManager(PostgreSQLFactory(settings.database_url))
+
+    try:
+        async with db_manager.session_factory() as session:
+            importer = BuildingImporter(
+                ConcreteServiceFactory().create_building_service(session),
+                batch_size=batch_size,
+                max_errors=settings.import_max_errors
+            )
+            report = await importer.run(parse_rows(read_chunks(path), file_format))
+    finally:
+        await db_manager.shutdown()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт зданий из CSV (address, latitude, longitude) или NDJSON")
+    parser.add_argument("path", help="Путь к файлу")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Формат файла, по умолчанию по расширению")
+    parser.add_argument("--batch-size", type=int, default=get_settings().import_batch_size)
+    args = parser.parse_args()
+
+    file_format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    report = asyncio.run(import_buildings(args.path, file_format, args.batch_size))
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database_factory import DatabaseManager, PostgreSQLFactory
+from app.core.phones import normalize_phone_number
 from app.models.models import Building, Activity, Phone, Organization
+from app.services.organization_documents import refresh_organization_documents
 from app.services.service_factory import ConcreteServiceFactory
 
 
@@ -97,7 +99,7 @@ async def create_test_data():
         
         phones = []
         for phone_data in phones_data:
-            phone = Phone(**phone_data)
+            phone = Phone(**phone_data, normalized_number=normalize_phone_number(phone_data["number"]))
             session.add(phone)
             phones.append(phone)
         
@@ -169,6 +171,8 @@ async def create_test_data():
             
             session.add(organization)
         
+        await session.flush()
+        await refresh_organization_documents(session)
         await session.commit()
         print("Тестовые данные успешно созданы!")
 
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from sqlalchemy import event, func, select
+from app.models.models import Activity
+from app.schemas.schemas import ActivityCreate, ActivityTreeImport
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+TREE = {
+    "nodes": [
+        {"name": "Food", "children": [
+            {"name": "Meat", "children": [{"name": "Sausages"}]},
+            {"name": "Dairy"},
+        ]},
+        {"name": "Cars", "children": [{"name": "Parts"}]},
+    ]
+}
+
+
+def test_import_tree_level_by_level(session_factory):
+    """Тест импорта вложенного дерева: id в форме запроса, родители и уровни"""
+    async def run():
+        engine = session_factory.kw["bind"]
+        inserts = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("INSERT INTO ACTIVITIES"):
+                inserts.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async with session_factory() as session:
+                result = await factory.create_activity_service(session).import_tree(
+                    ActivityTreeImport.model_validate(TREE)
+                )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        async with session_factory() as session:
+            rows = (await session.execute(select(Activity.id, Activity.name, Activity.parent_id, Activity.level))).all()
+        return result, inserts, {row.id: row for row in rows}, engine.dialect.name
+
+    result, inserts, rows, engine_dialect = asyncio.run(run())
+    assert result["created"] == 6
+    # PostgreSQL вставляет уровень одним запросом; SQLite без упорядоченного RETURNING - построчно
+    assert len(inserts) == (3 if engine_dialect == "postgresql" else 6)
+    food, cars = result["nodes"]
+    meat, dairy = food["children"]
+    sausages = meat["children"][0]
+    assert [node["name"] for node in (food, cars, meat, dairy, sausages)] == ["Food", "Cars", "Meat", "Dairy", "Sausages"]
+    assert (rows[sausages["id"]].parent_id, rows[sausages["id"]].level) == (meat["id"], 3)
+    assert (rows[dairy["id"]].parent_id, rows[dairy["id"]].level) == (food["id"], 2)
+    assert rows[cars["children"][0]["id"]].parent_id == cars["id"]
+    assert rows[food["id"]].parent_id is None
+
+
+def test_import_tree_under_parent_checks_depth_before_writing(session_factory):
+    """Тест проверки глубины с учетом родителя до записи в БД"""
+    async def run():
+        async with session_factory() as session:
+            service = factory.create_activity_service(session)
+            root = await service.create(ActivityCreate(name="Root"))
+            child = await service.create(ActivityCreate(name="Child", parent_id=root.id))
+
+        async with session_factory() as session:
+            service = factory.create_activity_service(session)
+            with pytest.raises(ValueError):
+                await service.import_tree(ActivityTreeImport(
+                    parent_id=child.id, nodes=[{"name": "Leaf", "children": [{"name": "Too deep"}]}]
+                ))
+            count_after_error = (await session.execute(select(func.count(Activity.id)))).scalar_one()
+            result = await service.import_tree(ActivityTreeImport(parent_id=child.id, nodes=[{"name": "Leaf"}]))
+        return child, count_after_error, result
+
+    child, count_after_error, result = asyncio.run(run())
+    assert count_after_error == 2
+    assert result["nodes"][0]["parent_id"] == child.id
+    assert result["nodes"][0]["level"] == 3
@@ -0,0 +1,89 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.admission import AdmissionController, AdmissionControlMiddleware, TokenBucket
+from app.core.config import Settings
+
+
+def test_token_bucket():
+    """Тест исчерпания ведра токенов"""
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.try_acquire()[0]
+    assert bucket.try_acquire()[0]
+    allowed, retry_after = bucket.try_acquire()
+    assert not allowed
+    assert 0 < retry_after <= 1
+
+
+def _rate_limited_client(controller):
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, controller=controller, key_validator=lambda key: key == "valid")
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    return TestClient(app)
+
+
+def test_rate_limited_per_api_key():
+    """Тест ответа 429 с Retry-After после исчерпания лимита ключа"""
+    controller = AdmissionController(max_concurrency=4, rate_per_second=0.001, burst=2)
+    client = _rate_limited_client(controller)
+    valid_key = {"Authorization": "Bearer valid"}
+    assert client.get("/api/v1/ping", headers=valid_key).status_code == 200
+    assert client.get("/api/v1/ping", headers=valid_key).status_code == 200
+
+    response = client.get("/api/v1/ping", headers=valid_key)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+    assert client.get("/api/v1/ping").status_code == 200
+    assert controller.get_stats()["rejected_rate_limited_total"] == 1
+
+
+def test_unverified_tokens_share_client_bucket():
+    """Тест лимита по адресу клиента для непроверенных токенов: новый токен не дает нового ведра"""
+    controller = AdmissionController(max_concurrency=4, rate_per_second=0.001, burst=2)
+    client = _rate_limited_client(controller)
+    statuses = [
+        client.get("/api/v1/ping", headers={"Authorization": f"Bearer random-{number}"}).status_code
+        for number in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+    assert client.get("/api/v1/ping", headers={"Authorization": "Bearer valid"}).status_code == 200
+    assert controller.get_stats()["tracked_keys"] == 2
+
+
+def test_rate_limit_off_by_default():
+    """Тест настроек по умолчанию: контроль допуска выключен, без лимита частоты запросы не отклоняются"""
+    settings = Settings(_env_file=None)
+    assert not settings.admission_enabled and settings.admission_rate_per_second is None
+
+    controller = AdmissionController(max_concurrency=4, rate_per_second=settings.admission_rate_per_second)
+    client = _rate_limited_client(controller)
+    valid_key = {"Authorization": "Bearer valid"}
+    assert {client.get("/api/v1/ping", headers=valid_key).status_code for _ in range(200)} == {200}
+    assert controller.get_stats()["tracked_keys"] == 0
+
+
+def test_overloaded_after_queue_timeout():
+    """Тест отказа 503, когда слот не освободился за бюджет ожидания"""
+    async def run():
+        controller = AdmissionController(max_concurrency=1, queue_timeout_ms=20)
+        assert await controller.acquire()
+        assert not await controller.acquire()
+
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        controller.release()
+        assert await waiter
+        controller.release()
+        return controller.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["admitted_total"] == 2
+    assert stats["queued_total"] == 2
+    assert stats["rejected_overloaded_total"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["waiting"] == 0
@@ -0,0 +1,37 @@
+import pytest
+from benchmarks.run import compare_results, environment, run_benchmarks
+from benchmarks.suite import CASES
+
+BASELINE = {**environment(), "results": {
+    "small/geographic_search": {"median_ms": 2.0, "peak_kib": 100.0},
+    "small/organization_create": {"median_ms": 0.2, "peak_kib": 100.0},
+}}
+
+
+def test_compare_results():
+    """Тест порогов регрессии относительно базовой линии"""
+    current = {**environment(), "results": {
+        "small/geographic_search": {"median_ms": 2.4, "peak_kib": 130.0},
+        "small/organization_create": {"median_ms": 0.4, "peak_kib": 100.0},
+        "large/geographic_search": {"median_ms": 50.0, "peak_kib": 1000.0},
+    }}
+    regressions = compare_results(current, BASELINE, threshold=0.25, memory_threshold=0.25, min_delta_ms=0.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("small/geographic_search: peak memory")
+
+    assert len(compare_results(current, BASELINE, threshold=0.1, min_delta_ms=0.1, memory_threshold=0.5)) == 2
+
+
+def test_compare_results_refuses_other_platform():
+    """Тест отказа сравнивать с базовой линией, снятой на другой машине"""
+    with pytest.raises(ValueError, match="platform"):
+        compare_results({**BASELINE, "platform": "Other-1.0-arm64"}, BASELINE)
+
+
+def test_suite_runs_every_case():
+    """Тест прогона всех случаев набора на малом масштабе"""
+    pytest.importorskip("aiosqlite")
+    current = run_benchmarks(["small"], CASES, iterations=2, warmup=0)
+    assert sorted(current["results"]) == sorted(f"small/{case}" for case in CASES)
+    assert all(result["iterations"] == 2 and result["median_ms"] > 0 for result in current["results"].values())
+    assert compare_results(current, current) == []
@@ -0,0 +1,90 @@
+import asyncio
+from app.schemas.schemas import BuildingCreate
+from app.services.building_import import BuildingImporter, parse_rows
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+CSV_DATA = (
+    "Address,Latitude,Longitude\r\n"
+    "\"г. Москва, ул. Блюхера, 32/1\",55.7558,37.6176\r\n"
+    "\"Г. МОСКВА, ул.Блюхера 32/1\",55.755801,37.6176\r\n"
+    "\"г. Москва,\nул. Ленина, 1\",55.7558,37.62\r\n"
+    "г. Казань,95,49.1\r\n"
+    "г. Казань,55.79,east\r\n"
+    ",55.79,49.1\r\n"
+    "г. Казань,55.79\r\n"
+    "г. Казань,55.79,49.1\r\n"
+    "г. Казань,55.79,49.1\r\n"
+).encode("utf-8")
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _import(session_factory, data: bytes, file_format: str):
+    async def run():
+        async with session_factory() as session:
+            await factory.create_building_service(session).create(
+                BuildingCreate(address="г. Москва, ул. Блюхера, 32/1", latitude=55.7558, longitude=37.6176)
+            )
+        async with session_factory() as session:
+            importer = BuildingImporter(factory.create_building_service(session), batch_size=2)
+            report = await importer.run(parse_rows(_chunks(data), file_format))
+        async with session_factory() as session:
+            buildings = await factory.create_building_service(session).get_all()
+        return report, sorted(building.address for building in buildings)
+
+    return asyncio.run(run())
+
+
+def test_csv_import(session_factory):
+    """Тест импорта CSV с дедупликацией и отчетом об ошибках по строкам"""
+    report, addresses = _import(session_factory, CSV_DATA, "csv")
+    assert report["total_rows"] == 9
+    assert report["inserted"] == 2
+    assert report["duplicates"] == 3
+    assert [error["row"] for error in report["errors"]] == [4, 5, 6, 7]
+    assert addresses == ["г. Казань", "г. Москва,\nул. Ленина, 1", "г. Москва, ул. Блюхера, 32/1"]
+
+
+def test_ndjson_import(session_factory):
+    """Тест импорта NDJSON"""
+    data = (
+        '{"address": "г. Казань", "latitude": 55.79, "longitude": 49.1}\n'
+        "\n"
+        "not json\n"
+        "[1, 2]\n"
+        '{"address": "г. Москва, ул. Блюхера, 32/1", "latitude": "55.7558", "longitude": "37.6176"}\n'
+    ).encode("utf-8")
+    report, addresses = _import(session_factory, data, "ndjson")
+    assert (report["total_rows"], report["inserted"], report["duplicates"], report["failed"]) == (4, 1, 1, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    assert addresses == ["г. Казань", "г. Москва, ул. Блюхера, 32/1"]
+
+
+def test_concurrent_duplicates_are_skipped(session_factory):
+    """Тест уникального ключа: здание, вставленное параллельно после проверки, не дублируется"""
+    building_data = BuildingCreate(address="г. Казань", latitude=55.79, longitude=49.1)
+
+    async def run():
+        async with session_factory() as session:
+            service = factory.create_building_service(session)
+            first = await service.create(building_data)
+            second = await service.create(BuildingCreate(address="Г. КАЗАНЬ", latitude=55.790001, longitude=49.1))
+        async with session_factory() as session:
+            service = factory.create_building_service(session)
+            # Проверка дубликатов прошла до вставки параллельного импорта
+            service.find_existing_dedup_keys = lambda dedup_keys: asyncio.sleep(0, result=set())
+            report = await BuildingImporter(service).run(parse_rows(_chunks(
+                "address,latitude,longitude\nг. Казань,55.79,49.1\nг. Уфа,54.73,55.95\n".encode("utf-8")
+            ), "csv"))
+            buildings = await service.get_all()
+        return first.id, second.id, report, sorted(building.address for building in buildings)
+
+    first_id, second_id, report, addresses = asyncio.run(run())
+    assert first_id == second_id
+    assert (report["inserted"], report["duplicates"]) == (1, 1)
+    assert addresses == ["г. Казань", "г. Уфа"]
@@ -0,0 +1,71 @@
+import asyncio
+from sqlalchemy import insert
+from app.models.models import ChangeLog
+from app.schemas.schemas import BuildingCreate, ActivityCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+async def _create_directory(session_factory):
+    async with session_factory() as session:
+        building = await factory.create_building_service(session).create(
+            BuildingCreate(address="г. Москва, ул. Блюхера, 32/1", latitude=55.7558, longitude=37.6176)
+        )
+        activity = await factory.create_activity_service(session).create(ActivityCreate(name="Еда"))
+        organization = await factory.create_organization_service(session).create(
+            OrganizationCreate(
+                name="ООО Рога и Копыта",
+                building_id=building.id,
+                phone_numbers=["2-222-222", "3-333-333"],
+                activity_ids=[activity.id]
+            )
+        )
+        return organization.id
+
+
+async def _get_changes(session_factory, since, limit=1000):
+    async with session_factory() as session:
+        return await factory.create_change_service(session).get_changes(since=since, limit=limit)
+
+
+def test_change_feed(session_factory):
+    """Тест инкрементальной ленты изменений"""
+    organization_id = asyncio.run(_create_directory(session_factory))
+
+    feed = asyncio.run(_get_changes(session_factory, since=0))
+    assert not feed.has_more
+    assert [building.address for building in feed.buildings] == ["г. Москва, ул. Блюхера, 32/1"]
+    assert [activity.name for activity in feed.activities] == ["Еда"]
+    assert len(feed.phones) == 2
+    assert feed.organizations[0].id == organization_id
+    assert sorted(feed.organizations[0].phone_ids) == sorted(phone.id for phone in feed.phones)
+
+    assert asyncio.run(_get_changes(session_factory, since=feed.next_token)).next_token == feed.next_token
+
+    first_page = asyncio.run(_get_changes(session_factory, since=0, limit=2))
+    assert first_page.has_more
+    assert first_page.next_token == 2
+
+
+def test_change_feed_follows_commit_order(session_factory):
+    """Тест ленты в порядке фиксации: запись с меньшим id из поздней транзакции не теряется"""
+    async def run():
+        async with session_factory() as session:
+            await session.execute(insert(ChangeLog), [
+                {"id": 1, "entity_type": "phones", "entity_id": 1, "operation": "create", "transaction_id": 20},
+                {"id": 2, "entity_type": "phones", "entity_id": 2, "operation": "create", "transaction_id": 10},
+                {"id": 3, "entity_type": "phones", "entity_id": 3, "operation": "create", "transaction_id": 30},
+            ])
+            await session.commit()
+            service = factory.create_change_service(session)
+            first = await service.get_changes(since=0, limit=1)
+            rest = await service.get_changes(since=first.next_token)
+            events = await service.get_events(since=first.next_token)
+            return first, rest, [event["id"] for event in events], await service.get_latest_token()
+
+    first, rest, event_ids, latest = asyncio.run(run())
+    assert first.next_token == 2
+    assert rest.next_token == 3 and not rest.has_more
+    assert event_ids == [1, 3]
+    assert latest == 3
@@ -0,0 +1,70 @@
+import json
+import msgpack
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from app.core.content_negotiation import (
+    NegotiatedResponse, negotiate_response_format, select_media_type, to_columnar,
+    JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, COLUMNAR_JSON_MEDIA_TYPE
+)
+
+building = {"id": 1, "address": "г. Москва, ул. Блюхера, 32/1", "latitude": 55.7558, "longitude": 37.6176}
+food = {"id": 1, "name": "Еда", "parent_id": None, "level": 1}
+meat = {"id": 4, "name": "Мясная продукция", "parent_id": 1, "level": 2}
+page = [
+    {"name": "ООО Рога и Копыта", "id": 1, "building": building, "phones": [], "activities": [food, meat]},
+    {"name": "Мясной двор", "id": 2, "building": building, "phones": [], "activities": [meat]},
+]
+
+router = APIRouter(
+    dependencies=[Depends(negotiate_response_format)],
+    default_response_class=NegotiatedResponse
+)
+
+
+@router.get("/page")
+async def get_page():
+    return page
+
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+
+def test_select_media_type():
+    """Тест выбора формата по заголовку Accept"""
+    assert select_media_type(None) == JSON_MEDIA_TYPE
+    assert select_media_type("*/*") == JSON_MEDIA_TYPE
+    assert select_media_type("application/x-msgpack") == MSGPACK_MEDIA_TYPE
+    assert select_media_type("application/json;q=0.5, application/vnd.columnar+json") == COLUMNAR_JSON_MEDIA_TYPE
+
+
+def test_to_columnar_shares_nested_objects():
+    """Тест выноса повторяющихся зданий и видов деятельности в общие таблицы"""
+    compact = to_columnar(page)
+    assert compact["columns"] == ["name", "id", "building", "phones", "activities"]
+    assert compact["rows"][0][2] == compact["rows"][1][2] == 0
+    assert compact["rows"][0][4] == [0, 1]
+    assert compact["rows"][1][4] == [1]
+    assert len(compact["tables"]["building"]["rows"]) == 1
+    assert len(compact["tables"]["activities"]["rows"]) == 2
+
+
+def test_json_is_default():
+    """Тест ответа в JSON по умолчанию"""
+    response = client.get("/page")
+    assert response.headers["content-type"].startswith(JSON_MEDIA_TYPE)
+    assert response.json() == page
+
+
+def test_msgpack_response():
+    """Тест ответа в MessagePack"""
+    response = client.get("/page", headers={"Accept": MSGPACK_MEDIA_TYPE})
+    assert response.headers["content-type"].startswith(MSGPACK_MEDIA_TYPE)
+    assert msgpack.unpackb(response.content) == page
+
+
+def test_columnar_json_response():
+    """Тест колоночного ответа в JSON"""
+    response = client.get("/page", headers={"Accept": COLUMNAR_JSON_MEDIA_TYPE})
+    assert json.loads(response.content) == to_columnar(page)
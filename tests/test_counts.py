@@ -0,0 +1,73 @@
+import asyncio
+from sqlalchemy import select
+from app.core.counts import TotalCounter
+from app.models.models import Building
+from app.schemas.schemas import ActivityCreate, BuildingCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+def test_total_count_cache(session_factory):
+    """Тест точного подсчета, кэша по ключу фильтра и сброса кэша событием изменения"""
+    async def create_building(address):
+        async with session_factory() as session:
+            await factory.create_building_service(session).create(
+                BuildingCreate(address=address, latitude=55.75, longitude=37.61)
+            )
+
+    async def run():
+        counter = TotalCounter(ttl_seconds=60)
+        await create_building("Moscow, Lenina st., 1")
+        await create_building("Kazan, Baumana st., 2")
+
+        async def count(filter_key=None):
+            statement = select(Building.id)
+            if filter_key is not None:
+                statement = statement.where(Building.address.ilike(f"%{filter_key}%"))
+            async with session_factory() as session:
+                return await counter.count(session, statement, "buildings", filter_key=filter_key)
+
+        first = await count()
+        filtered = await count("moscow")
+        await create_building("Moscow, Tverskaya st., 3")
+        cached = await count()
+        counter.handle_event({"entity_type": "buildings"})
+        refreshed = await count()
+        return first, filtered, cached, refreshed
+
+    assert asyncio.run(run()) == ((2, "exact"), (1, "exact"), (2, "exact"), (3, "exact"))
+
+
+def test_search_total_counts(session_factory, monkeypatch):
+    """Тест общего числа результатов поиска по названию, адресу, виду деятельности и области"""
+    monkeypatch.setattr("app.core.counts._total_counter", TotalCounter(ttl_seconds=60))
+
+    async def run():
+        async with session_factory() as session:
+            building_service = factory.create_building_service(session)
+            moscow = await building_service.create(
+                BuildingCreate(address="Moscow, Lenina st., 1", latitude=55.75, longitude=37.61)
+            )
+            await building_service.create(
+                BuildingCreate(address="Kazan, Baumana st., 2", latitude=55.79, longitude=49.1)
+            )
+            food = await factory.create_activity_service(session).create(ActivityCreate(name="Food"))
+            organization_service = factory.create_organization_service(session)
+            for name in ["Shop Meat", "Shop Farm", "Garage"]:
+                activity_ids = [food.id] if name.startswith("Shop") else []
+                await organization_service.create(
+                    OrganizationCreate(name=name, building_id=moscow.id, activity_ids=activity_ids)
+                )
+
+        async with session_factory() as session:
+            building_service = factory.create_building_service(session)
+            organization_service = factory.create_organization_service(session)
+            return (
+                await organization_service.count_by_name("SHOP", mode="exact"),
+                await organization_service.count_by_activity("food"),
+                await organization_service.count_by_geographic_area(latitude=55.75, longitude=37.61, radius=1),
+                await building_service.count_by_address("moscow"),
+            )
+
+    assert asyncio.run(run()) == ((2, "exact"), (2, "exact"), (3, "exact"), (1, "exact"))
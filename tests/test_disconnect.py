@@ -0,0 +1,126 @@
+import asyncio
+from fastapi import BackgroundTasks, FastAPI, Request
+from app.api.dependencies import get_statement_timeout
+from app.core.config import get_settings
+from app.core.disconnect import CancelOnDisconnectMiddleware
+
+
+def _scope(path):
+    return {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+
+
+def test_handler_cancelled_on_client_disconnect():
+    """Тест отмены обработчика после отключения клиента"""
+    state = {}
+
+    async def slow_app(scope, receive, send):
+        state["body"] = await receive()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def run():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            state.setdefault("sent", []).append(message)
+
+        await asyncio.wait_for(CancelOnDisconnectMiddleware(slow_app)(_scope("/api/v1/slow"), receive, send), 1)
+
+    asyncio.run(run())
+    assert state["body"]["type"] == "http.request"
+    assert state["cancelled"]
+    assert "sent" not in state
+
+
+def test_large_body_is_streamed_with_backpressure():
+    """Тест потокового тела через приложение: клиент читается не дальше одного фрагмента впереди обработчика"""
+    app = FastAPI()
+    state = {"pulled": 0, "consumed": 0, "max_ahead": 0, "sent": []}
+    chunks, chunk = 200, b"x" * 65536
+
+    @app.post("/api/v1/buildings/import")
+    async def import_body(request: Request):
+        size = 0
+        async for data in request.stream():
+            if data:
+                state["consumed"] += 1
+                state["max_ahead"] = max(state["max_ahead"], state["pulled"] - state["consumed"])
+                size += len(data)
+                await asyncio.sleep(0)
+        return {"size": size}
+
+    async def receive():
+        if state["pulled"] < chunks:
+            state["pulled"] += 1
+            return {"type": "http.request", "body": chunk, "more_body": state["pulled"] < chunks}
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        state["sent"].append(message)
+
+    scope = {**_scope("/api/v1/buildings/import"), "method": "POST"}
+    asyncio.run(asyncio.wait_for(CancelOnDisconnectMiddleware(app)(scope, receive, send), 5))
+    assert state["sent"][0]["status"] == 200
+    assert state["sent"][1]["body"] == f'{{"size":{chunks * len(chunk)}}}'.encode()
+    assert state["max_ahead"] <= 2
+
+
+def test_disconnect_after_response_does_not_cancel_background_tasks():
+    """Тест остановки наблюдения после отправки ответа: отключение клиента не отменяет фоновые задачи"""
+    app = FastAPI()
+    state = {}
+
+    async def background():
+        await asyncio.sleep(0.05)
+        state["finished"] = True
+
+    @app.get("/api/v1/ping")
+    async def ping(tasks: BackgroundTasks):
+        tasks.add_task(background)
+        return {"status": "ok"}
+
+    async def run():
+        responded = asyncio.Event()
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await responded.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                responded.set()
+
+        await asyncio.wait_for(CancelOnDisconnectMiddleware(app)(_scope("/api/v1/ping"), receive, send), 1)
+
+    asyncio.run(run())
+    assert state["finished"]
+
+
+def test_route_statement_timeout():
+    """Тест выбора таймаута запросов к БД по маршруту"""
+    settings = get_settings()
+    app = FastAPI()
+
+    @app.get("/api/v1/organizations/search/geographic")
+    async def geographic():
+        pass
+
+    route = app.router.routes[-1]
+    request = Request({**_scope("/api/v1/organizations/search/geographic"), "route": route})
+    assert get_statement_timeout(request) == settings.route_statement_timeouts[route.path]
+
+    other = Request(_scope("/api/v1/organizations/"))
+    assert get_statement_timeout(other) == settings.statement_timeout_ms
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.engine_lifecycle import EngineLifecycleManager
+from app.core.patterns import SingletonMeta
+
+
+def test_swap_drains_in_flight_sessions(tmp_path):
+    """Тест замены движка: новые сессии идут на новый движок, старый закрывается после своих сессий"""
+    async def run():
+        lifecycle = EngineLifecycleManager()
+        old = lifecycle.register("default", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}"))
+        new_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'new.db'}")
+
+        session = lifecycle.get("default").session_factory()
+        await session.execute(text("SELECT 1"))
+
+        swap = asyncio.ensure_future(lifecycle.swap("default", new_engine, prewarm=2, drain_timeout=5))
+        await asyncio.sleep(0.05)
+        states = (lifecycle.get("default").engine is new_engine, swap.done(), old.state, old.in_flight)
+        warm_connections = new_engine.pool.checkedin()
+
+        async with lifecycle.get("default").session_factory() as new_session:
+            await new_session.execute(text("SELECT 1"))
+            new_in_flight = lifecycle.get("default").in_flight
+
+        await session.close()
+        await asyncio.wait_for(swap, timeout=1)
+        drained = await lifecycle.shutdown(drain_timeout=1)
+        return states, warm_connections, new_in_flight, old.state, drained
+
+    states, warm_connections, new_in_flight, old_state, drained = asyncio.run(run())
+    assert states == (True, False, "draining", 1)
+    assert warm_connections == 2
+    assert new_in_flight == 1
+    assert old_state == "disposed"
+    assert drained
+
+
+def test_shutdown_reports_undrained_sessions(tmp_path):
+    """Тест завершения по таймауту, если сессия не закрыта"""
+    async def run():
+        lifecycle = EngineLifecycleManager()
+        handle = lifecycle.register("default", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"))
+        session = handle.session_factory()
+        await session.execute(text("SELECT 1"))
+        drained = await lifecycle.shutdown(drain_timeout=0.05)
+        await session.close()
+        return drained, handle.state
+
+    assert asyncio.run(run()) == (False, "disposed")
+
+
+def test_retire_without_loop_defers_disposal_to_shutdown(tmp_path):
+    """Тест замены движка вне цикла событий: соединения старого закрываются при shutdown, а не бросаются"""
+    lifecycle = EngineLifecycleManager()
+    old = lifecycle.register("default", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}"))
+
+    async def query():
+        async with old.session_factory() as session:
+            await session.execute(text("SELECT 1"))
+
+    asyncio.run(query())
+    lifecycle.register("default", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'new.db'}"))
+    assert (old.state, old.engine.pool.checkedin()) == ("retired", 1)
+    assert [stats["state"] for stats in lifecycle.get_stats()] == ["active", "retired"]
+
+    assert asyncio.run(lifecycle.shutdown(drain_timeout=1))
+    assert (old.state, old.engine.pool.checkedin(), lifecycle.get_stats()) == ("disposed", 0, [])
+
+
+def test_singleton_meta_is_thread_safe():
+    """Тест создания одного экземпляра Singleton при одновременном обращении из потоков"""
+    created = []
+    barrier = threading.Barrier(8)
+
+    class Slow(metaclass=SingletonMeta):
+        def __init__(self):
+            created.append(self)
+
+    instances = []
+
+    def create():
+        barrier.wait()
+        instances.append(Slow())
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(instance is created[0] for instance in instances)
@@ -0,0 +1,103 @@
+import asyncio
+from app.core.events import EventFilter, LAGGED, ChangeBroadcaster, get_change_broadcaster
+from app.schemas.schemas import BuildingCreate, ActivityCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+def _event(event_id, entity_type, entity_id, **data):
+    return {"id": event_id, "entity_type": entity_type, "entity_id": entity_id, "operation": "create", "data": data}
+
+
+def test_event_filter_activity_subtree():
+    """Тест фильтра по поддереву деятельности с учетом новых дочерних узлов"""
+    event_filter = EventFilter(activity_ids=[1])
+    assert event_filter.matches(_event(1, "organizations", 10, activity_ids=[1, 5]))
+    assert not event_filter.matches(_event(2, "organizations", 11, activity_ids=[7]))
+    assert not event_filter.matches(_event(3, "buildings", 1, latitude=55.0, longitude=37.0))
+
+    child = _event(4, "activities", 7, parent_id=1)
+    event_filter.observe(child)
+    assert event_filter.matches(child)
+    assert event_filter.matches(_event(5, "organizations", 11, activity_ids=[7]))
+
+
+def test_event_filter_box():
+    """Тест географического фильтра событий"""
+    event_filter = EventFilter(min_latitude=55, max_latitude=56, min_longitude=37, max_longitude=38)
+    assert event_filter.matches(_event(1, "buildings", 1, latitude=55.75, longitude=37.61))
+    assert not event_filter.matches(_event(2, "buildings", 2, latitude=59.93, longitude=30.36))
+    assert not event_filter.matches(_event(3, "phones", 1, number="2-222-222"))
+
+
+def test_broadcaster_marks_slow_subscriber_lagged():
+    """Тест отметки LAGGED при переполнении очереди подписчика"""
+    async def run():
+        broadcaster = ChangeBroadcaster(buffer_size=10, subscriber_queue_size=2)
+        queue = broadcaster.subscribe()
+        for event_id in range(1, 4):
+            broadcaster.publish(_event(event_id, "phones", event_id))
+        assert queue.get_nowait() is LAGGED
+        assert [event["id"] for event in broadcaster.recent_since(1)] == [2, 3]
+
+    asyncio.run(run())
+
+
+def test_create_publishes_events(session_factory):
+    """Тест рассылки событий после фиксации создания"""
+    async def run():
+        broadcaster = get_change_broadcaster()
+        queue = broadcaster.subscribe()
+        try:
+            async with session_factory() as session:
+                building = await factory.create_building_service(session).create(
+                    BuildingCreate(address="г. Москва, ул. Ленина, 1", latitude=55.7558, longitude=37.62)
+                )
+                activity = await factory.create_activity_service(session).create(ActivityCreate(name="Еда"))
+                await factory.create_organization_service(session).create(
+                    OrganizationCreate(name="Хлебозавод", building_id=building.id,
+                                       phone_numbers=["2-222-222"], activity_ids=[activity.id])
+                )
+            events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+            async with session_factory() as session:
+                replayed = await factory.create_change_service(session).get_events(since=0)
+        finally:
+            broadcaster.unsubscribe(queue)
+        return events, replayed
+
+    events, replayed = asyncio.run(run())
+    assert [event["entity_type"] for event in events] == ["buildings", "activities", "phones", "organizations"]
+    assert events[-1]["data"]["latitude"] == 55.7558
+    assert events[-1]["data"]["activity_ids"] == [events[1]["entity_id"]]
+    assert replayed == events
+
+
+def test_stream_delivers_events_committed_out_of_id_order():
+    """Тест потока при фиксации двух одновременных созданий в обратном порядке id"""
+    from app.api.events import _event_stream
+
+    class ConnectedRequest:
+        async def is_disconnected(self):
+            return False
+
+    async def run():
+        broadcaster = ChangeBroadcaster(buffer_size=10)
+        broadcaster.publish(_event(5, "phones", 5))
+        stream = _event_stream(ConnectedRequest(), broadcaster, None, EventFilter(), 5)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+
+        # Транзакция с id 7 зафиксирована раньше транзакции с id 6
+        broadcaster.publish(_event(7, "phones", 7))
+        broadcaster.publish(_event(6, "phones", 6))
+        broadcaster.publish(_event(8, "phones", 8))
+        delivered = [await first] + [await stream.__anext__() for _ in range(2)]
+        await stream.aclose()
+        return delivered, broadcaster.recent_since(7)
+
+    delivered, after_seven = asyncio.run(run())
+    assert [message.split("\n")[0] for message in delivered] == ["id: 7", "id: 6", "id: 8"]
+    # Возобновление после id 7 не теряет событие 6, зафиксированное позже
+    assert [event["id"] for event in after_seven] == [6, 8]
@@ -0,0 +1,59 @@
+import asyncio
+from app.schemas.schemas import ActivityCreate, BuildingCreate, OrganizationCreate, PolygonSearchArea
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+async def _seed(session_factory):
+    async with session_factory() as session:
+        building = await factory.create_building_service(session).create(
+            BuildingCreate(address="Moscow, Lenina st., 1", latitude=55.75, longitude=37.61)
+        )
+        activity_service = factory.create_activity_service(session)
+        food = await activity_service.create(ActivityCreate(name="Food"))
+        meat = await activity_service.create(ActivityCreate(name="Meat", parent_id=food.id))
+        dairy = await activity_service.create(ActivityCreate(name="Dairy", parent_id=food.id))
+        cars = await activity_service.create(ActivityCreate(name="Cars"))
+
+        organization_service = factory.create_organization_service(session)
+        for name, activity_ids in [
+            ("Shop Meat", [meat.id]),
+            ("Shop Farm", [meat.id, dairy.id]),
+            ("Shop Cars", [cars.id]),
+            ("Garage", [cars.id]),
+        ]:
+            await organization_service.create(
+                OrganizationCreate(name=name, building_id=building.id, activity_ids=activity_ids)
+            )
+
+
+def test_name_search_activity_facets(session_factory):
+    """Тест фасетов по видам деятельности с подсчетом через иерархию"""
+    async def run():
+        await _seed(session_factory)
+        async with session_factory() as session:
+            return await factory.create_organization_service(session).get_name_facets("shop")
+
+    facets = asyncio.run(run())
+    assert [(facet["name"], facet["count"]) for facet in facets] == [
+        ("Food", 2), ("Meat", 2), ("Cars", 1), ("Dairy", 1)
+    ]
+
+
+def test_facets_for_activity_and_polygon_search(session_factory):
+    """Тест фасетов поиска по виду деятельности и в полигоне"""
+    async def run():
+        await _seed(session_factory)
+        area = PolygonSearchArea(
+            type="Polygon", coordinates=[[[37.6, 55.7], [37.7, 55.7], [37.7, 55.8], [37.6, 55.8], [37.6, 55.7]]]
+        )
+        async with session_factory() as session:
+            service = factory.create_organization_service(session)
+            return await service.get_activity_facets("food"), await service.get_polygon_facets(area)
+
+    by_activity, in_polygon = asyncio.run(run())
+    assert [(facet["name"], facet["count"]) for facet in by_activity] == [("Food", 2), ("Meat", 2), ("Dairy", 1)]
+    assert [(facet["name"], facet["count"]) for facet in in_polygon] == [
+        ("Cars", 2), ("Food", 2), ("Meat", 2), ("Dairy", 1)
+    ]
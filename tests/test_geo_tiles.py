@@ -0,0 +1,117 @@
+import asyncio
+from app.core.events import get_change_broadcaster
+from app.core.geo_tiles import GeoTileCache, covering_tiles, encode_geohash
+from app.core.patterns import GeographicSearchStrategy, TiledGeographicSearchStrategy
+from app.schemas.schemas import BuildingCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+POINTS = [
+    ("Kremlin", 55.7520, 37.6175),
+    ("Arbat", 55.7494, 37.5913),
+    ("Lubyanka", 55.7601, 37.6256),
+    ("Sokolniki", 55.7890, 37.6795),
+    ("Khimki", 55.8970, 37.4297),
+]
+
+
+def test_geohash_and_covering_tiles():
+    """Тест кодирования geohash и покрытия прямоугольника тайлами"""
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode_geohash(55.7520, 37.6175, 5) == "ucfv0"
+
+    tiles = covering_tiles((55.70, 55.80, 37.55, 37.70), 5, 256)
+    assert encode_geohash(55.7520, 37.6175, 5) in tiles
+    for min_latitude, max_latitude, min_longitude, max_longitude in tiles.values():
+        assert max_latitude > 55.70 and min_latitude < 55.80
+        assert max_longitude > 37.55 and min_longitude < 37.70
+    assert covering_tiles((55.0, 57.0, 36.0, 39.0), 5, 256) is None
+
+
+async def _create(session_factory, points):
+    async with session_factory() as session:
+        building_service = factory.create_building_service(session)
+        organization_service = factory.create_organization_service(session)
+        for name, latitude, longitude in points:
+            building = await building_service.create(
+                BuildingCreate(address=f"Moscow, {name}", latitude=latitude, longitude=longitude)
+            )
+            await organization_service.create(OrganizationCreate(name=name, building_id=building.id))
+
+
+def test_tiled_search_matches_database_search(session_factory):
+    """Тест совпадения результатов через кэш тайлов с поиском в БД и попаданий в кэш"""
+    async def run():
+        await _create(session_factory, POINTS)
+        cache = GeoTileCache(precision=5)
+        queries = [
+            dict(latitude=55.7522, longitude=37.6177, radius=3),
+            dict(latitude=55.7523, longitude=37.6174, radius=3),
+            dict(latitude=55.76, longitude=37.62, min_latitude=55.74, max_latitude=55.80,
+                 min_longitude=37.58, max_longitude=37.70),
+        ]
+        results = []
+        async with session_factory() as session:
+            for query in queries:
+                tiled = await TiledGeographicSearchStrategy(session, cache).execute_search(**query)
+                direct = await GeographicSearchStrategy(session).execute_search(**query)
+                results.append((
+                    [organization.name for organization in tiled.items],
+                    [organization.name for organization in direct.items]
+                ))
+        return results, cache.get_stats()
+
+    results, stats = asyncio.run(run())
+    for tiled, direct in results:
+        assert tiled == direct
+    assert results[0][0] == ["Kremlin", "Lubyanka", "Arbat"]
+    assert results[2][0] == ["Lubyanka", "Kremlin", "Arbat", "Sokolniki"]
+    # Второй запрос со сдвинутыми координатами полностью обслужен из кэша
+    assert stats["hits"] > 0
+
+
+def test_tiled_search_pages_by_cursor(session_factory):
+    """Тест листания по курсору при поиске через кэш тайлов"""
+    async def run():
+        await _create(session_factory, POINTS)
+        cache = GeoTileCache(precision=5)
+        names, cursor = [], None
+        async with session_factory() as session:
+            while True:
+                page = await TiledGeographicSearchStrategy(session, cache).execute_search(
+                    latitude=55.7520, longitude=37.6175, radius=10, limit=2, cursor=cursor
+                )
+                names.append([organization.name for organization in page.items])
+                cursor = page.next_cursor
+                if cursor is None:
+                    return names
+
+    assert asyncio.run(run()) == [["Kremlin", "Lubyanka"], ["Arbat", "Sokolniki"]]
+
+
+def test_created_organization_invalidates_tile(session_factory):
+    """Тест сброса тайла при создании организации в нем"""
+    async def run():
+        await _create(session_factory, POINTS[:1])
+        cache = GeoTileCache(precision=5)
+        query = dict(latitude=55.7520, longitude=37.6175, radius=1)
+        async with session_factory() as session:
+            before = await TiledGeographicSearchStrategy(session, cache).execute_search(**query)
+
+        queue = get_change_broadcaster().subscribe()
+        try:
+            await _create(session_factory, [("Manezh", 55.7540, 37.6150)])
+            while not queue.empty():
+                cache.handle_event(queue.get_nowait())
+        finally:
+            get_change_broadcaster().unsubscribe(queue)
+
+        async with session_factory() as session:
+            after = await TiledGeographicSearchStrategy(session, cache).execute_search(**query)
+        return before, after, cache.get_stats()
+
+    before, after, stats = asyncio.run(run())
+    assert [organization.name for organization in before.items] == ["Kremlin"]
+    assert [organization.name for organization in after.items] == ["Kremlin", "Manezh"]
+    assert stats["invalidations"] == 2
@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from app.core.geometry import bounding_box, points_in_polygons
+from app.schemas.schemas import BatchGeoSearch, BuildingCreate, GeoPoint, OrganizationCreate, PolygonSearchArea
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+SQUARE_WITH_HOLE = [
+    [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+    [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]],
+]
+TRIANGLE = [[[20, 20], [30, 20], [20, 30], [20, 20]]]
+
+
+def test_points_in_polygons():
+    """Тест попадания точек в мультиполигон с дырой"""
+    latitudes = [1, 5, 9, 21, 29, 15]
+    longitudes = [1, 5, 9, 21, 29, 15]
+    inside = points_in_polygons(latitudes, longitudes, [SQUARE_WITH_HOLE, TRIANGLE])
+    assert inside.tolist() == [True, False, True, True, False, False]
+    # Матрица точки x ребра блоками из одной точки дает тот же результат
+    assert points_in_polygons(latitudes, longitudes, [SQUARE_WITH_HOLE, TRIANGLE], max_matrix_size=1).tolist() == \
+        inside.tolist()
+    assert bounding_box([SQUARE_WITH_HOLE, TRIANGLE]) == (0, 30, 0, 30)
+
+
+def test_polygon_area_validation():
+    """Тест проверки геометрии GeoJSON"""
+    with pytest.raises(ValueError):
+        PolygonSearchArea(type="Polygon", coordinates=[[[0, 0], [1, 0], [1, 1], [0, 1]]])
+    with pytest.raises(ValueError):
+        PolygonSearchArea(type="Polygon", coordinates=[[[0, 0], [1, 0], [0, 0]]])
+    area = PolygonSearchArea(type="MultiPolygon", coordinates=[SQUARE_WITH_HOLE, TRIANGLE])
+    assert len(area.polygons()) == 2
+
+
+def test_find_in_polygon(session_factory):
+    """Тест поиска организаций в полигоне с пагинацией"""
+    async def run():
+        async with session_factory() as session:
+            organization_service = factory.create_organization_service(session)
+            for number, (latitude, longitude) in enumerate([(1, 1), (5, 5), (9, 2), (1, 11)]):
+                building = await factory.create_building_service(session).create(
+                    BuildingCreate(address=f"Building {number}", latitude=latitude, longitude=longitude)
+                )
+                await organization_service.create(
+                    OrganizationCreate(name=f"Organization {number}", building_id=building.id)
+                )
+
+        area = PolygonSearchArea(type="Polygon", coordinates=SQUARE_WITH_HOLE)
+        async with session_factory() as session:
+            service = factory.create_organization_service(session)
+            first_page = await service.find_in_polygon(area, limit=1)
+            second_page = await service.find_in_polygon(area, limit=10, cursor=first_page.next_cursor)
+            total = await service.count_by_polygon(area, mode="exact")
+        return first_page, second_page, total
+
+    first_page, second_page, total = asyncio.run(run())
+    assert [organization.name for organization in first_page.items] == ["Organization 0"]
+    assert [organization.name for organization in second_page.items] == ["Organization 2"]
+    assert second_page.next_cursor is None
+    assert total == (2, "exact")
+
+
+def test_find_near_points(session_factory):
+    """Тест пакетного поиска по радиусу и k ближайших"""
+    async def run():
+        async with session_factory() as session:
+            organization_service = factory.create_organization_service(session)
+            for number, longitude in enumerate([0.0, 0.01, 0.02, 1.0]):
+                building = await factory.create_building_service(session).create(
+                    BuildingCreate(address=f"Building {number}", latitude=0.0, longitude=longitude)
+                )
+                await organization_service.create(
+                    OrganizationCreate(name=f"Organization {number}", building_id=building.id)
+                )
+
+        points = [GeoPoint(latitude=0.0, longitude=0.0), GeoPoint(latitude=0.0, longitude=1.0)]
+        async with session_factory() as session:
+            service = factory.create_organization_service(session)
+            by_radius = await service.find_near_points(
+                BatchGeoSearch(points=points, radius=1.5, limit_per_point=2)
+            )
+            by_k = await service.find_near_points(BatchGeoSearch(points=points, k=1))
+            # Точка далеко от всех зданий: прямоугольник расширяется, пока не наберется k
+            far = await service.find_near_points(
+                BatchGeoSearch(points=[GeoPoint(latitude=30.0, longitude=0.0)] + points[:1], k=10)
+            )
+        return by_radius, by_k, far
+
+    by_radius, by_k, far = asyncio.run(run())
+
+    def names(result):
+        return [organization.name for organization in result["organizations"]]
+
+    assert [names(result) for result in by_radius] == [["Organization 0", "Organization 1"], ["Organization 3"]]
+    assert by_radius[0]["distances_km"] == [0.0, 1.113]
+    assert [names(result) for result in by_k] == [["Organization 0"], ["Organization 3"]]
+    assert names(far[0]) == ["Organization 0", "Organization 1", "Organization 2", "Organization 3"]
+    assert names(far[1]) == ["Organization 0", "Organization 1", "Organization 2", "Organization 3"]
+    with pytest.raises(ValueError):
+        BatchGeoSearch(points=[GeoPoint(latitude=0.0, longitude=0.0)], radius=1.0, k=1)
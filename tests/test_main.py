@@ -31,4 +31,11 @@ def test_docs():
 def test_redoc():
     """Тест доступности redoc документации"""
     response = client.get("/redoc")
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+
+def test_openapi_schema():
+    """Тест генерации OpenAPI схемы"""
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert "/api/v1/organizations/" in response.json()["paths"]
@@ -0,0 +1,113 @@
+import asyncio
+from sqlalchemy import event, select
+from app.models.models import OrganizationDocument
+from app.schemas.schemas import ActivityCreate, BuildingCreate, OrganizationCreate
+from app.services.organization_documents import backfill_missing_documents, refresh_organization_documents
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+async def _seed(session_factory):
+    async with session_factory() as session:
+        building = await factory.create_building_service(session).create(
+            BuildingCreate(address="Moscow, Lenina st., 1", latitude=55.75, longitude=37.61)
+        )
+        activity_service = factory.create_activity_service(session)
+        food = await activity_service.create(ActivityCreate(name="Food"))
+        meat = await activity_service.create(ActivityCreate(name="Meat", parent_id=food.id))
+        organization = await factory.create_organization_service(session).create(
+            OrganizationCreate(
+                name="Butcher", building_id=building.id,
+                phone_numbers=["8-923-666-13-13"], activity_ids=[meat.id]
+            )
+        )
+        return organization, food, meat
+
+
+def test_document_written_with_organization(session_factory):
+    """Тест сборки документа при создании организации"""
+    async def run():
+        organization, food, meat = await _seed(session_factory)
+        async with session_factory() as session:
+            document = (await session.execute(select(OrganizationDocument))).scalars().one()
+        return organization, document, food, meat
+
+    organization, document, food, meat = asyncio.run(run())
+    assert (document.organization_id, document.name, document.address) == (
+        organization.id, "Butcher", "Moscow, Lenina st., 1"
+    )
+    assert (document.latitude, document.longitude) == (55.75, 37.61)
+    assert document.activity_ids == [meat.id]
+    assert document.activity_path_ids == [food.id, meat.id]
+    assert document.document["phones"] == [{"id": organization.phones[0].id, "number": "8-923-666-13-13"}]
+    assert document.document["activities"][0]["path"] == ["Food", "Meat"]
+    assert organization.building.address == "Moscow, Lenina st., 1"
+
+
+def test_reads_use_single_query(session_factory):
+    """Тест чтения организации и страницы списка одним запросом"""
+    async def run():
+        organization, _, _ = await _seed(session_factory)
+        engine = session_factory.kw["bind"]
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async with session_factory() as session:
+                service = factory.create_organization_service(session)
+                found = await service.get_by_id(organization.id)
+                reads_by_id = len(statements)
+                page = await service.get_all(limit=10)
+                by_building = await service.find_by_building(organization.building_id)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        return found, page, by_building, reads_by_id, len(statements)
+
+    found, page, by_building, reads_by_id, reads_total = asyncio.run(run())
+    assert reads_by_id == 1
+    assert reads_total == 3
+    assert found.name == "Butcher" and found.activities[0].name == "Meat"
+    assert [organization.name for organization in page] == ["Butcher"]
+    assert [organization.name for organization in by_building.items] == ["Butcher"]
+
+
+def test_refresh_rebuilds_missing_documents(session_factory):
+    """Тест пересборки документов, удаленных или не созданных при записи"""
+    async def delete_documents():
+        async with session_factory() as session:
+            await session.execute(OrganizationDocument.__table__.delete())
+            await session.commit()
+
+    async def run():
+        organization, _, _ = await _seed(session_factory)
+        await delete_documents()
+        async with session_factory() as session:
+            service = factory.create_organization_service(session)
+            missing = await service.get_all()
+            backfilled = await backfill_missing_documents(session)
+            await session.commit()
+            listed = await service.get_all()
+            rebuilt = await refresh_organization_documents(session)
+            await session.commit()
+        await delete_documents()
+        async with session_factory() as session:
+            service = factory.create_organization_service(session)
+            # Чтение по id не пишет в БД: организация без документа не находится до пересборки
+            not_found = await service.get_by_id(organization.id)
+            await backfill_missing_documents(session)
+            await session.commit()
+            found = await service.get_by_id(organization.id)
+            remaining = await backfill_missing_documents(session)
+        return missing, backfilled, listed, rebuilt, not_found, found, remaining
+
+    missing, backfilled, listed, rebuilt, not_found, found, remaining = asyncio.run(run())
+    assert missing == []
+    assert backfilled == 1 and rebuilt == 1
+    assert [organization.name for organization in listed] == ["Butcher"]
+    assert not_found is None
+    assert found.building.address == "Moscow, Lenina st., 1"
+    assert remaining == 0
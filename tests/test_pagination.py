@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from app.core.pagination import decode_cursor, encode_cursor
+from app.schemas.schemas import ActivityCreate, BuildingCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+def test_cursor_round_trip():
+    """Тест кодирования курсора и отказа на поврежденном курсоре или курсоре с другими типами ключа"""
+    cursor = encode_cursor([1, 5, "Кафе"])
+    assert decode_cursor(cursor, (int, int, str)) == [1, 5, "Кафе"]
+    assert decode_cursor(cursor, (float, int, str)) == [1.0, 5, "Кафе"]
+    for types in [(int, str), (int, int, int), (str, int, str)]:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, types)
+    for values in [[True, 5], [float("nan"), 5], ["1.5", 5]]:
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(values), (float, int))
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor!", (int, int, str))
+
+
+def test_name_search_ranked_pages(session_factory):
+    """Тест ранжирования по названию и листания по курсору без повторов"""
+    async def run():
+        async with session_factory() as session:
+            building = await factory.create_building_service(session).create(
+                BuildingCreate(address="Moscow, Lenina st., 1", latitude=55.75, longitude=37.61)
+            )
+            organization_service = factory.create_organization_service(session)
+            for name in ["Best Cafe Moscow", "Cafe Luna", "Cafe", "Night Cafe", "Cafe Bar"]:
+                await organization_service.create(OrganizationCreate(name=name, building_id=building.id))
+
+        pages, cursor = [], None
+        while True:
+            async with session_factory() as session:
+                page = await factory.create_organization_service(session).find_by_name(
+                    "cafe", limit=2, cursor=cursor
+                )
+            pages.append([organization.name for organization in page.items])
+            cursor = page.next_cursor
+            if cursor is None:
+                return pages
+
+    pages = asyncio.run(run())
+    assert pages == [["Cafe", "Cafe Bar"], ["Cafe Luna", "Night Cafe"], ["Best Cafe Moscow"]]
+
+
+def test_geographic_search_nearest_first(session_factory):
+    """Тест упорядочивания по расстоянию до центра и ограничения выдачи"""
+    async def run():
+        async with session_factory() as session:
+            building_service = factory.create_building_service(session)
+            organization_service = factory.create_organization_service(session)
+            for name, offset in [("Far", 0.03), ("Near", 0.001), ("Middle", 0.01)]:
+                building = await building_service.create(
+                    BuildingCreate(address=f"Moscow, {name}", latitude=55.75 + offset, longitude=37.61)
+                )
+                await organization_service.create(OrganizationCreate(name=name, building_id=building.id))
+
+        async with session_factory() as session:
+            service = factory.create_organization_service(session)
+            first = await service.find_by_geographic_area(latitude=55.75, longitude=37.61, radius=10, limit=2)
+            rest = await service.find_by_geographic_area(
+                latitude=55.75, longitude=37.61, radius=10, limit=2, cursor=first.next_cursor
+            )
+        return first, rest
+
+    first, rest = asyncio.run(run())
+    assert [organization.name for organization in first.items] == ["Near", "Middle"]
+    assert [organization.name for organization in rest.items] == ["Far"]
+    assert rest.next_cursor is None
+
+
+def test_activity_search_deduplicates_subtree_matches(session_factory):
+    """Тест: организация с несколькими видами деятельности из поддерева возвращается один раз"""
+    async def run():
+        async with session_factory() as session:
+            building = await factory.create_building_service(session).create(
+                BuildingCreate(address="Moscow, Lenina st., 1", latitude=55.75, longitude=37.61)
+            )
+            activity_service = factory.create_activity_service(session)
+            food = await activity_service.create(ActivityCreate(name="Food"))
+            meat = await activity_service.create(ActivityCreate(name="Meat", parent_id=food.id))
+            dairy = await activity_service.create(ActivityCreate(name="Dairy", parent_id=food.id))
+            organization_service = factory.create_organization_service(session)
+            for name, activity_ids in [("Farm", [meat.id, dairy.id]), ("Butcher", [meat.id]), ("Milk", [dairy.id])]:
+                await organization_service.create(
+                    OrganizationCreate(name=name, building_id=building.id, activity_ids=activity_ids)
+                )
+
+        async with session_factory() as session:
+            return await factory.create_organization_service(session).find_by_activity("Food", limit=2)
+
+    page = asyncio.run(run())
+    assert [organization.name for organization in page.items] == ["Butcher", "Farm"]
+    assert page.next_cursor is not None
@@ -0,0 +1,45 @@
+import asyncio
+from sqlalchemy import select, func
+from app.core.phones import normalize_phone_number
+from app.models.models import Phone
+from app.schemas.schemas import BuildingCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+def test_normalize_phone_number():
+    """Тест нормализации номера телефона"""
+    assert normalize_phone_number("8-923-666-13-13") == "79236661313"
+    assert normalize_phone_number("+7 (923) 666-13-13") == "79236661313"
+    assert normalize_phone_number("2-222-222") == "2222222"
+
+
+def test_organizations_share_normalized_phone(session_factory):
+    """Тест повторного использования телефона в другой записи и обратного поиска"""
+    async def run():
+        async with session_factory() as session:
+            building = await factory.create_building_service(session).create(
+                BuildingCreate(address="г. Москва, ул. Блюхера, 32/1", latitude=55.7558, longitude=37.6176)
+            )
+            service = factory.create_organization_service(session)
+            first = await service.create(OrganizationCreate(
+                name="ЗАО Мясокомбинат", building_id=building.id,
+                phone_numbers=["8-923-666-13-13", "+7 923 666 13 13"]
+            ))
+            second = await service.create(OrganizationCreate(
+                name="Хлебозавод", building_id=building.id, phone_numbers=["+7 (923) 666-13-13"]
+            ))
+            phone_count = (await session.execute(select(func.count(Phone.id)))).scalar()
+            found = await service.find_by_phone("79236661313")
+            first_page = await service.find_by_phone("79236661313", limit=1)
+            second_page = await service.find_by_phone("79236661313", limit=1, cursor=first_page.next_cursor)
+            return first, second, phone_count, found, first_page, second_page
+
+    first, second, phone_count, found, first_page, second_page = asyncio.run(run())
+    assert phone_count == 1
+    assert len(first.phones) == 1
+    assert first.phones[0].id == second.phones[0].id
+    assert {organization.id for organization in found.items} == {first.id, second.id}
+    assert [organization.id for organization in first_page.items + second_page.items] == [first.id, second.id]
+    assert second_page.next_cursor is None
@@ -0,0 +1,57 @@
+from app.core.prefix_index import PrefixIndex, normalize_name, ORGANIZATION, ACTIVITY
+
+
+def _index():
+    index = PrefixIndex()
+    index.rebuild([
+        (ORGANIZATION, 1, "ООО \"Рога и Копыта\""),
+        (ORGANIZATION, 2, "Автосалон \"Премиум\""),
+        (ORGANIZATION, 3, "Автозапчасти \"Деталь\""),
+        (ACTIVITY, 1, "Автомобили"),
+        (ACTIVITY, 2, "Ёлочные игрушки"),
+    ])
+    return index
+
+
+def test_normalize_name():
+    """Тест нормализации названий"""
+    assert normalize_name("  Ёлка,  \"Рога\"!") == "елка рога"
+
+
+def test_prefix_search_ranking():
+    """Тест ранжирования: совпадение с начала названия и короткие названия выше"""
+    results = _index().search("авто", limit=2)
+    assert [(item["type"], item["id"]) for item in results] == [(ACTIVITY, 1), (ORGANIZATION, 2)]
+
+
+def test_prefix_search_matches_inner_words_and_kinds():
+    """Тест поиска по началу любого слова и фильтра по типу"""
+    index = _index()
+    assert [item["id"] for item in index.search("коп")] == [1]
+    assert index.search("елоч")[0]["name"] == "Ёлочные игрушки"
+    assert index.search("авто", kinds=[ORGANIZATION])[0]["type"] == ORGANIZATION
+
+
+def test_index_updated_on_create_event():
+    """Тест добавления организации из события создания"""
+    index = _index()
+    event = {"id": 1, "entity_type": "organizations", "entity_id": 4, "operation": "create",
+             "data": {"name": "Хлебозавод \"Свежесть\""}}
+    index.handle_event(event)
+    index.handle_event(event)
+    assert len(index) == 6
+    assert index.search("свеж")[0]["id"] == 4
+
+
+def test_prefix_search_scans_bounded_window():
+    """Тест ранжирования только среди первых max_scan ключей диапазона префикса"""
+    index = PrefixIndex(max_scan=3)
+    index.rebuild([
+        (ORGANIZATION, 1, "Сервис Альфа Длинное Название"),
+        (ORGANIZATION, 2, "Сервис Бета Длинное Название"),
+        (ORGANIZATION, 3, "Сервис Гамма Длинное Название"),
+        (ORGANIZATION, 4, "Сервис Я"),
+    ])
+    # Самое короткое название за окном просмотра не попадает в выдачу короткого префикса
+    assert sorted(item["id"] for item in index.search("сервис")) == [1, 2, 3]
+    assert [item["id"] for item in index.search("сервис я")] == [4]
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from unittest.mock import patch
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.core.config import get_settings
+from app.core.profiling import ProfileStore, ProfilingMiddleware
+from app.core.security import verify_admin_key
+
+
+def _busy_work(duration):
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _client(store):
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, admin_key="admin", interval_ms=1)
+
+    @app.get("/api/v1/slow")
+    async def slow():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 1"))
+        _busy_work(0.05)
+        return {"status": "ok"}
+
+    return TestClient(app)
+
+
+def test_profile_captured_with_admin_key(tmp_path):
+    """Тест сохранения профиля запроса с заголовком X-Profile и ключом администратора"""
+    store = ProfileStore(str(tmp_path))
+    response = _client(store).get("/api/v1/slow", headers={"X-Profile": "1", "X-Admin-Key": "admin"})
+    assert response.status_code == 200
+
+    profile_id = response.headers["x-profile-id"]
+    summary = store.get_summary(profile_id)
+    assert summary["samples"] > 0
+    assert summary["sql_count"] == 2
+    assert summary["sql"][0]["statement"] == "SELECT 1"
+    assert "_busy_work" in store.get_folded(profile_id)
+    assert [item["id"] for item in store.list()] == [profile_id]
+
+
+def test_profile_not_captured_without_admin_key(tmp_path):
+    """Тест отсутствия профилирования без верного ключа администратора"""
+    store = ProfileStore(str(tmp_path))
+    response = _client(store).get("/api/v1/slow", headers={"X-Profile": "1", "X-Admin-Key": "wrong"})
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert store.list() == []
+
+
+def test_profile_samples_tasks_spawned_by_request(tmp_path):
+    """Тест профилирования задач, запущенных запросом (общие вызовы single-flight)"""
+    store = ProfileStore(str(tmp_path))
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, admin_key="admin", interval_ms=1)
+
+    async def _spawned_work():
+        _busy_work(0.05)
+
+    @app.get("/api/v1/spawned")
+    async def spawned():
+        await asyncio.ensure_future(_spawned_work())
+        return {"status": "ok"}
+
+    response = TestClient(app).get("/api/v1/spawned", headers={"X-Profile": "1", "X-Admin-Key": "admin"})
+    assert "_spawned_work" in store.get_folded(response.headers["x-profile-id"])
+
+
+def test_admin_endpoints_require_admin_key():
+    """Тест отказа административных данных без ADMIN_API_KEY и с неверным ключом"""
+    app = FastAPI()
+
+    @app.get("/api/v1/admin/data")
+    async def data(admin_key: str = Depends(verify_admin_key)):
+        return {"status": "ok"}
+
+    client = TestClient(app)
+    assert client.get("/api/v1/admin/data", headers={"X-Admin-Key": "admin"}).status_code == 403
+
+    with patch.object(get_settings(), "admin_api_key", "admin"):
+        assert client.get("/api/v1/admin/data", headers={"X-Admin-Key": "wrong"}).status_code == 403
+        assert client.get("/api/v1/admin/data", headers={"X-Admin-Key": "admin"}).status_code == 200
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import re
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.models import Base
+from app.schemas.schemas import BuildingCreate, ActivityCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+# Поиск по подстроке (ilike '%...%') и по координатам не может использовать
+# B-tree индекс, поэтому проверяются только выборки по ключам и связям
+SERVICE_QUERIES = {
+    "organization.get_by_id": lambda session, ids: factory.create_organization_service(session).get_by_id(
+        ids["organization"]
+    ),
+    "organization.find_by_building": lambda session, ids: factory.create_organization_service(
+        session
+    ).find_by_building(ids["building"]),
+    "organization.find_by_phone": lambda session, ids: factory.create_organization_service(session).find_by_phone(
+        "8-923-666-13-13"
+    ),
+    "activity.get_activity_tree": lambda session, ids: factory.create_activity_service(session).get_activity_tree(
+        ids["activity"]
+    ),
+    "activity.get_subtree_ids": lambda session, ids: factory.create_activity_service(session).get_subtree_ids(
+        ids["activity"]
+    ),
+    "building.get_by_id": lambda session, ids: factory.create_building_service(session).get_by_id(ids["building"]),
+}
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_engine(request, tmp_path):
+    """Движок с пустой схемой: SQLite всегда, PostgreSQL при заданном TEST_POSTGRES_URL"""
+    if request.param == "sqlite":
+        pytest.importorskip("aiosqlite")
+        url = f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}"
+    else:
+        url = os.environ.get("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_async_engine(url, poolclass=NullPool)
+
+    async def reset_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(reset_schema())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+async def _seed(session_factory):
+    async with session_factory() as session:
+        ids = {}
+        buildings = [
+            await factory.create_building_service(session).create(
+                BuildingCreate(address=f"Moscow, Lenina st., {number}", latitude=55.75, longitude=37.61)
+            )
+            for number in range(1, 4)
+        ]
+        activity_service = factory.create_activity_service(session)
+        food = await activity_service.create(ActivityCreate(name="Food"))
+        meat = await activity_service.create(ActivityCreate(name="Meat", parent_id=food.id))
+        await activity_service.create(ActivityCreate(name="Dairy", parent_id=food.id))
+        await activity_service.create(ActivityCreate(name="Sausages", parent_id=meat.id))
+
+        organization_service = factory.create_organization_service(session)
+        for number, building in enumerate(buildings):
+            organization = await organization_service.create(
+                OrganizationCreate(
+                    name=f"Organization {number}",
+                    building_id=building.id,
+                    phone_numbers=[f"8-923-666-13-1{number + 3}"],
+                    activity_ids=[meat.id if number % 2 else food.id]
+                )
+            )
+        ids.update(organization=organization.id, building=buildings[0].id, activity=food.id)
+        return ids
+
+
+def _sequential_scans(dialect: str, plan_rows) -> list:
+    if dialect == "postgresql":
+        return [row[0] for row in plan_rows if "Seq Scan" in row[0]]
+    # Строка SQLite "SCAN <table>" без "USING ... INDEX" означает полный проход таблицы
+    return [
+        row[-1] for row in plan_rows
+        if re.match(r"SCAN \w+", row[-1]) and "USING" not in row[-1]
+    ]
+
+
+async def _collect_sequential_scans(engine, query) -> list:
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    ids = await _seed(session_factory)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with session_factory() as session:
+            await query(session, ids)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    dialect = engine.dialect.name
+    scans = []
+    async with engine.connect() as conn:
+        if dialect == "postgresql":
+            # На маленьких таблицах планировщик предпочитает Seq Scan; с выключенным
+            # seqscan он остается в плане только при отсутствии подходящего индекса
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            prefix = "EXPLAIN "
+        else:
+            prefix = "EXPLAIN QUERY PLAN "
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(prefix + statement, parameters)
+            scans.extend((statement, detail) for detail in _sequential_scans(dialect, result.all()))
+        await conn.rollback()
+    assert statements
+    return scans
+
+
+@pytest.mark.parametrize("query_name", sorted(SERVICE_QUERIES))
+def test_service_queries_use_indexes(plan_engine, query_name):
+    """Тест отсутствия последовательного сканирования в планах запросов сервисов"""
+    scans = asyncio.run(_collect_sequential_scans(plan_engine, SERVICE_QUERIES[query_name]))
+    assert scans == []
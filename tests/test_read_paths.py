@@ -0,0 +1,94 @@
+import asyncio
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from app.core.patterns import GeographicSearchStrategy
+from app.core.read_paths import CORE
+from app.schemas.schemas import ActivityCreate, BuildingCreate, OrganizationCreate, OrganizationList
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+organization_list_adapter = TypeAdapter(List[OrganizationList])
+
+
+async def _seed(session_factory):
+    async with session_factory() as session:
+        building_service = factory.create_building_service(session)
+        buildings = [
+            await building_service.create(BuildingCreate(address=address, latitude=latitude, longitude=37.61))
+            for address, latitude in [("Moscow, Lenina st., 1", 55.75), ("Moscow, Mira av., 2", 55.76)]
+        ]
+        activity_service = factory.create_activity_service(session)
+        food = await activity_service.create(ActivityCreate(name="Food"))
+        meat = await activity_service.create(ActivityCreate(name="Meat", parent_id=food.id))
+        organization_service = factory.create_organization_service(session)
+        for number, (name, activity_ids) in enumerate([
+            ("Shop Meat", [meat.id]),
+            ("Shop Farm", [food.id, meat.id]),
+            ("Garage", []),
+        ]):
+            await organization_service.create(OrganizationCreate(
+                name=name,
+                building_id=buildings[number % 2].id,
+                phone_numbers=[f"8-923-666-13-1{number}", f"8-923-666-14-1{number}"],
+                activity_ids=activity_ids
+            ))
+
+
+def _normalized(organizations) -> list:
+    dumped = organization_list_adapter.dump_python(
+        organization_list_adapter.validate_python(list(organizations), from_attributes=True)
+    )
+    for organization in dumped:
+        organization["phones"].sort(key=lambda phone: phone["id"])
+        organization["activities"].sort(key=lambda activity: activity["id"])
+    return dumped
+
+
+def test_core_read_path_matches_orm(session_factory):
+    """Тест совпадения ответов пути чтения core с ORM для списков и поиска"""
+    async def read(**info):
+        async with session_factory(info=info) as session:
+            service = factory.create_organization_service(session)
+            return {
+                "name": (await service.find_by_name("shop")).items,
+                "activity": (await service.find_by_activity("Food")).items,
+                "phone": (await service.find_by_phone("8 923 666 13 10")).items,
+                "all": await service.get_all(),
+                "geographic": (await GeographicSearchStrategy(session).execute_search(
+                    latitude=55.75, longitude=37.61, radius=5
+                )).items,
+            }
+
+    async def run():
+        await _seed(session_factory)
+        return await read(), await read(read_path=CORE)
+
+    orm, core = asyncio.run(run())
+    for name in orm:
+        assert core[name] and all(isinstance(organization, dict) for organization in core[name])
+        assert _normalized(core[name]) == _normalized(orm[name]), name
+
+
+def test_core_search_is_single_round_trip(session_factory):
+    """Тест поиска по названию на пути core одним запросом к БД"""
+    async def run():
+        await _seed(session_factory)
+        engine = session_factory.kw["bind"]
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async with session_factory(info={"read_path": CORE}) as session:
+                page = await factory.create_organization_service(session).find_by_name("shop")
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        return page, statements
+
+    page, statements = asyncio.run(run())
+    assert [organization["name"] for organization in page.items] == ["Shop Meat", "Shop Farm"]
+    assert len(page.items[0]["phones"]) == 2
+    assert len(statements) == 1
@@ -0,0 +1,89 @@
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.engine_lifecycle import EngineLifecycleManager
+from app.core.single_flight import SingleFlight, coalesced, get_single_flight
+from app.schemas.schemas import BuildingCreate
+from app.services.building_service import BuildingService
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+def test_single_flight_shares_execution():
+    """Тест выполнения одинаковых одновременных вызовов один раз"""
+    async def run():
+        single_flight = SingleFlight()
+        executions = []
+
+        async def call():
+            executions.append(1)
+            await asyncio.sleep(0.01)
+            return ["result"]
+
+        results = await asyncio.gather(*[single_flight.do("key", call) for _ in range(5)])
+        await single_flight.do("key", call)
+        return single_flight.get_stats(), results, executions
+
+    stats, results, executions = asyncio.run(run())
+    assert len(executions) == 2
+    assert all(result is results[0] for result in results)
+    assert stats["calls_total"] == 6
+    assert stats["coalesced_total"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_service_reads_are_coalesced(session_factory):
+    """Тест объединения одинаковых чтений сервиса с нормализацией аргументов"""
+    async def run():
+        async with session_factory() as session:
+            await factory.create_building_service(session).create(
+                BuildingCreate(address="Moscow, Lenina st., 1", latitude=55.7558, longitude=37.62)
+            )
+
+        stats_before = get_single_flight().get_stats()
+        sessions = [session_factory() for _ in range(3)]
+        results = await asyncio.gather(
+            factory.create_building_service(sessions[0]).find_by_address("lenina"),
+            factory.create_building_service(sessions[1]).find_by_address(address="LENINA"),
+            factory.create_building_service(sessions[2]).find_by_address("Lenina"),
+        )
+        for session in sessions:
+            await session.close()
+        return stats_before, get_single_flight().get_stats(), results
+
+    before, after, results = asyncio.run(run())
+    assert after["executions_total"] - before["executions_total"] == 1
+    assert after["coalesced_total"] - before["coalesced_total"] == 2
+    assert [len(result.items) for result in results] == [1, 1, 1]
+
+
+def test_shared_call_session_is_tracked_by_engine(tmp_path, monkeypatch):
+    """Тест учета сессии общего вызова в активных сессиях движка: закрытие движка ждет ее"""
+    lifecycle = EngineLifecycleManager()
+
+    async def run():
+        handle = lifecycle.register("default", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"))
+
+        async with handle.session_factory() as session:
+            read = asyncio.ensure_future(factory.create_building_service(session).get_all())
+            await asyncio.sleep(0.01)
+            read.cancel()
+        await asyncio.sleep(0)
+        pending = handle.in_flight
+        drained = await lifecycle.shutdown(drain_timeout=1)
+        return pending, drained
+
+    in_flight = []
+
+    async def slow_get_all(service, *args, **kwargs):
+        in_flight.append(service.db.engine_handle.in_flight)
+        await asyncio.sleep(0.05)
+        return []
+
+    monkeypatch.setattr(BuildingService, "get_all", coalesced()(slow_get_all))
+    pending, drained = asyncio.run(run())
+
+    # Сессия запроса и сессия общего вызова; после отмены запроса общий вызов еще идет
+    assert in_flight == [2]
+    assert pending == 1
+    assert drained
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.slow_query_log import SlowQueryLog, current_route
+
+
+def test_slow_queries_logged_with_plan(tmp_path):
+    """Тест записи медленных запросов с маршрутом и планом, с ограничением частоты EXPLAIN"""
+    pytest.importorskip("aiosqlite")
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+
+        slow_query_log = SlowQueryLog(threshold_ms=0, max_entries=2, explain_per_minute=1)
+        slow_query_log.attach(engine)
+
+        current_route.set("GET /api/v1/organizations/search/name")
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT id FROM items WHERE name = :name"), {"name": "Еда"})
+            await conn.execute(text("SELECT id FROM items WHERE id = :id"), {"id": 1})
+
+        for _ in range(100):
+            if all(entry["plan_status"] != "pending" for entry in slow_query_log.entries()):
+                break
+            await asyncio.sleep(0.01)
+        await engine.dispose()
+        return slow_query_log.entries()
+
+    entries = asyncio.run(run())
+    assert len(entries) == 2
+    newest, oldest = entries
+    assert oldest["statement"].startswith("SELECT id FROM items WHERE name")
+    assert oldest["route"] == "GET /api/v1/organizations/search/name"
+    assert "Еда" in oldest["parameters"]
+    assert oldest["plan_status"] == "captured"
+    assert "items" in oldest["plan"]
+    assert newest["plan_status"] == "skipped"
+
+
+def test_failed_statement_does_not_skew_later_durations(tmp_path):
+    """Тест упавшего запроса: его время начала не остается на соединении и не попадает в следующие запросы"""
+    pytest.importorskip("aiosqlite")
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+        slow_query_log = SlowQueryLog(threshold_ms=0, max_entries=10, explain_per_minute=0)
+        slow_query_log.attach(engine)
+
+        async with engine.connect() as conn:
+            with pytest.raises(Exception):
+                await conn.execute(text("SELECT * FROM missing_table"))
+            await conn.rollback()
+            await asyncio.sleep(0.2)
+            await conn.execute(text("SELECT 1"))
+            info = dict(conn.sync_connection.info)
+        await engine.dispose()
+        return slow_query_log.entries(), info
+
+    entries, info = asyncio.run(run())
+    assert [entry["statement"] for entry in entries] == ["SELECT 1"]
+    assert entries[0]["duration_ms"] < 200
+    assert not any(key.startswith("slow_query") for key in info)
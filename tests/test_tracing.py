@@ -0,0 +1,139 @@
+import asyncio
+import io
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.tracing import (
+    SPAN_KIND_SERVER, ConsoleSpanExporter, FileSpanExporter, InMemorySpanExporter, RequestTrace, Span,
+    TracingMiddleware, create_exporter
+)
+from app.schemas.schemas import BuildingCreate, OrganizationCreate
+from app.services.service_factory import ConcreteServiceFactory
+
+factory = ConcreteServiceFactory()
+
+
+def _client(session_factory, exporter, **options):
+    async def seed():
+        async with session_factory() as session:
+            building = await factory.create_building_service(session).create(
+                BuildingCreate(address="Moscow, Lenina st., 1", latitude=55.75, longitude=37.61)
+            )
+            organization_service = factory.create_organization_service(session)
+            for name in ["Shop Meat", "Shop Farm", "Garage"]:
+                await organization_service.create(OrganizationCreate(name=name, building_id=building.id))
+
+    asyncio.run(seed())
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, exporter=exporter, **options)
+
+    @app.get("/api/v1/organizations/search/name")
+    async def search(name: str):
+        async with session_factory() as session:
+            page = await factory.create_organization_service(session).find_by_name(name)
+        return [organization.name for organization in page.items]
+
+    @app.post("/api/v1/buildings")
+    async def create(address: str):
+        async with session_factory() as session:
+            building_data = BuildingCreate(address=address, latitude=55.79, longitude=49.1)
+            return {"id": (await factory.create_building_service(session).create(building_data)).id}
+
+    return TestClient(app)
+
+
+def test_request_spans_cover_service_strategy_and_sql(session_factory):
+    """Тест дерева спанов запроса: маршрут, метод сервиса, стратегия поиска и SQL с числом строк"""
+    exporter = InMemorySpanExporter()
+    response = _client(session_factory, exporter, sample_rate=1.0).get(
+        "/api/v1/organizations/search/name", params={"name": "shop"}
+    )
+    assert response.json() == ["Shop Meat", "Shop Farm"]
+
+    [trace] = exporter.traces
+    assert response.headers["x-trace-id"] == trace.trace_id
+    spans = {span.name: span for span in trace.spans}
+    root = spans["GET /api/v1/organizations/search/name"]
+    service = spans["OrganizationService.find_by_name"]
+    strategy = spans["NameSearchStrategy.execute_search"]
+    assert root.kind == SPAN_KIND_SERVER and root.parent_span_id is None
+    assert root.attributes["http.response.status_code"] == 200
+    assert service.parent_span_id == root.span_id
+    assert strategy.parent_span_id == service.span_id
+    assert strategy.attributes["result.count"] == 2
+
+    selects = [span for span in trace.spans if span.name == "db SELECT"]
+    assert selects and all(span.parent_span_id == strategy.span_id for span in selects)
+    assert selects[0].attributes["db.system"] == "sqlite"
+    # SQLite не сообщает число строк SELECT, спан не выдумывает его
+    assert "db.rows" not in selects[0].attributes
+    assert all(span.end_ns >= span.start_ns for span in trace.spans)
+
+
+def test_sql_spans_record_driver_rowcount(session_factory):
+    """Тест числа строк в спане SQL по rowcount драйвера"""
+    exporter = InMemorySpanExporter()
+    _client(session_factory, exporter, sample_rate=1.0).post("/api/v1/buildings", params={"address": "Kazan"})
+
+    [trace] = exporter.traces
+    [insert] = [
+        span for span in trace.spans
+        if span.name == "db INSERT" and "INTO buildings" in span.attributes["db.statement"]
+    ]
+    assert insert.attributes["db.rows"] == 1
+
+
+def test_tail_sampling_exports_only_slow_requests(session_factory):
+    """Тест экспорта без выборки только медленных запросов и продолжения входящего traceparent"""
+    exporter = InMemorySpanExporter()
+    client = _client(session_factory, exporter, sample_rate=0.0, slow_threshold_ms=None)
+    response = client.get("/api/v1/organizations/search/name", params={"name": "shop"})
+    assert response.headers["x-trace-id"] and exporter.traces == []
+
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    response = client.get(
+        "/api/v1/organizations/search/name", params={"name": "shop"},
+        headers={"traceparent": f"00-{trace_id}-{parent_id}-01"}
+    )
+    assert response.headers["x-trace-id"] == trace_id
+    root = next(span for span in exporter.traces[0].spans if span.kind == SPAN_KIND_SERVER)
+    assert root.parent_span_id == parent_id
+
+    slow_exporter = InMemorySpanExporter()
+    _client(session_factory, slow_exporter, sample_rate=0.0, slow_threshold_ms=0).get(
+        "/api/v1/organizations/search/name", params={"name": "garage"}
+    )
+    assert len(slow_exporter.traces) == 1
+
+
+def test_file_and_console_exporters(tmp_path):
+    """Тест записи трассы в формате OTLP/JSON и вывода дерева спанов"""
+    trace = RequestTrace()
+    root = Span(trace, "GET /api/v1/organizations", kind=SPAN_KIND_SERVER)
+    child = Span(trace, "db SELECT", parent=root)
+    child.set_attribute("db.rows", 3)
+    child.end()
+    root.end()
+
+    path = tmp_path / "traces" / "spans.jsonl"
+    exporter = create_exporter("file", str(path), "test-service")
+    assert isinstance(exporter, FileSpanExporter)
+    exporter.export(trace)
+    exporter.export(trace)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    [resource_spans] = json.loads(lines[0])["resourceSpans"]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "test-service"}
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["db SELECT", "GET /api/v1/organizations"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"] and spans[0]["traceId"] == trace.trace_id
+    assert spans[0]["attributes"] == [{"key": "db.rows", "value": {"intValue": "3"}}]
+
+    stream = io.StringIO()
+    ConsoleSpanExporter(stream).export(trace)
+    output = stream.getvalue().splitlines()
+    assert output[0] == f"trace {trace.trace_id}"
+    assert output[1].startswith("  GET /api/v1/organizations") and output[2].startswith("    db SELECT")
+    assert output[2].endswith("rows=3")
+    assert create_exporter("none") is None
+    assert isinstance(create_exporter("app.core.tracing:InMemorySpanExporter"), InMemorySpanExporter)
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from app.schemas.schemas import BuildingCreate
+from app.services.building_service import BuildingService
+from app.services.service_factory import ConcreteServiceFactory
+from app.services.write_pipeline import GroupCommitPipeline
+
+
+async def _run_pipeline(session_factory):
+    pipeline = GroupCommitPipeline(session_factory, ConcreteServiceFactory(), max_batch_size=10, max_wait_ms=50)
+
+    jobs = [
+        pipeline.submit("building", BuildingCreate(address=f"ул. Ленина, {i}", latitude=55.0, longitude=37.0))
+        for i in range(5)
+    ]
+    invalid_job = pipeline.submit("building", BuildingCreate.model_construct(address="x", latitude=100.0, longitude=0.0))
+
+    buildings = [await job.wait() for job in jobs]
+    with pytest.raises(ValueError):
+        await invalid_job.wait()
+
+    await pipeline.stop()
+    return pipeline, jobs, invalid_job, buildings
+
+
+def test_group_commit_batches_creates(session_factory):
+    """Тест объединения нескольких созданий в одну транзакцию"""
+    pipeline, jobs, invalid_job, buildings = asyncio.run(_run_pipeline(session_factory))
+
+    assert len({building.id for building in buildings}) == 5
+    assert all(job.status == "committed" for job in jobs)
+    assert invalid_job.status == "failed"
+
+    stats = pipeline.get_stats()
+    assert stats["batches_total"] == 1
+    assert stats["last_batch_size"] == 6
+    assert stats["committed_total"] == 5
+    assert stats["failed_total"] == 1
+    assert stats["queue_depth"] == 0
+    assert pipeline.get_job(jobs[0].id) is jobs[0]
+
+
+def test_unexpected_errors_fail_only_their_job(session_factory, monkeypatch):
+    """Тест изоляции задач: ошибка данных одной задачи и ошибка загрузки после фиксации не трогают остальные"""
+    finish_entity = BuildingService.finish_entity
+
+    async def failing_finish_entity(service, entity):
+        if entity.address == "ул. Ленина, 2":
+            raise RuntimeError("refresh failed")
+        return await finish_entity(service, entity)
+
+    monkeypatch.setattr(BuildingService, "finish_entity", failing_finish_entity)
+
+    async def run():
+        pipeline = GroupCommitPipeline(session_factory, ConcreteServiceFactory(), max_batch_size=10, max_wait_ms=50)
+        jobs = [
+            pipeline.submit("building", BuildingCreate(address=address, latitude=55.0, longitude=37.0))
+            for address in ["ул. Ленина, 1", "ул. Ленина, 2"]
+        ]
+        broken_data = BuildingCreate.model_construct(address=None, latitude=55.0, longitude=37.0)
+        broken_job = pipeline.submit("building", broken_data)
+        results = await asyncio.gather(*(job.wait() for job in jobs + [broken_job]), return_exceptions=True)
+        await pipeline.stop()
+        return pipeline, jobs + [broken_job], results
+
+    pipeline, jobs, results = asyncio.run(run())
+    assert [job.status for job in jobs] == ["committed", "failed", "failed"]
+    assert results[0].address == "ул. Ленина, 1"
+    assert isinstance(results[1], RuntimeError) and isinstance(results[2], AttributeError)
+    assert (pipeline.get_stats()["committed_total"], pipeline.get_stats()["failed_total"]) == (1, 2)